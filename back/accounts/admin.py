@@ -109,7 +109,7 @@ class CustomUserAdmin(BaseUserAdmin):
         if obj.avatar:
             return format_html(
                 '<img src="{}" width="100" height="100" style="border-radius: 50%; object-fit: cover;"/>',
-                obj.avatar.url
+                obj.get_avatar_url()
             )
         return _('No avatar uploaded')
     display_avatar.short_description = _('Avatar Preview')
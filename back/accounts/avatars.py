@@ -0,0 +1,100 @@
+"""Avatar normalization: square WebP variants, EXIF stripped, first frame only."""
+import os
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.contrib.auth import get_user_model
+
+from .tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+def get_avatar_sizes():
+    return sorted(getattr(settings, 'AVATAR_SIZES', (64, 128, 256)))
+
+
+def _load_square(fh, size):
+    """Open an uploaded image and return its first frame as an upright square."""
+    from PIL import Image, ImageOps
+
+    img = Image.open(fh)
+    img.seek(0)  # Animated GIFs are flattened to their first frame
+    img = ImageOps.exif_transpose(img)
+
+    has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    img = img.convert('RGBA' if has_alpha else 'RGB')
+    return ImageOps.fit(img, (size, size), method=Image.LANCZOS)
+
+
+def process_avatar(user_id, source_name, stale_names=()):
+    """
+    Render the uploaded avatar into AVATAR_SIZES square variants and delete the
+    raw upload plus any files belonging to the previous avatar.
+    """
+    from PIL import Image
+
+    User = get_user_model()
+    user = User.objects.filter(pk=user_id).only('pk', 'avatar').first()
+    if not user or user.avatar.name != source_name:
+        # A newer upload superseded this one; its own task cleans up
+        stale_names = list(stale_names) + [source_name]
+        _delete_files(User, stale_names)
+        return
+
+    storage = user.avatar.storage
+    sizes = get_avatar_sizes()
+    fmt = getattr(settings, 'AVATAR_FORMAT', 'WEBP')
+    ext = fmt.lower()
+    stem = os.path.splitext(source_name)[0]
+
+    with storage.open(source_name, 'rb') as fh:
+        square = _load_square(fh, sizes[-1])
+
+    variants = {}
+    for size in sizes:
+        resized = square if size == sizes[-1] else square.resize((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        # Saving without an exif= argument drops all metadata from the output
+        resized.save(buffer, fmt, quality=getattr(settings, 'AVATAR_QUALITY', 85))
+        variants[str(size)] = storage.save(f"{stem}_{size}.{ext}", ContentFile(buffer.getvalue()))
+
+    updated = User.objects.filter(pk=user_id, avatar=source_name).update(
+        avatar=variants[str(sizes[-1])],
+        avatar_variants=variants,
+    )
+    if not updated:
+        _delete_files(User, list(stale_names) + list(variants.values()) + [source_name])
+        return
+
+    _delete_files(User, list(stale_names) + [source_name])
+    logger.info(f"Avatar processed for user {user_id}: {len(variants)} variants")
+
+
+def _delete_files(User, names):
+    storage = User._meta.get_field('avatar').storage
+    for name in set(filter(None, names)):
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Failed to delete avatar file {name}: {str(e)}")
+
+
+def replace_avatar(user, avatar_file):
+    """
+    Store a new raw upload and schedule normalization and cleanup of the old
+    files once the surrounding transaction commits.
+    """
+    stale_names = []
+    if user.avatar:
+        stale_names.append(user.avatar.name)
+    stale_names.extend((user.avatar_variants or {}).values())
+
+    user.avatar = avatar_file
+    user.avatar_variants = {}
+    user.save(update_fields=['avatar', 'avatar_variants'])
+
+    run_in_background(process_avatar, user.pk, user.avatar.name, stale_names)
+    return user
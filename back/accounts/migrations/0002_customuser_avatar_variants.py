@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Processed square avatar files keyed by pixel size', verbose_name='Avatar variants'),
+        ),
+    ]
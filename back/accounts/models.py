@@ -83,6 +83,8 @@ class CustomUser(AbstractUser):
     reset_code = models.CharField(max_length=6, blank=True, null=True, verbose_name=_('Password reset code'))
     reset_code_created = models.DateTimeField(null=True, blank=True)
     avatar = models.ImageField(upload_to=user_avatar_path, null=True, blank=True, verbose_name=_('Avatar'))
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_('Avatar variants'),
+                                       help_text=_('Processed square avatar files keyed by pixel size'))
 
     role = models.CharField(
         max_length=20, 
@@ -108,6 +110,16 @@ class CustomUser(AbstractUser):
     def has_role(self, role_name):
         return self.role == role_name or self.is_superuser
 
+    def get_avatar_url(self, size=None):
+        """Return the URL of the processed avatar variant, falling back to the raw upload"""
+        if not self.avatar:
+            return None
+        size = size or getattr(settings, 'AVATAR_DISPLAY_SIZE', 128)
+        variant = (self.avatar_variants or {}).get(str(size))
+        if variant:
+            return self.avatar.storage.url(variant)
+        return self.avatar.url
+
     def generate_verification_code(self, length=6):
         """Generate a random verification code"""
         if length < 4: length = 4
@@ -4,6 +4,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext_lazy as _
 from typing import Dict, Any, Optional
 from .models import UserProfile
+from .avatars import replace_avatar
 from django.db import transaction
 import logging
 
@@ -70,6 +71,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     is_active = serializers.BooleanField(read_only=True)
     is_staff = serializers.BooleanField(read_only=True)
     avatar_url = serializers.SerializerMethodField()
+    avatar_urls = serializers.SerializerMethodField()
 
     # Profile fields
     bio = serializers.CharField(source='profile.bio', read_only=True, allow_null=True)
@@ -93,7 +95,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'uuid',
             'email', 'first_name', 'last_name', 'phone_number', 'date_of_birth',
-            'avatar_url',
+            'avatar_url', 'avatar_urls',
             'is_verified', 'is_active', 'is_staff', 'date_joined',
             # Profile fields
             'bio', 'company_name', 'company_registration', 'tax_id',
@@ -105,15 +107,23 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_avatar_url(self, obj):
-        """Generate absolute URL for the avatar."""
+        """Generate absolute URL for the display-size avatar variant."""
         request = self.context.get('request')
-        if obj.avatar and hasattr(obj.avatar, 'url') and request:
+        if obj.avatar and request:
             try:
-                return request.build_absolute_uri(obj.avatar.url)
+                return request.build_absolute_uri(obj.get_avatar_url())
             except Exception as e:
                 logger.warning(f"Could not build avatar URL: {e}")
         return None
 
+    def get_avatar_urls(self, obj):
+        """Absolute URLs for every processed avatar size."""
+        request = self.context.get('request')
+        if not obj.avatar_variants or not request:
+            return {}
+        storage = obj.avatar.storage
+        return {size: request.build_absolute_uri(storage.url(name)) for size, name in obj.avatar_variants.items()}
+
     def to_representation(self, instance):
         """Ensure profile fields have defaults if profile relation doesn't exist."""
         rep = super().to_representation(instance)
@@ -193,6 +203,11 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
             else:
                 user_data[field_name] = value
 
+        # Avatars go through the processing pipeline rather than a plain save
+        avatar = user_data.pop('avatar', None)
+        if avatar:
+            replace_avatar(instance, avatar)
+
         # Update User fields
         for attr, value in user_data.items():
             setattr(instance, attr, value)
@@ -0,0 +1,35 @@
+"""Lightweight background execution for work that should not block a request."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+    thread_name_prefix='background-task',
+)
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Background task {func.__name__} failed: {str(e)}", exc_info=True)
+    finally:
+        # Worker threads get their own DB connections; don't leak them
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) in a worker thread once the current transaction commits.
+    Set BACKGROUND_TASKS_EAGER = True to run inline (useful for tests and scripts).
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+
+    transaction.on_commit(lambda: _executor.submit(_run, func, args, kwargs))
@@ -27,6 +27,7 @@ from .utils import (
     debug_request
 )
 from .middleware import track_successful_login
+from .avatars import replace_avatar
 from .permissions import IsOwnerOrAdmin, IsAdminUser
 
 logger = logging.getLogger(__name__)
@@ -756,19 +757,8 @@ class UpdateAvatarView(APIView):
             )
 
         try:
-            user = request.user
-
-            # Delete old avatar file if it exists
-            if user.avatar:
-                try:
-                    storage, path = user.avatar.storage, user.avatar.path
-                    storage.delete(path)
-                except Exception as e:
-                    logger.warning(f"Failed to delete old avatar: {str(e)}")
-
-            # Save new avatar
-            user.avatar = avatar_file
-            user.save()
+            # Store the raw upload now; resizing and old-file cleanup run in the background
+            user = replace_avatar(request.user, avatar_file)
 
             logger.info(f"Avatar updated for user {user.email}")
             return create_response(
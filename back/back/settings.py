@@ -63,6 +63,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'base.middleware.InstrumentationMiddleware',
+    'base.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -145,6 +147,92 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Avatar processing: uploads are cropped to squares of these sizes (px)
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_DISPLAY_SIZE = 128  # Variant referenced by profile and bid payloads
+AVATAR_FORMAT = 'WEBP'
+AVATAR_QUALITY = 85
+
+# Listing facets: price band boundaries (SAR) and result cache lifetime (seconds)
+FACET_PRICE_BANDS = [0, 250000, 500000, 1000000, 2000000, 5000000]
+FACET_CACHE_TIMEOUT = 300
+
+# Reference type registry: reload interval (seconds) when the cache can't share a version key,
+# and how often (seconds) a process compares its copy with the shared version
+TYPE_REGISTRY_TTL = 300
+TYPE_REGISTRY_CHECK_INTERVAL = 1
+
+# Property recommendations: in-memory feature index refresh/rebuild intervals (seconds) and score weights
+RECOMMENDATION_REFRESH_SECONDS = 60
+RECOMMENDATION_REBUILD_SECONDS = 3600
+RECOMMENDATION_MAX_RESULTS = 50
+RECOMMENDATION_WEIGHTS = {
+    'type': 3.0,
+    'city': 2.0,
+    'price': 2.0,
+    'size': 1.0,
+    'amenities': 1.0,
+    'popularity': 0.1,
+}
+
+# Batch media uploads
+MEDIA_BATCH_MAX_FILES = 50
+MEDIA_BATCH_UPLOAD_WORKERS = 4
+
+# Columnar analytics snapshots (manage.py export_analytics)
+ANALYTICS_EXPORT_DIR = os.getenv('ANALYTICS_EXPORT_DIR', os.path.join(BASE_DIR, 'exports'))
+
+# Soft-deleted rows are hard-deleted by manage.py purge_deleted after this many days
+SOFT_DELETE_RETENTION_DAYS = int(os.getenv('SOFT_DELETE_RETENTION_DAYS', 30))
+
+# manage.py archive_bids moves the bids of auctions closed this many days ago to ArchivedBid
+BID_ARCHIVE_AFTER_DAYS = int(os.getenv('BID_ARCHIVE_AFTER_DAYS', 90))
+
+# Longest ?months= window the market stat endpoints accept
+MARKET_STATS_MAX_MONTHS = 120
+
+# Auction analytics count bids in the last auto_extend_minutes before the end,
+# or this many minutes for auctions without auto-extension
+AUCTION_CLOSING_WINDOW_MINUTES = int(os.getenv('AUCTION_CLOSING_WINDOW_MINUTES', 5))
+
+# Admin change lists count rows exactly up to this many, then use the planner estimate;
+# the auction page shows this many latest bids inline
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_INLINE_BIDS = 20
+
+# Watchlist fan-out: packed watcher ids are cached per listing (versioned, bumped on follow/unfollow)
+# and users are loaded this many at a time
+WATCHER_IDS_CACHE_SECONDS = 3600
+WATCHLIST_FANOUT_BATCH_SIZE = 1000
+
+# Auction registration: each auction's registrant ids are cached as one set (versioned,
+# bumped on register/unregister). With AUCTION_REGISTRATION_REQUIRED set to True, bidding
+# requires a registration; it stays False (no check) until the frontend registers
+# bidders and `manage.py backfill_registrations` has run
+AUCTION_REGISTRATION_REQUIRED = False
+REGISTRANTS_CACHE_SECONDS = 3600
+
+# API responses: JSON encoder ('orjson' when installed, else 'json') and
+# Accept-Encoding negotiated compression above a size threshold (bytes); paths whose
+# bodies carry credentials are never compressed (BREACH)
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', 'orjson')
+API_COMPRESSION_MIN_SIZE = 1024
+API_COMPRESSION_TYPES = ('application/json',)
+API_COMPRESSION_EXCLUDED_PATHS = ('/api/accounts/',)
+API_GZIP_LEVEL = 6
+API_BROTLI_QUALITY = 5
+
+# Request instrumentation (base.middleware.InstrumentationMiddleware): share of requests
+# measured, whether they get a Server-Timing header, and how many runs of one SQL shape
+# in a request are logged as a possible N+1
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('INSTRUMENTATION_SAMPLE_RATE', '1.0' if DEBUG else '0.05'))
+INSTRUMENTATION_SERVER_TIMING = True
+INSTRUMENTATION_REPEATED_QUERY_THRESHOLD = 10
+
+# Background work (avatar processing, file cleanup) runs in a small thread pool
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', 2))
+BACKGROUND_TASKS_EAGER = os.getenv('BACKGROUND_TASKS_EAGER', 'False').lower() == 'true'
+
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -160,6 +248,10 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'base.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
@@ -263,10 +355,13 @@ if not DEBUG:
 
 
 
+# ETags, the type registry and the versioned caches keep their version
+# counters here, so this can't be DummyCache (every request would see a new
+# version). LocMemCache is per process: with several worker processes use a
+# shared backend (Redis, Memcached) so every worker sees each bump.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',  # Bypass caching in dev
-        # 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
     }
 }
@@ -302,6 +397,11 @@ LOGGING = {
             'handlers': ['console', 'file'],
             'level': 'INFO',
         },
+        'base.middleware': {  # Request metrics and N+1 warnings
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'accounts': {  # For your accounts app
             'handlers': ['console', 'file'],
             'level': 'DEBUG',  # Set to DEBUG for more detailed logs
@@ -1,11 +1,95 @@
+import io
+import json
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied, ImproperlyConfigured
+from django.core.paginator import Paginator
+from django.db import connections
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from .models import (
     Media, Property, Room, Auction, Bid,
     PropertyType, BuildingType, Location, RoomType,
-    AuctionType
+    AuctionType, Tag, SavedSearch, AuctionAnalytics
+)
+from .media import with_content_objects
+from .auction_analytics import compute_auction_analytics
+from .importers import PropertyImporter, READERS
+from .columnar import write_table, BID_TABLE, AUCTION_TABLE, PROPERTY_TABLE
+from .exports import (
+    streaming_export_response,
+    PROPERTY_EXPORT_COLUMNS, AUCTION_EXPORT_COLUMNS, BID_EXPORT_COLUMNS
 )
 
+
+def export_action(name, columns, file_format):
+    """Admin action streaming the selected rows without loading them into memory"""
+    def action(modeladmin, request, queryset):
+        return streaming_export_response(queryset, columns, name, file_format=file_format)
+    action.__name__ = f'export_{file_format}'
+    action.short_description = _('Export selected as {}').format(file_format.upper())
+    return action
+
+
+def parquet_export_action(table):
+    """Admin action writing the selected rows to one Parquet file for download"""
+    def action(modeladmin, request, queryset):
+        buffer = io.BytesIO()
+        try:
+            write_table(queryset, table, buffer)
+        except ImproperlyConfigured as e:
+            modeladmin.message_user(request, str(e), messages.ERROR)
+            return None
+        response = HttpResponse(buffer.getvalue(), content_type='application/vnd.apache.parquet')
+        response['Content-Disposition'] = f'attachment; filename="{table.name}.parquet"'
+        return response
+    action.__name__ = 'export_parquet'
+    action.short_description = _('Export selected as Parquet')
+    return action
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts rows up to ADMIN_EXACT_COUNT_LIMIT; past that, PostgreSQL's planner
+    estimate stands in for a full COUNT(*). Other backends (SQLite in
+    development) have no estimate and run the full count after the bounded one.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        queryset = self.object_list.order_by()
+        bounded = queryset[:limit + 1].count()
+        if bounded <= limit:
+            return bounded
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return queryset.count()
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(int(plan[0]['Plan']['Plan Rows']), bounded)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Change lists for tables that grow without bound: estimated counts, no
+    second unfiltered count, and no date_hierarchy (its year links need a
+    DISTINCT over the whole table).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 # Type Models Admin
 @admin.register(PropertyType)
 class PropertyTypeAdmin(admin.ModelAdmin):
@@ -41,13 +125,21 @@ class LocationAdmin(admin.ModelAdmin):
 # Media Admin
 # Media Admin
 @admin.register(Media)
-class MediaAdmin(admin.ModelAdmin):
-    list_display = ('name', 'media_type', 'file_size_display', 'is_primary', 'created_at')  # Changed uploaded_at to created_at
+class MediaAdmin(LargeTableAdmin):
+    list_display = ('name', 'media_type', 'content_object_display', 'file_size_display', 'is_primary', 'created_at')  # Changed uploaded_at to created_at
     list_filter = ('media_type', 'is_primary', 'created_at')  # Changed uploaded_at to created_at
     search_fields = ('name', 'content_type')
     readonly_fields = ('file_size', 'mime_type', 'width', 'height', 'created_at')  # Changed uploaded_at to created_at
     ordering = ('-created_at',)  # Changed uploaded_at to created_at
 
+    def get_queryset(self, request):
+        # One query per target model instead of one per row
+        return with_content_objects(super().get_queryset(request))
+
+    def content_object_display(self, obj):
+        return str(obj.content_object) if obj.content_object is not None else '-'
+    content_object_display.short_description = _('Attached To')
+
     def file_size_display(self, obj):
         """Convert file size to human readable format"""
         if not obj.file_size:
@@ -65,21 +157,36 @@ class RoomInline(admin.TabularInline):
     fields = ('name', 'room_type', 'floor', 'area_sqm', 'has_window', 'has_bathroom')
 
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
+class RoomAdmin(LargeTableAdmin):
     list_display = ('name', 'property', 'room_type', 'floor', 'area_sqm')
     list_filter = ('room_type', 'floor', 'has_window', 'has_bathroom')
+    list_select_related = ('property', 'room_type')
     search_fields = ('name', 'property__title')
+    autocomplete_fields = ('property',)
     readonly_fields = ('created_at', 'updated_at')
 
 # Property Admin
+class PropertyImportForm(forms.Form):
+    file = forms.FileField(label=_('File'))
+    format = forms.ChoiceField(label=_('Format'), choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')])
+    publish = forms.BooleanField(label=_('Publish imported properties'), required=False)
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'kind')
+    list_filter = ('kind',)
+    search_fields = ('name', 'slug')
+
 @admin.register(Property)
-class PropertyAdmin(admin.ModelAdmin):
+class PropertyAdmin(LargeTableAdmin):
     list_display = ('title', 'property_number', 'property_type', 'building_type', 'status', 'market_value', 'is_published')
     list_filter = (
         'property_type', 'building_type', 'status',
-        'is_published', 'is_featured', 'is_verified'
+        'is_published', 'is_featured', 'is_verified', 'created_at'
     )
+    list_select_related = ('property_type', 'building_type')
     search_fields = ('title', 'slug', 'deed_number', 'property_number')
+    autocomplete_fields = ('location', 'owner')
     readonly_fields = (
         'property_number', 'slug', 'created_at',
         'updated_at', 'view_count'
@@ -112,29 +219,97 @@ class PropertyAdmin(admin.ModelAdmin):
         }),
     )
     inlines = [RoomInline]
-    date_hierarchy = 'created_at'
+    change_list_template = 'admin/base/property/change_list.html'
+    actions = [
+        export_action('properties', PROPERTY_EXPORT_COLUMNS, 'csv'),
+        export_action('properties', PROPERTY_EXPORT_COLUMNS, 'jsonl'),
+        parquet_export_action(PROPERTY_TABLE),
+    ]
+
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='base_property_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        """Streaming CSV/JSONL upload; rows are owned by the uploading admin"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        result = None
+        form = PropertyImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            stream = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            importer = PropertyImporter(
+                owner=request.user,
+                publish=True if form.cleaned_data['publish'] else None,
+            )
+            result = importer.run(READERS[form.cleaned_data['format']](stream))
+            self.message_user(request, _('Imported {} of {} rows ({} errors)').format(
+                result.created, result.processed, len(result.errors)
+            ))
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _('Import properties'),
+            'form': form,
+            'result': result,
+            'errors': result.errors[:500] if result else [],
+        }
+        return TemplateResponse(request, 'admin/base/property/import_form.html', context)
 
 # Bid Admin
+class RecentBidsFormSet(forms.BaseInlineFormSet):
+    def get_queryset(self):
+        # One sliced queryset per formset, so its result cache is shared by every form
+        if not hasattr(self, '_recent_bids'):
+            self._recent_bids = super().get_queryset()[:settings.ADMIN_INLINE_BIDS]
+        return self._recent_bids
+
+
 class BidInline(admin.TabularInline):
+    """Read-only view of the latest bids; the full list is the filtered bid change list"""
     model = Bid
+    formset = RecentBidsFormSet
     extra = 0
     fields = ('bidder', 'bid_amount', 'status', 'bid_time')
-    readonly_fields = ('bid_time',)
+    readonly_fields = fields
+    ordering = ('-bid_time',)
+    can_delete = False
+    show_change_link = True
+    verbose_name_plural = _('Latest bids')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('bidder', 'auction')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(LargeTableAdmin):
     list_display = ('auction', 'bidder', 'bid_amount', 'status', 'bid_time', 'is_verified')
     list_filter = ('status', 'is_verified', 'bid_time')
+    list_select_related = ('auction', 'bidder')
     search_fields = ('auction__title', 'bidder__email')
+    raw_id_fields = ('auction', 'bidder')
     readonly_fields = (
         'created_at', 'updated_at', 'ip_address',
         'verification_method'
     )
-    date_hierarchy = 'bid_time'
+    actions = [
+        export_action('bids', BID_EXPORT_COLUMNS, 'csv'),
+        export_action('bids', BID_EXPORT_COLUMNS, 'jsonl'),
+        parquet_export_action(BID_TABLE),
+    ]
 
 # Auction Admin
 @admin.register(Auction)
-class AuctionAdmin(admin.ModelAdmin):
+class AuctionAdmin(LargeTableAdmin):
     list_display = (
         'title', 'auction_type', 'status',
         'start_date', 'end_date', 'current_bid',
@@ -144,10 +319,12 @@ class AuctionAdmin(admin.ModelAdmin):
         'auction_type', 'status', 'is_published',
         'is_featured', 'start_date'
     )
+    list_select_related = ('auction_type',)
     search_fields = ('title', 'slug', 'description')
+    autocomplete_fields = ('related_property',)
     readonly_fields = (
         'slug', 'created_at', 'updated_at',
-        'bid_count', 'current_bid', 'view_count',
+        'bid_count', 'all_bids_link', 'current_bid', 'view_count',
         'registered_bidders'
     )
     fieldsets = (
@@ -182,7 +359,7 @@ class AuctionAdmin(admin.ModelAdmin):
         }),
         (_('Statistics'), {
             'fields': (
-                'bid_count', 'view_count',
+                'bid_count', 'all_bids_link', 'view_count',
                 'registered_bidders'
             ),
             'classes': ('collapse',)
@@ -193,4 +370,73 @@ class AuctionAdmin(admin.ModelAdmin):
         }),
     )
     inlines = [BidInline]
-    date_hierarchy = 'start_date'
\ No newline at end of file
+    actions = [
+        export_action('auctions', AUCTION_EXPORT_COLUMNS, 'csv'),
+        export_action('auctions', AUCTION_EXPORT_COLUMNS, 'jsonl'),
+        parquet_export_action(AUCTION_TABLE),
+    ]
+
+    def all_bids_link(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:base_bid_changelist') + f'?auction__id__exact={obj.pk}'
+        return format_html('<a href="{}">{}</a>', url, _('All bids of this auction'))
+    all_bids_link.short_description = _('Bids')
+
+# Auction Analytics Admin (computed rows, read-only)
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+@admin.register(AuctionAnalytics)
+class AuctionAnalyticsAdmin(LargeTableAdmin):
+    list_display = (
+        'auction', 'bid_count', 'distinct_bidders', 'time_to_first_bid',
+        'peak_bids_per_minute', 'closing_share', 'price_to_start',
+        'price_to_market', 'computed_at'
+    )
+    list_select_related = ('auction',)
+    search_fields = ('auction__title',)
+    readonly_fields = (
+        'auction', 'bid_count', 'distinct_bidders', 'first_bid_at',
+        'time_to_first_bid', 'peak_bids_per_minute', 'velocity_chart',
+        'closing_window_minutes', 'closing_window_bids', 'closing_share',
+        'final_price', 'price_to_start', 'price_to_market', 'computed_at'
+    )
+    exclude = ('velocity',)
+    actions = ['recompute']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def closing_share(self, obj):
+        share = obj.closing_window_share
+        return f'{share:.0%}' if share is not None else '-'
+    closing_share.short_description = _('Closing window share')
+
+    def velocity_chart(self, obj):
+        counts = obj.velocity.get('counts', [])
+        peak = max(counts, default=0)
+        if not peak:
+            return '-'
+        bars = ''.join(SPARK_CHARS[round(count / peak * (len(SPARK_CHARS) - 1))] for count in counts)
+        return f"{bars}  ({obj.velocity['bucket_seconds'] // 60} min/bucket)"
+    velocity_chart.short_description = _('Bid velocity')
+
+    def recompute(self, request, queryset):
+        for auction_id in queryset.values_list('auction_id', flat=True):
+            compute_auction_analytics(auction_id)
+        self.message_user(request, _('Analytics recomputed.'), messages.SUCCESS)
+    recompute.short_description = _('Recompute selected analytics')
+
+# Saved Search Admin
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'target', 'city', 'notify', 'created_at')
+    list_filter = ('target', 'notify')
+    search_fields = ('name', 'user__email', 'city')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    readonly_fields = ('city', 'listing_type_id', 'price_min', 'price_max', 'created_at', 'updated_at')
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Per-auction bidding analytics, computed in one streaming pass over the bids
+when an auction closes and stored in AuctionAnalytics.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+
+from .bid_archive import CLOSED_STATUSES
+from .models import Auction, Bid, ArchivedBid, AuctionAnalytics
+
+CHUNK_SIZE = 2000
+# The velocity series is downsampled to at most this many buckets
+VELOCITY_BUCKETS = 120
+
+
+def _velocity(per_minute, minutes):
+    """Fold per-minute counts into at most VELOCITY_BUCKETS buckets of whole minutes"""
+    width = max(1, math.ceil(minutes / VELOCITY_BUCKETS))
+    counts = [0] * max(1, math.ceil(minutes / width))
+    for minute, count in per_minute.items():
+        counts[min(minute // width, len(counts) - 1)] += count
+    return {'bucket_seconds': width * 60, 'counts': counts}
+
+
+def compute_auction_analytics(auction_id):
+    """(Re)compute the analytics of one auction; returns None if it no longer exists"""
+    auction = Auction.all_objects.select_related('related_property').filter(pk=auction_id).first()
+    if auction is None:
+        return None
+    source = ArchivedBid.objects if auction.bids_archived_at else Bid.objects
+    window = auction.auto_extend_minutes or settings.AUCTION_CLOSING_WINDOW_MINUTES
+    window_start = auction.end_date - timedelta(minutes=window)
+
+    bid_count = closing_bids = 0
+    bidders, per_minute = set(), {}
+    first_bid_at, last_bid_at, highest = None, None, None
+    # Rejected bids never counted towards the price or the bidding activity
+    rows = (
+        source.filter(auction_id=auction.pk).exclude(status='rejected')
+        .order_by().values_list('bidder_id', 'bid_amount', 'bid_time')
+    )
+    for bidder_id, amount, bid_time in rows.iterator(chunk_size=CHUNK_SIZE):
+        bid_count += 1
+        bidders.add(bidder_id)
+        minute = max(0, int((bid_time - auction.start_date).total_seconds() // 60))
+        per_minute[minute] = per_minute.get(minute, 0) + 1
+        if bid_time >= window_start:
+            closing_bids += 1
+        if first_bid_at is None or bid_time < first_bid_at:
+            first_bid_at = bid_time
+        if last_bid_at is None or bid_time > last_bid_at:
+            last_bid_at = bid_time
+        if highest is None or amount > highest:
+            highest = amount
+
+    # Bids after end_date (late auto-extensions) stretch the series
+    closed_at = max(auction.end_date, last_bid_at) if last_bid_at else auction.end_date
+    minutes = max(1, math.ceil((closed_at - auction.start_date).total_seconds() / 60))
+    final_price = highest if highest is not None else auction.current_bid
+    market_value = auction.related_property.market_value if auction.related_property else None
+
+    analytics, _ = AuctionAnalytics.objects.update_or_create(
+        auction_id=auction.pk,
+        defaults={
+            'bid_count': bid_count,
+            'distinct_bidders': len(bidders),
+            'first_bid_at': first_bid_at,
+            'time_to_first_bid': first_bid_at - auction.start_date if first_bid_at else None,
+            'peak_bids_per_minute': max(per_minute.values(), default=0),
+            'velocity': _velocity(per_minute, minutes),
+            'closing_window_minutes': window,
+            'closing_window_bids': closing_bids,
+            'final_price': final_price,
+            'price_to_start': float(final_price / auction.starting_bid) if final_price and auction.starting_bid else None,
+            'price_to_market': float(final_price / market_value) if final_price and market_value else None,
+        },
+    )
+    return analytics
+
+
+def auctions_missing_analytics():
+    """Closed auctions without computed analytics"""
+    return Auction.objects.filter(status__in=CLOSED_STATUSES, analytics__isnull=True)
@@ -0,0 +1,68 @@
+"""
+Cold storage for the bids of long-closed auctions.
+
+archive_auction_bids() copies bids into ArchivedBid and removes them from the
+hot Bid table, one transaction per chunk of auctions, so Bid and its indexes
+only hold the bids of auctions that are open or recently closed.
+bid_history() reads both tables as one queryset.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Value, BooleanField
+from django.utils import timezone
+
+from .conditional import bump_model_version
+from .models import Auction, Bid, ArchivedBid
+
+CLOSED_STATUSES = ('ended', 'cancelled', 'completed')
+ARCHIVE_FIELDS = (
+    'id', 'auction_id', 'bidder_id', 'bid_amount', 'max_bid_amount',
+    'bid_time', 'status', 'is_verified',
+)
+INSERT_BATCH_SIZE = 1000
+
+
+def archivable_auctions(closed_before):
+    """Auctions closed before `closed_before` that still have rows in Bid"""
+    return Auction.all_objects.filter(
+        status__in=CLOSED_STATUSES, end_date__lt=closed_before
+    ).filter(Exists(Bid.all_objects.filter(auction=OuterRef('pk'))))
+
+
+def archive_auction_bids(auction_ids):
+    """Move the live bids of these auctions to ArchivedBid; soft-deleted bids are dropped"""
+    with transaction.atomic():
+        # ignore_conflicts skips ids already in the archive, so count what landed
+        archived = ArchivedBid.objects.filter(auction_id__in=auction_ids)
+        before = archived.count()
+        rows = (
+            Bid.objects.filter(auction_id__in=auction_ids)
+            .order_by('id').values_list(*ARCHIVE_FIELDS)
+        )
+        batch = []
+        for row in rows.iterator(chunk_size=INSERT_BATCH_SIZE):
+            batch.append(ArchivedBid(**dict(zip(ARCHIVE_FIELDS, row))))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                ArchivedBid.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            ArchivedBid.objects.bulk_create(batch, ignore_conflicts=True)
+        moved = archived.count() - before
+
+        # Bids have no dependents; a raw DELETE skips the collector's per-row signals
+        Bid.all_objects.filter(auction_id__in=auction_ids)._raw_delete(Bid.all_objects.db)
+        Auction.all_objects.filter(pk__in=auction_ids).update(bids_archived_at=timezone.now())
+        for model in (Bid, ArchivedBid, Auction):
+            transaction.on_commit(lambda model=model: bump_model_version(model))
+    return moved
+
+
+def bid_history(**filters):
+    """Live and archived bids matching `filters` as one values() queryset, newest first"""
+    # Each side of a UNION must drop the model's default ordering
+    live = Bid.objects.filter(**filters).order_by().values(*ARCHIVE_FIELDS).annotate(
+        archived=Value(False, output_field=BooleanField())
+    )
+    archived = ArchivedBid.objects.filter(**filters).order_by().values(*ARCHIVE_FIELDS).annotate(
+        archived=Value(True, output_field=BooleanField())
+    )
+    return live.union(archived, all=True).order_by('-bid_time', '-id')
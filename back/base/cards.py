@@ -0,0 +1,108 @@
+"""Maintenance of the PropertyCard projection used by list pages."""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q, OuterRef, Subquery, Value, CharField
+from django.db.models.functions import Coalesce
+
+from .models import Property, PropertyCard, Media
+
+CHUNK_SIZE = 500
+
+# Card column -> expression/path on Property
+CARD_SOURCES = {
+    'title': 'title',
+    'slug': 'slug',
+    'property_number': 'property_number',
+    'deed_number': 'deed_number',
+    'status': 'status',
+    'property_type_id': 'property_type_id',
+    'property_type_name': 'property_type__name',
+    'building_type_id': 'building_type_id',
+    'building_type_name': 'building_type__name',
+    'city': 'location__city',
+    'state': 'location__state',
+    'market_value': 'market_value',
+    'minimum_bid': 'minimum_bid',
+    'size_sqm': 'size_sqm',
+    'year_built': 'year_built',
+    'main_image_url': '_main_image',
+    'room_count': '_room_count',
+    'bathroom_count': '_bathroom_count',
+    'is_published': 'is_published',
+    'is_featured': 'is_featured',
+    'created_at': 'created_at',
+}
+CARD_FIELDS = list(CARD_SOURCES)
+
+# Property fields that feed the card; saves touching none of them skip the refresh
+PROPERTY_SOURCE_FIELDS = {
+    'title', 'slug', 'property_number', 'deed_number', 'status', 'property_type', 'building_type',
+    'location', 'market_value', 'minimum_bid', 'size_sqm', 'year_built',
+    'is_published', 'is_featured',
+}
+
+
+def _card_values(property_ids):
+    property_type = ContentType.objects.get_for_model(Property)
+    # Same choice as Property.get_main_image(): the primary image, else the first one
+    main_image = (
+        Media.objects.filter(content_type=property_type, object_id=OuterRef('pk'), media_type='image')
+        .order_by('-is_primary', 'order', 'id')
+        .values('file')[:1]
+    )
+    return (
+        Property.objects.filter(pk__in=property_ids)
+        .order_by()
+        .annotate(
+            _main_image=Coalesce(Subquery(main_image), Value(''), output_field=CharField()),
+            _room_count=Count('rooms', filter=Q(rooms__is_deleted=False)),
+            _bathroom_count=Count('rooms', filter=Q(rooms__is_deleted=False, rooms__has_bathroom=True)),
+        )
+        .values('pk', *CARD_SOURCES.values())
+    )
+
+
+def build_cards(property_ids):
+    storage = Media._meta.get_field('file').storage
+    cards = []
+    for row in _card_values(property_ids):
+        values = {field: row[source] for field, source in CARD_SOURCES.items()}
+        for field in ('property_type_name', 'building_type_name', 'city', 'state', 'property_number', 'deed_number'):
+            values[field] = values[field] or ''
+        # The URL MediaSerializer serves for the same file
+        if values['main_image_url']:
+            values['main_image_url'] = storage.url(values['main_image_url'])
+        cards.append(PropertyCard(property_id=row['pk'], **values))
+    return cards
+
+
+def refresh_cards(property_ids):
+    """Recompute and upsert the cards of the given properties"""
+    property_ids = list({pk for pk in property_ids if pk})
+    for start in range(0, len(property_ids), CHUNK_SIZE):
+        cards = build_cards(property_ids[start:start + CHUNK_SIZE])
+        if cards:
+            PropertyCard.objects.bulk_create(
+                cards,
+                update_conflicts=True,
+                unique_fields=['property'],
+                update_fields=CARD_FIELDS + ['refreshed_at'],
+            )
+
+
+def find_card_drift(property_ids):
+    """
+    Compare stored cards with freshly computed ones.
+    Returns (missing property ids, {property id: [differing fields]}).
+    """
+    expected = {card.property_id: card for card in build_cards(property_ids)}
+    stored = PropertyCard.objects.in_bulk(list(expected))
+    missing, stale = [], {}
+    for pk, card in expected.items():
+        current = stored.get(pk)
+        if current is None:
+            missing.append(pk)
+            continue
+        fields = [field for field in CARD_FIELDS if getattr(current, field) != getattr(card, field)]
+        if fields:
+            stale[pk] = fields
+    return missing, stale
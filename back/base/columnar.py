@@ -0,0 +1,260 @@
+"""
+Columnar (Parquet / Arrow IPC) snapshots of auctions, bids and properties
+for analytics. Files are partitioned by month and written incrementally from
+a watermark on updated_at, so nightly runs only pick up changed rows.
+
+pyarrow is an optional dependency and is only imported when exporting.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Property, Auction, Bid
+
+WATERMARK_FILE = '_watermark.json'
+FILE_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImproperlyConfigured("Columnar exports require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _arrow_type(pa, kind):
+    return {
+        'int': pa.int64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'money': pa.decimal128(14, 2),
+        'area': pa.decimal128(10, 2),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }[kind]
+
+
+class ColumnarTable:
+    """
+    One exported table: `columns` are (name, values() path, kind) and
+    `partition_by` the datetime path whose month names the partition.
+    """
+
+    def __init__(self, name, model, columns, partition_by, partition_name):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.partition_by = partition_by
+        self.partition_name = partition_name
+
+    def schema(self):
+        pa = _pyarrow()
+        return pa.schema([(name, _arrow_type(pa, kind)) for name, _, kind in self.columns])
+
+    def changed(self, since, until):
+        # Tombstones are exported too, so snapshots see deletions
+        queryset = self.model.all_objects.filter(updated_at__lte=until)
+        if since is not None:
+            queryset = queryset.filter(updated_at__gt=since)
+        return queryset
+
+
+class AuctionTable(ColumnarTable):
+    def changed(self, since, until):
+        # Bid.save() moves Auction.updated_at along with current_bid/bid_count;
+        # the bid check also re-exports auctions whose bids changed through
+        # queryset updates, which never touch the auction row
+        queryset = Auction.all_objects.all()
+        if since is None:
+            return queryset.filter(updated_at__lte=until)
+        new_bids = Bid.all_objects.filter(auction=OuterRef('pk'), updated_at__gt=since, updated_at__lte=until)
+        return queryset.filter(
+            Q(updated_at__gt=since, updated_at__lte=until) | Q(Exists(new_bids))
+        )
+
+
+BID_TABLE = ColumnarTable('bids', Bid, [
+    ('id', 'id', 'int'),
+    ('auction_id', 'auction_id', 'int'),
+    ('bidder_id', 'bidder_id', 'int'),
+    ('bid_amount', 'bid_amount', 'money'),
+    ('max_bid_amount', 'max_bid_amount', 'money'),
+    ('status', 'status', 'string'),
+    ('is_verified', 'is_verified', 'bool'),
+    ('bid_time', 'bid_time', 'timestamp'),
+    ('auction_end_date', 'auction__end_date', 'timestamp'),
+    ('created_at', 'created_at', 'timestamp'),
+    ('updated_at', 'updated_at', 'timestamp'),
+], partition_by='auction__end_date', partition_name='end_month')
+
+AUCTION_TABLE = AuctionTable('auctions', Auction, [
+    ('id', 'id', 'int'),
+    ('slug', 'slug', 'string'),
+    ('auction_type', 'auction_type__code', 'string'),
+    ('status', 'status', 'string'),
+    ('property_id', 'related_property_id', 'int'),
+    ('start_date', 'start_date', 'timestamp'),
+    ('end_date', 'end_date', 'timestamp'),
+    ('starting_bid', 'starting_bid', 'money'),
+    ('current_bid', 'current_bid', 'money'),
+    ('minimum_increment', 'minimum_increment', 'money'),
+    ('bid_count', 'bid_count', 'int'),
+    ('registered_bidders', 'registered_bidders', 'int'),
+    ('view_count', 'view_count', 'int'),
+    ('is_published', 'is_published', 'bool'),
+    ('is_deleted', 'is_deleted', 'bool'),
+    ('created_at', 'created_at', 'timestamp'),
+    ('updated_at', 'updated_at', 'timestamp'),
+], partition_by='end_date', partition_name='end_month')
+
+# Properties have no single auction, so they are partitioned by update month
+PROPERTY_TABLE = ColumnarTable('properties', Property, [
+    ('id', 'id', 'int'),
+    ('property_number', 'property_number', 'string'),
+    ('property_type', 'property_type__code', 'string'),
+    ('building_type', 'building_type__code', 'string'),
+    ('status', 'status', 'string'),
+    ('city', 'location__city', 'string'),
+    ('state', 'location__state', 'string'),
+    ('size_sqm', 'size_sqm', 'area'),
+    ('year_built', 'year_built', 'int'),
+    ('market_value', 'market_value', 'money'),
+    ('minimum_bid', 'minimum_bid', 'money'),
+    ('owner_id', 'owner_id', 'int'),
+    ('is_published', 'is_published', 'bool'),
+    ('is_deleted', 'is_deleted', 'bool'),
+    ('created_at', 'created_at', 'timestamp'),
+    ('updated_at', 'updated_at', 'timestamp'),
+], partition_by='updated_at', partition_name='updated_month')
+
+TABLES = {table.name: table for table in (BID_TABLE, AUCTION_TABLE, PROPERTY_TABLE)}
+
+
+class _BatchWriter:
+    """Buffers rows column-wise and writes them as record batches"""
+
+    def __init__(self, path, schema, file_format, batch_rows):
+        pa = _pyarrow()
+        self.pa = pa
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.buffer = [[] for _ in schema]
+        self.rows = 0
+        if file_format == 'arrow':
+            self.writer = pa.ipc.new_file(path, schema)
+        else:
+            self.writer = pa.parquet.ParquetWriter(path, schema, compression='zstd')
+
+    def append(self, row):
+        for column, value in zip(self.buffer, row):
+            column.append(value)
+        self.rows += 1
+        if len(self.buffer[0]) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer[0]:
+            return
+        arrays = [
+            self.pa.array(values, type=field.type)
+            for values, field in zip(self.buffer, self.schema)
+        ]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.buffer = [[] for _ in self.schema]
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def _rows(queryset, table, extra=(), chunk_size=5000):
+    paths = [path for _, path, _ in table.columns] + list(extra)
+    return (
+        queryset.order_by().prefetch_related(None)
+        .values_list(*paths)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def write_table(queryset, table, sink, file_format='parquet', batch_rows=50000):
+    """Write one unpartitioned file (a path or file-like sink); returns the row count"""
+    writer = _BatchWriter(sink, table.schema(), file_format, batch_rows)
+    try:
+        for row in _rows(queryset, table):
+            writer.append(row)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def write_partitioned(queryset, table, directory, run_name, file_format='parquet', batch_rows=50000):
+    """
+    Write rows into <directory>/<table>/<partition>=YYYY-MM/part-<run_name>.<ext>,
+    one writer per month touched. Returns the row count.
+    """
+    schema = table.schema()
+    writers = {}
+    rows = 0
+    try:
+        for *row, partition_value in _rows(queryset, table, extra=[table.partition_by]):
+            month = f'{partition_value:%Y-%m}' if partition_value else 'unknown'
+            writer = writers.get(month)
+            if writer is None:
+                part_dir = os.path.join(directory, table.name, f'{table.partition_name}={month}')
+                os.makedirs(part_dir, exist_ok=True)
+                path = os.path.join(part_dir, f'part-{run_name}.{FILE_EXTENSIONS[file_format]}')
+                writer = writers[month] = _BatchWriter(path, schema, file_format, batch_rows)
+            writer.append(row)
+            rows += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
+
+
+def read_watermark(directory):
+    try:
+        with open(os.path.join(directory, WATERMARK_FILE)) as f:
+            return {name: parse_datetime(value) for name, value in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def write_watermark(directory, watermarks):
+    path = os.path.join(directory, WATERMARK_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({name: value.isoformat() for name, value in watermarks.items()}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def export_snapshots(directory=None, tables=None, file_format='parquet', full=False, batch_rows=50000):
+    """
+    Export rows changed since each table's watermark (everything when `full`)
+    and advance the watermark. Snapshots are append-only: a row updated twice
+    appears in two runs, so readers should keep the latest `updated_at` per id.
+    """
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unsupported format '{file_format}'")
+    _pyarrow()
+
+    directory = directory or settings.ANALYTICS_EXPORT_DIR
+    os.makedirs(directory, exist_ok=True)
+    watermarks = read_watermark(directory)
+    until = timezone.now()
+    run_name = until.strftime('%Y%m%dT%H%M%S%f')
+
+    counts = {}
+    for name in tables or TABLES:
+        table = TABLES[name]
+        since = None if full else watermarks.get(name)
+        queryset = table.changed(since, until)
+        counts[name] = write_partitioned(queryset, table, directory, run_name, file_format, batch_rows)
+        watermarks[name] = until
+        write_watermark(directory, watermarks)
+    return counts
@@ -0,0 +1,78 @@
+"""
+Validators for conditional GETs (ETag / Last-Modified).
+
+A listing's own rows are versioned by their modification timestamp. Related
+rows rendered alongside it (rooms, media, bids, users, types) are versioned
+per model: every save or delete bumps a counter in the shared cache (see
+signals.py), and bulk writes that bypass signals bump it explicitly.
+
+get_version/bump_version do the same for any key; caches filled from the
+database put the version in their own key, so a fill that read rows from
+before a write lands under a version nobody reads any more.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+
+from .instrumentation import record_cache
+
+# Apps whose model changes bump a version
+VERSIONED_APPS = ('base', 'accounts')
+
+
+def _version_key(model):
+    return f'conditional_version:{model._meta.label_lower}'
+
+
+def bump_model_version(model):
+    cache.set(_version_key(model), time.time_ns(), None)
+
+
+def get_version(key, timeout=None):
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key, timeout=None):
+    cache.set(key, time.time_ns(), timeout)
+
+
+def model_versions(models):
+    """Current version of each model, ordered by label"""
+    keys = sorted(_version_key(model) for model in models)
+    versions = cache.get_many(keys)
+    record_cache(hits=len(versions), misses=len(keys) - len(versions))
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return tuple(versions[key] for key in keys)
+
+
+def related_models(model, lookups):
+    """Models reached by select_related/prefetch_related lookups from `model`"""
+    models = set()
+    for lookup in lookups:
+        current = model
+        for name in lookup.split('__'):
+            try:
+                current = current._meta.get_field(name).related_model
+            except FieldDoesNotExist:
+                break
+            if current is None:
+                break
+            models.add(current)
+    return models
+
+
+def make_etag(*parts):
+    raw = repr(parts)
+    return 'W/"{}"'.format(hashlib.md5(raw.encode('utf-8')).hexdigest())
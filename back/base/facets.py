@@ -0,0 +1,180 @@
+"""Facet counts for listing endpoints, computed with one grouped query per facet and cached."""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, When, Value, Count, F, IntegerField
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan
+
+from .instrumentation import record_cache
+
+FACETS_VERSION_KEY = 'listing_facets_version'
+
+# Query parameters that don't change which rows match
+NON_FILTER_PARAMS = {'page', 'page_size', 'facets', 'ordering', 'cursor', 'format'}
+
+
+def get_price_bands():
+    return list(getattr(settings, 'FACET_PRICE_BANDS', [0, 250000, 500000, 1000000, 2000000, 5000000]))
+
+
+def price_band_expression(source):
+    """SQL CASE mapping a money field (or expression) to the index of its price band"""
+    bands = get_price_bands()
+    source = _expression(source)
+    whens = [
+        When(LessThan(source, upper), then=Value(index))
+        for index, upper in enumerate(bands[1:])
+    ]
+    return Case(*whens, default=Value(len(bands) - 1), output_field=IntegerField())
+
+
+def price_band_label(index):
+    bands = get_price_bands()
+    if index is None:
+        return None
+    if index >= len(bands) - 1:
+        return f"{bands[-1]}+"
+    return f"{bands[index]}-{bands[index + 1]}"
+
+
+class Facet:
+    """
+    One facet dimension: `value` is a field path or expression to group by,
+    `label` an optional field path grouped alongside it (e.g. a type name),
+    and `display` an optional function turning a value into a label.
+    """
+
+    def __init__(self, value, label=None, display=None):
+        self.value = value
+        self.label = label
+        self.display = display
+
+
+class TagFacet:
+    """
+    Multi-valued facet over Property tags. Counted in its own query on the
+    tag link table, since joining it into the grouped query would multiply rows.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def count(self, queryset):
+        from .models import PropertyTag
+        rows = (
+            PropertyTag.objects.filter(tag__kind=self.kind, property_id__in=queryset.order_by().values('id'))
+            .values('tag__slug', 'tag__name')
+            .annotate(count=Count('property_id'))
+            .order_by('-count', 'tag__slug')
+        )
+        return [{'value': row['tag__slug'], 'label': row['tag__name'], 'count': row['count']} for row in rows]
+
+
+def property_facets():
+    from .models import Property
+    status_labels = dict(Property.STATUS_CHOICES)
+    return {
+        'property_type': Facet('property_type', label='property_type__name'),
+        'building_type': Facet('building_type', label='building_type__name'),
+        'status': Facet('status', display=lambda value: str(status_labels.get(value, value))),
+        'city': Facet('location__city'),
+        'price_band': Facet(price_band_expression('market_value'), display=price_band_label),
+        'amenities': TagFacet('amenity'),
+        'features': TagFacet('feature'),
+    }
+
+
+def auction_facets():
+    from .models import Auction
+    status_labels = dict(Auction.STATUS_CHOICES)
+    return {
+        'auction_type': Facet('auction_type', label='auction_type__name'),
+        'status': Facet('status', display=lambda value: str(status_labels.get(value, value))),
+        'city': Facet('related_property__location__city'),
+        'property_type': Facet('related_property__property_type', label='related_property__property_type__name'),
+        'price_band': Facet(
+            price_band_expression(Coalesce('current_bid', 'starting_bid')), display=price_band_label
+        ),
+    }
+
+
+def _expression(value):
+    return F(value) if isinstance(value, str) else value
+
+
+def compute_facets(queryset, facets, names):
+    """
+    Count rows per value for every requested facet, one GROUP BY per facet, so
+    the rows read grow with the sum of the facets' values rather than their
+    product. Tag facets are counted on the tag link table.
+    """
+    result = {}
+    for name in names:
+        facet = facets[name]
+        if isinstance(facet, TagFacet):
+            result[name] = facet.count(queryset)
+            continue
+
+        annotations = {'_facet_value': _expression(facet.value)}
+        if facet.label:
+            annotations['_facet_label'] = F(facet.label)
+        rows = (
+            queryset.order_by().prefetch_related(None)
+            .annotate(**annotations)
+            .values(*annotations)
+            .annotate(_facet_count=Count('pk'))
+            .order_by()
+        )
+
+        buckets = []
+        for row in rows:
+            value = row['_facet_value']
+            if facet.label:
+                label = row['_facet_label']
+            elif facet.display:
+                label = facet.display(value)
+            else:
+                label = value
+            buckets.append({'value': value, 'label': label, 'count': row['_facet_count']})
+        buckets.sort(key=lambda bucket: (-bucket['count'], str(bucket['value'])))
+        result[name] = buckets
+    return result
+
+
+def get_facets_version():
+    version = cache.get(FACETS_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(FACETS_VERSION_KEY, version, None):
+            version = cache.get(FACETS_VERSION_KEY, version)
+    return version
+
+
+def bump_facets_version():
+    """Invalidate every cached facet result (called when listings change)"""
+    cache.set(FACETS_VERSION_KEY, time.time_ns(), None)
+
+
+def facet_cache_key(prefix, query_params, names):
+    """Cache key from the normalized filter set: sorted params, paging and sorting dropped"""
+    normalized = sorted(
+        (key, ','.join(sorted(query_params.getlist(key))))
+        for key in query_params
+        if key not in NON_FILTER_PARAMS
+    )
+    raw = repr((normalized, sorted(names)))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'facets:{prefix}:{get_facets_version()}:{digest}'
+
+
+def get_cached_facets(prefix, queryset, facets, names, query_params):
+    key = facet_cache_key(prefix, query_params, names)
+    result = cache.get(key)
+    record_cache(hits=result is not None, misses=result is None)
+    if result is None:
+        result = compute_facets(queryset, facets, names)
+        cache.set(key, result, getattr(settings, 'FACET_CACHE_TIMEOUT', 300))
+    return result
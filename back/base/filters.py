@@ -0,0 +1,87 @@
+import django_filters
+
+from .models import Property, Auction, PropertyCard, Bid
+from .tags import filter_by_tags
+
+
+class PropertyFilter(django_filters.FilterSet):
+    """Listing filters; ?amenities=pool,elevator matches properties having all listed tags"""
+    amenities = django_filters.CharFilter(method='filter_amenities')
+    features = django_filters.CharFilter(method='filter_features')
+
+    class Meta:
+        model = Property
+        # Range lookups are backed by partial indexes on is_published
+        fields = {
+            'property_type': ['exact'],
+            'building_type': ['exact'],
+            'status': ['exact'],
+            'location__city': ['exact'],
+            'market_value': ['gte', 'lte'],
+            'size_sqm': ['gte', 'lte'],
+            'year_built': ['gte', 'lte'],
+        }
+
+    def filter_amenities(self, queryset, name, value):
+        return filter_by_tags(queryset, 'amenity', value.split(','))
+
+    def filter_features(self, queryset, name, value):
+        return filter_by_tags(queryset, 'feature', value.split(','))
+
+
+class AuctionFilter(django_filters.FilterSet):
+    class Meta:
+        model = Auction
+        # Range lookups are backed by partial indexes on is_published
+        fields = {
+            'auction_type': ['exact'],
+            'status': ['exact'],
+            'related_property': ['exact'],
+            'related_property__location__city': ['exact'],
+            'start_date': ['gte', 'lte'],
+            'end_date': ['gte', 'lte'],
+            'current_bid': ['gte', 'lte'],
+        }
+
+
+class PropertyCardFilter(django_filters.FilterSet):
+    """PropertyFilter's parameters, applied to the card projection's own columns"""
+    property_type = django_filters.NumberFilter(field_name='property_type_id')
+    building_type = django_filters.NumberFilter(field_name='building_type_id')
+    location__city = django_filters.CharFilter(field_name='city')
+    amenities = django_filters.CharFilter(method='filter_amenities')
+    features = django_filters.CharFilter(method='filter_features')
+
+    class Meta:
+        model = PropertyCard
+        fields = {
+            'status': ['exact'],
+            'market_value': ['gte', 'lte'],
+            'size_sqm': ['gte', 'lte'],
+            'year_built': ['gte', 'lte'],
+        }
+
+    def filter_amenities(self, queryset, name, value):
+        return filter_by_tags(queryset, 'amenity', value.split(','))
+
+    def filter_features(self, queryset, name, value):
+        return filter_by_tags(queryset, 'feature', value.split(','))
+
+
+class BidFilter(django_filters.FilterSet):
+    """?bidder=current (or the caller's own id) limits the list to the caller's bids"""
+    bidder = django_filters.CharFilter(method='filter_bidder')
+
+    class Meta:
+        model = Bid
+        fields = ['auction', 'status']
+
+    def filter_bidder(self, queryset, name, value):
+        user = self.request.user if self.request else None
+        if value == 'current':
+            if user is None or not user.is_authenticated:
+                return queryset.none()
+            return queryset.filter(bidder=user)
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(bidder_id=int(value))
@@ -0,0 +1,397 @@
+"""Streaming bulk import of properties from CSV or JSON Lines."""
+import csv
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
+
+from .models import Property, PropertyType, BuildingType, Location
+from .type_registry import type_registry
+from .tags import sync_tags
+from .cards import refresh_cards
+from .market_stats import add_market_stats
+from accounts.tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+# Character separating list values (features/amenities) in CSV cells
+LIST_SEPARATOR = '|'
+# Keeps IN (...) / OR chains well below backend parameter limits
+LOOKUP_CHUNK = 500
+
+
+class RowError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    processed: int = 0
+    errors: list = field(default_factory=list)  # (line number, message)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_minute(self):
+        return int(self.processed / self.elapsed * 60) if self.elapsed else 0
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_jsonl_rows(stream):
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, RowError(f"Invalid JSON: {e.msg}")
+            continue
+        yield line_no, row if isinstance(row, dict) else RowError("Each line must be a JSON object")
+
+
+READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+}
+
+
+def _chunks(items, size=LOOKUP_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _text(row, key, required=False, default=''):
+    value = row.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise RowError(f"'{key}' is required")
+        return default
+    return str(value).strip()
+
+
+def _decimal(row, key, required=False):
+    value = _text(row, key, required=required, default=None)
+    if value is None:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise RowError(f"'{key}' must be a number")
+
+
+def _int(row, key):
+    value = _text(row, key, default=None)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RowError(f"'{key}' must be an integer")
+
+
+def _bool(row, key, default=False):
+    value = row.get(key)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _list(row, key):
+    value = row.get(key)
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    value = str(value).strip()
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            raise RowError(f"'{key}' is not a valid JSON list")
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+class PropertyImporter:
+    """
+    Import properties in batches: reference types and locations are resolved
+    through in-memory maps, slugs and property numbers are allocated in bulk,
+    and rows are written with bulk_create. Bad rows are reported, not fatal.
+    """
+
+    STATUSES = {choice for choice, _ in Property.STATUS_CHOICES}
+
+    def __init__(self, owner=None, batch_size=1000, publish=None, dry_run=False):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.publish = publish
+        self.dry_run = dry_run
+
+        self.locations = {}  # (city, state, country, postal_code) -> id
+        self.taken_slugs = set()
+        self.slug_counters = {}  # base slug -> next suffix to try
+        self.taken_numbers = {}  # property type code -> set of numbers
+        self.seen_deeds = set()
+
+    # --- Row parsing -------------------------------------------------------
+
+    def parse_row(self, row):
+        type_key = _text(row, 'property_type', required=True).lower()
+        property_type = type_registry.get(PropertyType, type_key)
+        if property_type is None:
+            raise RowError(f"Unknown property type '{type_key}'")
+
+        building_type = None
+        building_key = _text(row, 'building_type').lower()
+        if building_key:
+            building_type = type_registry.get(BuildingType, building_key)
+            if building_type is None:
+                raise RowError(f"Unknown building type '{building_key}'")
+
+        status = _text(row, 'status', default='available')
+        if status not in self.STATUSES:
+            raise RowError(f"Invalid status '{status}'")
+
+        deed_number = _text(row, 'deed_number', required=True)
+        if deed_number in self.seen_deeds:
+            raise RowError(f"Duplicate deed number '{deed_number}' in file")
+
+        availability_date = None
+        if _text(row, 'availability_date'):
+            availability_date = parse_date(_text(row, 'availability_date'))
+            if availability_date is None:
+                raise RowError("'availability_date' must be YYYY-MM-DD")
+
+        location_key = (
+            _text(row, 'city', required=True),
+            _text(row, 'state', required=True),
+            _text(row, 'country', default=Location._meta.get_field('country').default),
+            _text(row, 'postal_code'),
+        )
+
+        prop = Property(
+            title=_text(row, 'title', required=True),
+            slug=_text(row, 'slug'),
+            property_number=_text(row, 'property_number'),
+            property_type=property_type,
+            building_type=building_type,
+            status=status,
+            deed_number=deed_number,
+            description=_text(row, 'description', required=True),
+            meta_description=_text(row, 'meta_description'),
+            search_keywords=_text(row, 'search_keywords'),
+            size_sqm=_decimal(row, 'size_sqm', required=True),
+            floors=_int(row, 'floors'),
+            year_built=_int(row, 'year_built'),
+            address=_text(row, 'address', required=True),
+            market_value=_decimal(row, 'market_value', required=True),
+            minimum_bid=_decimal(row, 'minimum_bid'),
+            features=_list(row, 'features'),
+            amenities=_list(row, 'amenities'),
+            owner=self.owner,
+            is_published=self.publish if self.publish is not None else _bool(row, 'is_published'),
+            is_featured=_bool(row, 'is_featured'),
+            availability_date=availability_date,
+        )
+        coordinates = (_decimal(row, 'latitude'), _decimal(row, 'longitude'))
+        return prop, location_key, coordinates
+
+    # --- Bulk resolution ---------------------------------------------------
+
+    def resolve_locations(self, entries):
+        """Map location keys to ids, creating missing Location rows in bulk"""
+        missing = {key: coords for key, coords in entries if key not in self.locations}
+        if not missing:
+            return
+
+        def load(keys):
+            for chunk in _chunks(keys):
+                cities = {key[0] for key in chunk}
+                rows = Location.all_objects.filter(city__in=cities).values_list(
+                    'id', 'city', 'state', 'country', 'postal_code'
+                )
+                for location_id, *key in rows:
+                    self.locations[tuple(key)] = location_id
+
+        load(missing)
+        to_create = [
+            Location(city=key[0], state=key[1], country=key[2], postal_code=key[3],
+                     latitude=coords[0], longitude=coords[1])
+            for key, coords in missing.items() if key not in self.locations
+        ]
+        if to_create and not self.dry_run:
+            # unique_together may race with concurrent writers; re-read afterwards
+            Location.objects.bulk_create(to_create, ignore_conflicts=True)
+            load([key for key in missing if key not in self.locations])
+        elif to_create:
+            for index, location in enumerate(to_create):
+                self.locations[(location.city, location.state, location.country, location.postal_code)] = -index - 1
+
+    def check_deeds(self, props):
+        deeds = [prop.deed_number for prop in props]
+        existing = set()
+        for chunk in _chunks(deeds):
+            existing.update(Property.all_objects.filter(deed_number__in=chunk).values_list('deed_number', flat=True))
+        return existing
+
+    def allocate_slugs(self, props):
+        """Give every row a unique slug using one or two lookups per batch"""
+        bases = {}
+        for prop in props:
+            base = slugify(prop.slug or prop.title) or slugify(prop.property_number) or 'property'
+            bases.setdefault(base, []).append(prop)
+
+        unknown = [base for base in bases if base not in self.slug_counters]
+        taken_bases = set()
+        for chunk in _chunks(unknown):
+            taken_bases.update(Property.all_objects.filter(slug__in=chunk).values_list('slug', flat=True))
+        for chunk in _chunks(sorted(taken_bases), 100):
+            query = Q()
+            for base in chunk:
+                query |= Q(slug__startswith=f'{base}-')
+            self.taken_slugs.update(Property.all_objects.filter(query).values_list('slug', flat=True))
+        self.taken_slugs.update(taken_bases)
+        for base in unknown:
+            self.slug_counters[base] = 1
+
+        for base, group in bases.items():
+            for prop in group:
+                slug = base
+                while slug in self.taken_slugs:
+                    slug = f'{base}-{self.slug_counters[base]}'
+                    self.slug_counters[base] += 1
+                self.taken_slugs.add(slug)
+                prop.slug = slug
+
+    def allocate_numbers(self, props):
+        """Property numbers follow Property.save(): <type code>-<random digits>"""
+        for prop in props:
+            code = prop.property_type.code
+            taken = self.taken_numbers.get(code)
+            if taken is None:
+                taken = set(
+                    Property.all_objects.filter(property_number__startswith=f'{code}-')
+                    .values_list('property_number', flat=True)
+                )
+                self.taken_numbers[code] = taken
+
+            if prop.property_number:
+                if prop.property_number in taken:
+                    raise RowError(f"Property number '{prop.property_number}' already exists")
+            else:
+                # Widen the random range once the 5-digit space gets crowded
+                digits = 5
+                while True:
+                    for _ in range(20):
+                        number = f"{code}-{random.randint(10 ** (digits - 1), 10 ** digits - 1)}"
+                        if number not in taken:
+                            break
+                    else:
+                        digits += 1
+                        continue
+                    break
+                prop.property_number = number
+            taken.add(prop.property_number)
+
+    # --- Driver ------------------------------------------------------------
+
+    def run(self, rows):
+        result = ImportResult()
+        started = time.monotonic()
+        batch = []
+
+        for line_no, row in rows:
+            result.processed += 1
+            if isinstance(row, RowError):
+                result.errors.append((line_no, str(row)))
+                continue
+            try:
+                parsed = self.parse_row(row)
+            except RowError as e:
+                result.errors.append((line_no, str(e)))
+                continue
+            self.seen_deeds.add(parsed[0].deed_number)
+            batch.append((line_no, *parsed))
+            if len(batch) >= self.batch_size:
+                self.flush(batch, result)
+                batch = []
+
+        if batch:
+            self.flush(batch, result)
+
+        result.elapsed = time.monotonic() - started
+        if result.created and not self.dry_run:
+            from .facets import bump_facets_version
+            bump_facets_version()
+        return result
+
+    def queue_search_matches(self, props):
+        """bulk_create skips signals, so published rows are matched here"""
+        published = [prop.pk for prop in props if prop.is_published and prop.pk]
+        if published:
+            from .saved_searches import match_listings
+            run_in_background(match_listings, 'property', published)
+
+    def flush(self, batch, result):
+        self.resolve_locations((location_key, coords) for _, _, location_key, coords in batch)
+        existing_deeds = self.check_deeds(prop for _, prop, _, _ in batch)
+
+        ready = []
+        for line_no, prop, location_key, _ in batch:
+            if prop.deed_number in existing_deeds:
+                result.errors.append((line_no, f"Deed number '{prop.deed_number}' already exists"))
+                continue
+            prop.location_id = self.locations[location_key]
+            ready.append((line_no, prop))
+
+        numbered = []
+        for line_no, prop in ready:
+            try:
+                self.allocate_numbers([prop])
+            except RowError as e:
+                result.errors.append((line_no, str(e)))
+                continue
+            numbered.append((line_no, prop))
+        self.allocate_slugs([prop for _, prop in numbered])
+
+        if self.dry_run:
+            result.created += len(numbered)
+            return
+
+        try:
+            with transaction.atomic():
+                Property.objects.bulk_create([prop for _, prop in numbered])
+                sync_tags(Property, [prop for _, prop in numbered])
+                refresh_cards([prop.pk for _, prop in numbered])
+                add_market_stats(Property, [prop.pk for _, prop in numbered])
+                self.queue_search_matches([prop for _, prop in numbered])
+            result.created += len(numbered)
+        except IntegrityError:
+            # Something raced us (or slipped past the checks); isolate the bad rows
+            for line_no, prop in numbered:
+                prop.pk = None
+                try:
+                    with transaction.atomic():
+                        Property.objects.bulk_create([prop])
+                        sync_tags(Property, [prop])
+                        refresh_cards([prop.pk])
+                        add_market_stats(Property, [prop.pk])
+                        self.queue_search_matches([prop])
+                    result.created += 1
+                except IntegrityError as e:
+                    result.errors.append((line_no, f"Database rejected row: {e}"))
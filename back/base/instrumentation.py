@@ -0,0 +1,85 @@
+"""
+Per-request metrics for InstrumentationMiddleware: SQL queries and time
+(through connection.execute_wrapper), serializer time and cache hits/misses.
+
+Collectors reach the current request's RequestMetrics through a context
+variable; outside a sampled request current_metrics() is None and the
+record_* helpers return at once, so the hooks cost next to nothing when a
+request is not sampled.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+# IN (%s, %s, ...) lists and VALUES rows vary with the data, not with the query
+PLACEHOLDER_RUN_RE = re.compile(r'%s(?:\s*,\s*%s)+')
+VALUES_RUN_RE = re.compile(r'\(%s\)(?:\s*,\s*\(%s\))+')
+
+
+def sql_shape(sql):
+    """The SQL with placeholder runs collapsed, so repeats of one query compare equal"""
+    return VALUES_RUN_RE.sub('(%s)', PLACEHOLDER_RUN_RE.sub('%s', sql))
+
+
+class RequestMetrics:
+    """Counters for one request; also the execute_wrapper that feeds the SQL ones"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        """(shape, count) of the queries run more than `threshold` times, most repeated first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+@contextmanager
+def collect_metrics():
+    """Make a fresh RequestMetrics current for the block"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_cache(hits=0, misses=0):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+@contextmanager
+def serializer_timer():
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_seconds += time.perf_counter() - start
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from base.bid_archive import archivable_auctions, archive_auction_bids
+
+
+class Command(BaseCommand):
+    help = 'Move the bids of auctions closed more than --days ago into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BID_ARCHIVE_AFTER_DAYS,
+                            help='Archive auctions whose end date is older than this')
+        parser.add_argument('--batch-size', type=int, default=100, help='Auctions per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the auctions to archive')
+
+    def handle(self, *args, **options):
+        closed_before = timezone.now() - timedelta(days=options['days'])
+        ids = list(archivable_auctions(closed_before).order_by('pk').values_list('pk', flat=True))
+        if options['dry_run']:
+            self.stdout.write(f"{len(ids)} auctions closed before {closed_before:%Y-%m-%d} have bids to archive")
+            return
+
+        moved = 0
+        for start in range(0, len(ids), options['batch_size']):
+            chunk = ids[start:start + options['batch_size']]
+            moved += archive_auction_bids(chunk)
+            self.stdout.write(f"Archived auctions {start + len(chunk)}/{len(ids)}")
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} bids from {len(ids)} auctions to the archive"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from base.registration import backfill_registrations
+
+
+class Command(BaseCommand):
+    help = 'Register existing bidders for the auctions they bid on and recount registered_bidders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        added = backfill_registrations(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Added {added} registrations"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from base.models import Property, Room
+from base.tags import sync_tags, TAG_SOURCES
+
+
+class Command(BaseCommand):
+    help = 'Populate feature/amenity tag links from the JSON lists on properties and rooms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in (Property, Room):
+            fields = [field for field, _ in TAG_SOURCES[model]]
+            queryset = model.objects.order_by().only('id', *fields)
+            total = 0
+            batch = []
+            for obj in queryset.iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    with transaction.atomic():
+                        sync_tags(model, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                with transaction.atomic():
+                    sync_tags(model, batch)
+                total += len(batch)
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.verbose_name_plural}: synced {total} rows"))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from base.middleware import brotli, compress
+from base.models import Auction
+from base.renderers import FastJSONRenderer, orjson
+from base.serializers import AuctionSerializer
+
+
+class AsciiJSONRenderer(JSONRenderer):
+    ensure_ascii = True
+
+
+class Command(BaseCommand):
+    help = 'Encode AuctionSerializer payloads with each JSON renderer; report encode time and bytes on the wire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50, help='Auctions per payload')
+        parser.add_argument('--repeat', type=int, default=20, help='Encodes per renderer (best time is reported)')
+
+    def handle(self, *args, **options):
+        lookups = AuctionSerializer().get_related_lookups()
+        auctions = list(
+            Auction.objects.select_related(*lookups[0]).prefetch_related(*lookups[1])
+            .order_by('-start_date')[:options['limit']]
+        )
+        if not auctions:
+            raise CommandError('No auctions to encode')
+        data = AuctionSerializer(auctions, many=True).data
+        self.stdout.write(f"{len(auctions)} auctions, best of {options['repeat']} encodes")
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the fast renderer uses the stdlib encoder'))
+
+        renderers = [
+            ('stdlib, ASCII-escaped', AsciiJSONRenderer()),
+            ('stdlib, UTF-8', JSONRenderer()),
+            ('fast', FastJSONRenderer()),
+        ]
+        encodings = ['gzip'] + (['br'] if brotli is not None else [])
+        self.stdout.write(
+            f"{'renderer':<24}{'encode ms':>11}{'bytes':>10}" + ''.join(f'{name:>10}' for name in encodings)
+        )
+        for name, renderer in renderers:
+            best = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                body = renderer.render(data, 'application/json')
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            sizes = ''.join(f'{len(compress(body, encoding)):>10}' for encoding in encodings)
+            self.stdout.write(f'{name:<24}{best * 1000:>11.2f}{len(body):>10}{sizes}')
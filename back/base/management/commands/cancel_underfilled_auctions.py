@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from base.registration import underfilled_auctions, cancel_underfilled_auctions
+
+
+class Command(BaseCommand):
+    help = 'Cancel open auctions whose registration closed with fewer than minimum_participants registrants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the auctions that would be cancelled')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            rows = underfilled_auctions().order_by('pk').values_list('pk', 'registered_bidders', 'minimum_participants')
+            for pk, registered, minimum in rows:
+                self.stdout.write(f"Auction {pk}: {registered}/{minimum} registered")
+            return
+
+        ids = cancel_underfilled_auctions()
+        self.stdout.write(self.style.SUCCESS(f"Cancelled {len(ids)} auctions"))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from base.cards import find_card_drift, refresh_cards, CHUNK_SIZE
+from base.models import Property, PropertyCard
+
+
+class Command(BaseCommand):
+    help = 'Compare property cards with their source rows; --fix rebuilds missing or stale cards and drops those of deleted properties'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild missing and stale cards')
+        parser.add_argument('--max-report', type=int, default=20, help='How many stale cards to print')
+
+    def handle(self, *args, **options):
+        missing, stale = [], {}
+        ids = Property.objects.order_by('pk').values_list('pk', flat=True)
+        batch = []
+        for pk in ids.iterator(chunk_size=CHUNK_SIZE * 4):
+            batch.append(pk)
+            if len(batch) >= CHUNK_SIZE:
+                chunk_missing, chunk_stale = find_card_drift(batch)
+                missing += chunk_missing
+                stale.update(chunk_stale)
+                batch = []
+        if batch:
+            chunk_missing, chunk_stale = find_card_drift(batch)
+            missing += chunk_missing
+            stale.update(chunk_stale)
+
+        orphaned = PropertyCard.objects.filter(property__is_deleted=True)
+        orphan_count = orphaned.count()
+
+        for pk, fields in list(stale.items())[:options['max_report']]:
+            self.stderr.write(f"property {pk}: stale {', '.join(fields)}")
+        self.stdout.write(f"{len(missing)} missing, {len(stale)} stale, {orphan_count} orphaned cards")
+
+        if options['fix'] and (missing or stale or orphan_count):
+            refresh_cards(missing + list(stale))
+            orphaned.delete()
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {len(missing) + len(stale)} cards, removed {orphan_count} orphaned"
+            ))
+        elif not (missing or stale or orphan_count):
+            self.stdout.write(self.style.SUCCESS("Property cards are consistent"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from base.auction_analytics import compute_auction_analytics, auctions_missing_analytics
+from base.bid_archive import CLOSED_STATUSES
+from base.models import Auction
+
+
+class Command(BaseCommand):
+    help = 'Compute bidding analytics for closed auctions that have none (--recompute for all of them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recompute', action='store_true', help='Recompute every closed auction')
+        parser.add_argument('--auction', type=int, action='append', dest='auctions', help='Only this auction id (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['auctions']:
+            auctions = Auction.objects.filter(pk__in=options['auctions'])
+        elif options['recompute']:
+            auctions = Auction.objects.filter(status__in=CLOSED_STATUSES)
+        else:
+            auctions = auctions_missing_analytics()
+
+        done = 0
+        for auction_id in auctions.order_by('pk').values_list('pk', flat=True).iterator():
+            compute_auction_analytics(auction_id)
+            done += 1
+            if done % 100 == 0:
+                self.stdout.write(f"{done} auctions computed")
+        self.stdout.write(self.style.SUCCESS(f"Computed analytics for {done} auctions"))
@@ -0,0 +1,53 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from base.importers import PropertyImporter, READERS
+
+
+class Command(BaseCommand):
+    help = 'Bulk import properties from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument('--format', choices=sorted(READERS), help='Input format (default: from file extension)')
+        parser.add_argument('--owner', help='Email of the user that will own the imported properties')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--publish', action='store_true', help='Publish all imported properties')
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without writing them')
+        parser.add_argument('--max-errors', type=int, default=50, help='How many row errors to print')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError(f"Cannot infer format from '{path}'; pass --format")
+
+        owner = None
+        if options['owner']:
+            User = get_user_model()
+            try:
+                owner = User.objects.get(email=options['owner'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}")
+
+        importer = PropertyImporter(
+            owner=owner,
+            batch_size=options['batch_size'],
+            publish=True if options['publish'] else None,
+            dry_run=options['dry_run'],
+        )
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            result = importer.run(READERS[fmt](stream))
+
+        for line_no, message in result.errors[:options['max_errors']]:
+            self.stderr.write(f"line {line_no}: {message}")
+        if len(result.errors) > options['max_errors']:
+            self.stderr.write(f"... {len(result.errors) - options['max_errors']} more errors")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} of {result.processed} rows in {result.elapsed:.1f}s "
+            f"({result.rows_per_minute} rows/min), {len(result.errors)} errors"
+        ))
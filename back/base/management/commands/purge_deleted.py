@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+
+from base.media import delete_stored_files
+from base.models import BaseModel, Media
+
+
+def _depth(model, seen=()):
+    """Longest foreign key chain from `model` to other soft-delete models"""
+    parents = [
+        field.related_model for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model is not model
+        and issubclass(field.related_model, BaseModel) and field.related_model not in seen
+    ]
+    return max((_depth(parent, seen + (model,)) + 1 for parent in parents), default=0)
+
+
+def purge_order():
+    """Media first (its files are removed here), then dependents before what they reference"""
+    models = [model for model in apps.get_models() if issubclass(model, BaseModel) and model is not Media]
+    return [Media] + sorted(models, key=lambda model: (-_depth(model), model._meta.label))
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete soft-deleted rows older than the retention period, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SOFT_DELETE_RETENTION_DAYS,
+                            help='Purge rows deleted more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be purged')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        total = 0
+        for model in purge_order():
+            tombstones = model.all_objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+            if options['dry_run']:
+                count = tombstones.count()
+                if count:
+                    self.stdout.write(f"{model._meta.label}: {count} to purge")
+                total += count
+                continue
+
+            purged, skipped = 0, set()
+            while True:
+                ids = list(tombstones.exclude(pk__in=skipped).order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                try:
+                    purged += self.purge_batch(model, ids)
+                except ProtectedError:
+                    # Still referenced by live rows; purge what can go, leave the rest
+                    for pk in ids:
+                        try:
+                            purged += self.purge_batch(model, [pk])
+                        except ProtectedError:
+                            skipped.add(pk)
+            if purged or skipped:
+                self.stdout.write(f"{model._meta.label}: purged {purged}, kept {len(skipped)} still referenced")
+            total += purged
+
+        verb = 'Would purge' if options['dry_run'] else 'Purged'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} rows deleted before {cutoff:%Y-%m-%d %H:%M}"))
+
+    def purge_batch(self, model, ids):
+        with transaction.atomic():
+            rows = model.all_objects.filter(pk__in=ids)
+            files = list(rows.values_list('file', flat=True)) if model is Media else []
+            count = len(ids)
+            rows.hard_delete()
+            if files:
+                transaction.on_commit(lambda: delete_stored_files(files))
+        return count
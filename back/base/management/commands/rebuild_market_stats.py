@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from base.market_stats import rebuild_market_stats, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-city market stat rollups from properties and closed auctions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city', action='append', dest='cities',
+                            help='Only rebuild this city (repeatable); default is all cities')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows read per query')
+
+    def handle(self, *args, **options):
+        def progress(model, done):
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {done} rows read")
+
+        stored = rebuild_market_stats(options['cities'], options['chunk_size'], progress)
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} market stat rows"))
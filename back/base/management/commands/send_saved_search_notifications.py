@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from base.saved_searches import send_match_digests
+
+
+class Command(BaseCommand):
+    help = 'Email users one digest of new listings matching their saved searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Maximum number of users to notify in this run')
+
+    def handle(self, *args, **options):
+        sent = send_match_digests(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} saved search digests"))
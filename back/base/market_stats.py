@@ -0,0 +1,308 @@
+"""
+Per-city market statistics kept as rollups in MarketStat.
+
+Each (city, property type, month) row holds a quantile sketch of market value
+per m² for the properties created that month, and counters for the auctions
+that closed that month. Saves apply deltas: the rows an instance contributed
+before the save are subtracted and what it contributes now is added (see
+signals.py). rebuild_market_stats() recomputes everything in chunks.
+"""
+import math
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .bid_archive import CLOSED_STATUSES
+from .models import Property, Auction, Location, MarketStat, PropertyType
+from .type_registry import type_registry
+
+CHUNK_SIZE = 2000
+
+# Relative error of the sketch's quantiles. Stored bucket indexes depend on it,
+# so changing it requires rebuild_market_stats
+SKETCH_ACCURACY = 0.01
+GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+PROPERTY_ROW = ('pk', 'location__city', 'property_type_id', 'created_at', 'market_value', 'size_sqm')
+AUCTION_ROW = (
+    'pk', 'related_property__location__city', 'related_property__property_type_id',
+    'end_date', 'status', 'starting_bid', 'current_bid',
+)
+
+# Fields whose change moves an instance's contribution; other saves skip the rollup
+STAT_SOURCE_FIELDS = {
+    Property: {'location', 'property_type', 'market_value', 'size_sqm'},
+    Auction: {'related_property', 'end_date', 'status', 'starting_bid', 'current_bid'},
+    Location: {'city'},
+}
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch). A value v is counted in bucket
+    ceil(log_gamma(v)), so quantiles are returned within SKETCH_ACCURACY
+    relative error from a few hundred buckets at most. Sketches merge by
+    adding bucket counts, and adding a value with count=-1 removes it again,
+    which repricing needs and a t-digest cannot do.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = {int(index): count for index, count in (buckets or {}).items()}
+
+    def _bump(self, index, count):
+        total = self.buckets.get(index, 0) + count
+        if total:
+            self.buckets[index] = total
+        else:
+            self.buckets.pop(index, None)
+
+    def add(self, value, count=1):
+        if value > 0:
+            self._bump(math.ceil(math.log(value) / LOG_GAMMA), count)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self._bump(index, count)
+
+    @property
+    def count(self):
+        return sum(count for count in self.buckets.values() if count > 0)
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            if self.buckets[index] > 0:
+                seen += self.buckets[index]
+                if seen > rank:
+                    return 2 * GAMMA ** index / (GAMMA + 1)
+        return None
+
+    def to_json(self):
+        return {str(index): count for index, count in sorted(self.buckets.items())}
+
+
+def _month(value):
+    return timezone.localtime(value).date().replace(day=1) if value else None
+
+
+class _Delta:
+    __slots__ = ('sketch', 'priced_count', 'auctions_closed', 'auctions_sold', 'bid_ratio_sum')
+
+    def __init__(self):
+        self.sketch = QuantileSketch()
+        self.priced_count = self.auctions_closed = self.auctions_sold = 0
+        self.bid_ratio_sum = 0.0
+
+    def is_empty(self):
+        return not (self.sketch.buckets or self.priced_count or self.auctions_closed
+                    or self.auctions_sold or abs(self.bid_ratio_sum) > 1e-9)
+
+
+class MarketRollup:
+    """Accumulates changes per (city, property type id, month) key"""
+
+    def __init__(self):
+        self.deltas = defaultdict(_Delta)
+
+    def add_property_rows(self, rows, sign=1):
+        for _, city, type_id, created_at, value, size in rows:
+            if city and created_at and value and size and value > 0 and size > 0:
+                delta = self.deltas[(city, type_id, _month(created_at))]
+                delta.sketch.add(float(value) / float(size), sign)
+                delta.priced_count += sign
+
+    def add_auction_rows(self, rows, sign=1):
+        for _, city, type_id, end_date, status, starting_bid, current_bid in rows:
+            if not (city and end_date) or status not in CLOSED_STATUSES:
+                continue
+            delta = self.deltas[(city, type_id, _month(end_date))]
+            delta.auctions_closed += sign
+            if status != 'cancelled' and current_bid and starting_bid:
+                delta.auctions_sold += sign
+                delta.bid_ratio_sum += sign * float(current_bid / starting_bid)
+
+    def add_rows(self, model, queryset, sign=1):
+        """Count (sign=1) or uncount (sign=-1) the rows of a Property or Auction queryset"""
+        if model is Property:
+            self.add_property_rows(queryset.order_by().values_list(*PROPERTY_ROW).iterator(chunk_size=CHUNK_SIZE), sign)
+        else:
+            queryset = queryset.filter(status__in=CLOSED_STATUSES)
+            self.add_auction_rows(queryset.order_by().values_list(*AUCTION_ROW).iterator(chunk_size=CHUNK_SIZE), sign)
+
+    def add_scope(self, sender, pks, sign=1):
+        """Everything whose contribution depends on these Property/Auction/Location rows"""
+        if sender is Property:
+            self.add_rows(Property, Property.objects.filter(pk__in=pks), sign)
+            self.add_rows(Auction, Auction.objects.filter(related_property_id__in=pks), sign)
+        elif sender is Auction:
+            self.add_rows(Auction, Auction.objects.filter(pk__in=pks), sign)
+        elif sender is Location:
+            self.add_rows(Property, Property.objects.filter(location_id__in=pks), sign)
+            self.add_rows(Auction, Auction.objects.filter(related_property__location_id__in=pks), sign)
+
+    def save(self):
+        """Apply the deltas to the stored rows, locking each one (in key order) while it is updated"""
+        changed = sorted(
+            ((key, delta) for key, delta in self.deltas.items() if not delta.is_empty()),
+            key=lambda item: (item[0][0], item[0][1], item[0][2]),
+        )
+        if not changed:
+            return
+        with transaction.atomic():
+            for (city, type_id, month), delta in changed:
+                stat, _ = MarketStat.objects.select_for_update().get_or_create(
+                    city=city, property_type_id=type_id, month=month
+                )
+                sketch = QuantileSketch(stat.price_sketch)
+                sketch.merge(delta.sketch)
+                stat.price_sketch = sketch.to_json()
+                stat.priced_count += delta.priced_count
+                stat.auctions_closed += delta.auctions_closed
+                stat.auctions_sold += delta.auctions_sold
+                stat.bid_ratio_sum += delta.bid_ratio_sum
+                if not (stat.priced_count or stat.auctions_closed):
+                    stat.delete()
+                else:
+                    stat.save()
+        self.deltas.clear()
+
+    def replace(self, cities=None):
+        """Store the accumulated totals in place of all rows (or those of `cities`)"""
+        rows = [
+            MarketStat(
+                city=city, property_type_id=type_id, month=month,
+                price_sketch=delta.sketch.to_json(), priced_count=delta.priced_count,
+                auctions_closed=delta.auctions_closed, auctions_sold=delta.auctions_sold,
+                bid_ratio_sum=delta.bid_ratio_sum,
+            )
+            for (city, type_id, month), delta in self.deltas.items() if not delta.is_empty()
+        ]
+        with transaction.atomic():
+            stale = MarketStat.objects.all() if cities is None else MarketStat.objects.filter(city__in=cities)
+            stale.delete()
+            MarketStat.objects.bulk_create(rows, batch_size=CHUNK_SIZE)
+        return len(rows)
+
+
+def add_market_stats(model, pks):
+    """Count rows written without signals (bulk_create) into the rollups"""
+    rollup = MarketRollup()
+    rollup.add_scope(model, pks)
+    rollup.save()
+
+
+def rebuild_market_stats(cities=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Recompute the rollups from Property and Auction, reading `chunk_size`
+    rows at a time in primary-key order. Returns the number of rows stored.
+    """
+    rollup = MarketRollup()
+    sources = (
+        (Property.objects.all(), 'location__city__in', PROPERTY_ROW, rollup.add_property_rows),
+        (Auction.objects.filter(status__in=CLOSED_STATUSES), 'related_property__location__city__in',
+         AUCTION_ROW, rollup.add_auction_rows),
+    )
+    for queryset, city_lookup, columns, add in sources:
+        if cities is not None:
+            queryset = queryset.filter(**{city_lookup: cities})
+        last, done = 0, 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last).order_by('pk').values_list(*columns)[:chunk_size])
+            if not rows:
+                break
+            add(rows)
+            last = rows[-1][0]
+            done += len(rows)
+            if progress:
+                progress(queryset.model, done)
+    return rollup.replace(cities)
+
+
+# -------------------------------------------------------------------------
+# Reading
+# -------------------------------------------------------------------------
+def month_window(months):
+    """First day of the earliest month in a window of `months` ending this month"""
+    today = timezone.localdate()
+    index = today.year * 12 + today.month - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def summarize(stats):
+    """Merge MarketStat rows into one summary"""
+    sketch = QuantileSketch()
+    priced = closed = sold = 0
+    ratio_sum = 0.0
+    for stat in stats:
+        sketch.merge(QuantileSketch(stat.price_sketch))
+        priced += stat.priced_count
+        closed += stat.auctions_closed
+        sold += stat.auctions_sold
+        ratio_sum += stat.bid_ratio_sum
+
+    def price(q):
+        value = sketch.quantile(q)
+        return round(value, 2) if value is not None else None
+
+    return {
+        'priced_count': priced,
+        'price_per_sqm': {'p10': price(0.1), 'median': price(0.5), 'p90': price(0.9)},
+        'auctions_closed': closed,
+        'auctions_sold': sold,
+        'sale_through_rate': round(sold / closed, 4) if closed else None,
+        'avg_bid_over_start': round(ratio_sum / sold, 4) if sold else None,
+    }
+
+
+def _stats(months, property_type=None, **filters):
+    stats = MarketStat.objects.filter(month__gte=month_window(months), **filters)
+    if property_type is not None:
+        stats = stats.filter(property_type_id=property_type.pk)
+    return list(stats)
+
+
+def city_stats(city, months=12, property_type=None):
+    """Summary of one city over the window, by month and by property type"""
+    stats = _stats(months, property_type, city=city)
+    by_month, by_type = defaultdict(list), defaultdict(list)
+    for stat in stats:
+        by_month[stat.month].append(stat)
+        by_type[stat.property_type_id].append(stat)
+
+    types = []
+    for type_id, rows in by_type.items():
+        entry = type_registry.get(PropertyType, type_id)
+        types.append({
+            'property_type': type_id,
+            'code': entry.code if entry else None,
+            'name': entry.name if entry else None,
+            **summarize(rows),
+        })
+    types.sort(key=lambda item: -item['priced_count'])
+    return {
+        'city': city,
+        'months': months,
+        'summary': summarize(stats),
+        'by_month': [
+            {'month': month.strftime('%Y-%m'), **summarize(by_month[month])}
+            for month in sorted(by_month)
+        ],
+        'by_property_type': types,
+    }
+
+
+def city_dashboard(months=12, property_type=None):
+    """One summary per city over the window, busiest cities first"""
+    by_city = defaultdict(list)
+    for stat in _stats(months, property_type):
+        by_city[stat.city].append(stat)
+    cities = [{'city': city, **summarize(rows)} for city, rows in by_city.items()]
+    cities.sort(key=lambda item: (-item['priced_count'], item['city']))
+    return cities
@@ -0,0 +1,222 @@
+"""Batch upload, ordering and prefetch helpers for the generic Media relation."""
+import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, When, Value, F, BooleanField, PositiveIntegerField, prefetch_related_objects
+)
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.utils import timezone
+
+from .models import Media, Property, Room, Auction
+from .cards import refresh_cards
+from .conditional import bump_model_version
+
+logger = logging.getLogger(__name__)
+
+# Models media can be attached to, keyed by the name clients send
+MEDIA_CONTENT_MODELS = {
+    'property': Property,
+    'room': Room,
+    'auction': Auction,
+}
+
+
+def get_content_owner(obj):
+    """Resolve the owning user of a media target (Property, Room or Auction)"""
+    if isinstance(obj, Property):
+        return obj.owner
+    if isinstance(obj, Room):
+        return obj.property.owner if obj.property else None
+    if isinstance(obj, Auction):
+        return obj.related_property.owner if obj.related_property else None
+    return getattr(obj, 'owner', None)
+
+
+def content_object_prefetch():
+    """
+    Prefetch for Media.content_object: one query per target model, with the
+    joins get_content_owner() and the targets' __str__ need.
+    """
+    return GenericPrefetch('content_object', [
+        Property.objects.select_related('owner'),
+        Room.objects.select_related('room_type', 'property__owner'),
+        Auction.objects.select_related('related_property__owner'),
+    ])
+
+
+def with_content_objects(queryset):
+    """Media queryset whose content objects resolve in a fixed number of queries"""
+    return queryset.select_related('content_type').prefetch_related(content_object_prefetch())
+
+
+def prefetch_content_objects(media_items):
+    """Attach content objects to already-fetched Media rows in bulk"""
+    media_items = list(media_items)
+    prefetch_related_objects(media_items, content_object_prefetch())
+    return media_items
+
+
+def guess_media_type(mime_type):
+    if mime_type.startswith('image/'):
+        return 'image'
+    if mime_type.startswith('video/'):
+        return 'video'
+    if mime_type in ('application/pdf', 'application/msword') or mime_type.startswith('application/vnd'):
+        return 'document'
+    return 'other'
+
+
+def _store_upload(upload):
+    """Write one upload to storage and probe it; runs in a worker thread"""
+    field = Media._meta.get_field('file')
+    mime_type = getattr(upload, 'content_type', '') or mimetypes.guess_type(upload.name)[0] or ''
+    media_type = guess_media_type(mime_type)
+
+    width = height = None
+    if media_type == 'image':
+        from PIL import Image
+        try:
+            upload.seek(0)
+            width, height = Image.open(upload).size
+        except Exception:
+            pass
+        upload.seek(0)
+
+    name = field.generate_filename(None, upload.name)
+    stored_name = field.storage.save(name, upload, max_length=field.max_length)
+    return {
+        'file': stored_name,
+        'name': upload.name,
+        'media_type': media_type,
+        'file_size': upload.size,
+        'mime_type': mime_type,
+        'width': width,
+        'height': height,
+    }
+
+
+def store_uploads(uploads):
+    """Store uploads concurrently, preserving input order"""
+    workers = min(len(uploads), getattr(settings, 'MEDIA_BATCH_UPLOAD_WORKERS', 4)) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media-upload') as executor:
+        return list(executor.map(_store_upload, uploads))
+
+
+def delete_stored_files(names):
+    storage = Media._meta.get_field('file').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Failed to delete media file {name}: {str(e)}")
+
+
+def apply_media_order(content_type, object_id, ordered_ids, primary_id=None):
+    """
+    Persist ordering and primary selection for one object's media.
+
+    Listed ids take positions 0..n-1; unlisted media keep their relative order
+    after them. Exactly one image ends up primary: the requested one, else the
+    current primary, else the first image in the new order.
+    """
+    with transaction.atomic():
+        rows = list(
+            Media.objects.select_for_update()
+            .filter(content_type=content_type, object_id=object_id)
+            .order_by('order', 'id')
+            .values_list('id', 'media_type', 'is_primary')
+        )
+        known = {row[0] for row in rows}
+        unknown = [i for i in ordered_ids if i not in known]
+        if unknown:
+            raise ValueError(f"Media {unknown} do not belong to this object")
+
+        listed = set(ordered_ids)
+        final_order = list(ordered_ids) + [row[0] for row in rows if row[0] not in listed]
+        images = [row[0] for row in rows if row[1] == 'image']
+
+        if primary_id is not None and primary_id not in images:
+            raise ValueError(f"Media {primary_id} is not an image of this object")
+        if primary_id is None:
+            current = [row[0] for row in rows if row[2] and row[0] in images]
+            if current:
+                primary_id = current[0]
+            else:
+                primary_id = next((i for i in final_order if i in images), None)
+
+        scoped = Media.objects.filter(content_type=content_type, object_id=object_id)
+        # The partial unique index is checked row by row, so drop the old
+        # primary before the CASE update can promote a new one
+        scoped.filter(is_primary=True).exclude(id=primary_id).update(is_primary=False)
+        scoped.update(
+            order=Case(
+                *[When(id=media_id, then=Value(position)) for position, media_id in enumerate(final_order)],
+                default=F('order'),
+                output_field=PositiveIntegerField(),
+            ),
+            is_primary=Case(
+                When(id=primary_id, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            updated_at=timezone.now(),
+        )
+        # Queryset updates bypass signals; the card's main image may have changed
+        if content_type.model_class() is Property:
+            refresh_cards([object_id])
+        bump_model_version(Media)
+    return final_order, primary_id
+
+
+def create_media_batch(content_object, uploads, order_tokens=None, primary_token=None):
+    """
+    Attach many uploads to one object in a single transaction.
+
+    order_tokens / primary_token reference existing media by id (int) and new
+    uploads by their position as "file:<n>". New uploads are appended after
+    existing media when no order is given.
+    """
+    content_type = ContentType.objects.get_for_model(content_object)
+    stored = store_uploads(uploads)
+
+    try:
+        with transaction.atomic():
+            created = Media.objects.bulk_create([
+                Media(content_type=content_type, object_id=content_object.pk, order=0, **data)
+                for data in stored
+            ])
+            new_ids = [media.id for media in created]
+            if None in new_ids:
+                # Backends without RETURNING on bulk insert; resolve by file name
+                by_file = dict(Media.objects.filter(
+                    content_type=content_type, object_id=content_object.pk,
+                    file__in=[data['file'] for data in stored],
+                ).values_list('file', 'id'))
+                new_ids = [by_file[data['file']] for data in stored]
+
+            def resolve(token):
+                if isinstance(token, str) and token.startswith('file:'):
+                    return new_ids[int(token[5:])]
+                return int(token)
+
+            if order_tokens:
+                ordered_ids = [resolve(token) for token in order_tokens]
+            else:
+                existing = list(
+                    Media.objects.filter(content_type=content_type, object_id=content_object.pk)
+                    .exclude(id__in=new_ids).order_by('order', 'id').values_list('id', flat=True)
+                )
+                ordered_ids = existing + new_ids
+
+            primary_id = resolve(primary_token) if primary_token not in (None, '') else None
+            apply_media_order(content_type, content_object.pk, ordered_ids, primary_id)
+    except Exception:
+        delete_stored_files([data['file'] for data in stored])
+        raise
+
+    return new_ids
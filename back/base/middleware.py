@@ -0,0 +1,151 @@
+"""
+Response compression negotiated from Accept-Encoding (brotli, then gzip), and
+sampled per-request instrumentation reported as Server-Timing.
+"""
+import gzip
+import logging
+import random
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Optional dependency; gzip only without it
+    brotli = None
+
+from .instrumentation import collect_metrics
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_ENCODING_RE = re.compile(r'(?:^|,)\s*([a-z0-9*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with a non-zero q value"""
+    accepted = set()
+    for name, quality in ACCEPT_ENCODING_RE.findall(header.lower()):
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name)
+    return accepted
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'API_BROTLI_QUALITY', 5))
+    return gzip.compress(content, compresslevel=getattr(settings, 'API_GZIP_LEVEL', 6), mtime=0)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses non-streaming responses of the configured content types above
+    API_COMPRESSION_MIN_SIZE bytes. Streaming responses (exports) are left
+    alone; they are large downloads with their own ?compress= option.
+
+    Compressing a secret next to attacker-reflected input leaks it through the
+    response size (BREACH). Responses that set cookies and everything under
+    API_COMPRESSION_EXCLUDED_PATHS (the accounts API, whose login and token
+    refresh bodies carry JWTs) go out uncompressed. The remaining API bodies hold no
+    credentials: auth travels in the Authorization header and the CSRF token
+    in its cookie, neither of which is echoed back.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or response.cookies
+            or request.path.startswith(tuple(getattr(settings, 'API_COMPRESSION_EXCLUDED_PATHS', ())))
+            or len(response.content) < getattr(settings, 'API_COMPRESSION_MIN_SIZE', 1024)
+        ):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in getattr(settings, 'API_COMPRESSION_TYPES', ('application/json',)):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body differs per encoding, so a strong validator must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class InstrumentationMiddleware:
+    """
+    Measures a sample of requests (INSTRUMENTATION_SAMPLE_RATE): SQL query
+    count and time on every connection, serializer time and cache hits/misses
+    (see base.instrumentation). Sampled responses carry a Server-Timing header
+    (INSTRUMENTATION_SERVER_TIMING) and are logged with the metrics as
+    structured fields; a query shape repeated more than
+    INSTRUMENTATION_REPEATED_QUERY_THRESHOLD times is logged as a likely N+1.
+    Unsampled requests pay for one random() call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_metrics() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        db_ms = metrics.db_seconds * 1000
+        serializer_ms = metrics.serializer_seconds * 1000
+        if getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', True):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries"',
+                f'serializer;dur={serializer_ms:.1f}',
+                f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+                f'total;dur={total_ms:.1f}',
+            ])
+
+        fields = {
+            'method': request.method,
+            'path': request.path_info,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_queries': metrics.queries,
+            'db_ms': round(db_ms, 1),
+            'serializer_ms': round(serializer_ms, 1),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }
+        repeated = metrics.repeated_queries(getattr(settings, 'INSTRUMENTATION_REPEATED_QUERY_THRESHOLD', 10))
+        fields['repeated_queries'] = len(repeated)
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'request_metrics': fields})
+        for shape, count in repeated:
+            logger.warning(
+                f"Possible N+1 on {request.method} {request.path_info}: {count} x {shape[:300]}",
+                extra={'request_metrics': {**fields, 'repeated_sql': shape, 'repeated_count': count}},
+            )
+        return response
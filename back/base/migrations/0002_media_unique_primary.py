@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='media',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('content_type', 'object_id'), name='unique_primary_media_per_object'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_media_unique_primary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-start_date'], name='auction_pub_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['end_date'], name='auction_pub_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['status', 'end_date'], name='auction_pub_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['current_bid'], name='auction_pub_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at'], name='property_pub_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['market_value'], name='property_pub_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['size_sqm'], name='property_pub_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['year_built'], name='property_pub_year_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('feature', 'ميزة'), ('amenity', 'مرفق')], max_length=10, verbose_name='النوع')),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, verbose_name='الرمز')),
+                ('name', models.CharField(max_length=100, verbose_name='الاسم')),
+            ],
+            options={
+                'verbose_name': 'وسم',
+                'verbose_name_plural': 'الوسوم',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'slug'), name='unique_tag_kind_slug')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='base.property')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='property_links', to='base.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='properties', through='base.PropertyTag', to='base.tag', verbose_name='الوسوم'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='rooms', to='base.tag', verbose_name='الوسوم'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertytag',
+            constraint=models.UniqueConstraint(fields=('tag', 'property'), name='unique_property_tag'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False, verbose_name='محذوف')),
+                ('deleted_at', models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الحذف')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('name', models.CharField(max_length=100, verbose_name='الاسم')),
+                ('target', models.CharField(choices=[('property', 'عقارات'), ('auction', 'مزادات')], max_length=10, verbose_name='نوع البحث')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='معايير البحث')),
+                ('notify', models.BooleanField(default=True, verbose_name='إرسال إشعارات')),
+                ('city', models.CharField(blank=True, editable=False, max_length=100, verbose_name='المدينة')),
+                ('listing_type_id', models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='النوع')),
+                ('price_min', models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True, verbose_name='أدنى سعر')),
+                ('price_max', models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True, verbose_name='أعلى سعر')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'بحث محفوظ',
+                'verbose_name_plural': 'عمليات البحث المحفوظة',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='وقت المطابقة')),
+                ('notified_at', models.DateTimeField(blank=True, null=True, verbose_name='وقت الإشعار')),
+                ('auction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to='base.auction', verbose_name='المزاد')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to='base.property', verbose_name='العقار')),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='base.savedsearch', verbose_name='البحث')),
+            ],
+            options={
+                'verbose_name': 'نتيجة بحث محفوظ',
+                'verbose_name_plural': 'نتائج البحث المحفوظ',
+                'ordering': ['-matched_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('notify', True)), fields=['target', 'city', 'listing_type_id'], name='saved_search_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearchmatch',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['search'], name='saved_search_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearchmatch',
+            constraint=models.UniqueConstraint(fields=('search', 'property'), name='unique_search_property_match'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearchmatch',
+            constraint=models.UniqueConstraint(fields=('search', 'auction'), name='unique_search_auction_match'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyCard',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='base.property')),
+                ('title', models.CharField(max_length=255)),
+                ('slug', models.CharField(max_length=255)),
+                ('property_number', models.CharField(blank=True, max_length=50)),
+                ('status', models.CharField(max_length=20)),
+                ('property_type_id', models.BigIntegerField(null=True)),
+                ('property_type_name', models.CharField(blank=True, max_length=50)),
+                ('building_type_id', models.BigIntegerField(null=True)),
+                ('building_type_name', models.CharField(blank=True, max_length=50)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('market_value', models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ('minimum_bid', models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+                ('size_sqm', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('year_built', models.PositiveIntegerField(null=True)),
+                ('main_image', models.CharField(blank=True, max_length=255)),
+                ('room_count', models.PositiveIntegerField(default=0)),
+                ('bathroom_count', models.PositiveIntegerField(default=0)),
+                ('is_published', models.BooleanField(default=False)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'بطاقة عقار',
+                'verbose_name_plural': 'بطاقات العقارات',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('is_published', True)), fields=['-created_at'], name='card_pub_created_idx'), models.Index(condition=models.Q(('is_published', True)), fields=['market_value'], name='card_pub_value_idx'), models.Index(condition=models.Q(('is_published', True)), fields=['city'], name='card_pub_city_idx'), models.Index(condition=models.Q(('is_published', True)), fields=['property_type_id'], name='card_pub_type_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_property_cards'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='media',
+            name='unique_primary_media_per_object',
+        ),
+        migrations.RemoveIndex(
+            model_name='auction',
+            name='auction_pub_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auction',
+            name='auction_pub_end_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auction',
+            name='auction_pub_status_end_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auction',
+            name='auction_pub_bid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_pub_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_pub_value_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_pub_size_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_pub_year_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='savedsearch',
+            name='saved_search_match_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['-start_date'], name='auction_pub_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['end_date'], name='auction_pub_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['status', 'end_date'], name='auction_pub_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['current_bid'], name='auction_pub_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['auction', '-bid_time'], name='bid_live_auction_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['content_type', 'object_id', 'order'], name='media_live_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['-created_at'], name='property_pub_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['market_value'], name='property_pub_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['size_sqm'], name='property_pub_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['year_built'], name='property_pub_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['property', 'floor'], name='room_live_property_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('notify', True)), fields=['target', 'city', 'listing_type_id'], name='saved_search_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at'], name='saved_search_live_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='media',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False), ('is_primary', True)), fields=('content_type', 'object_id'), name='unique_primary_media_per_object'),
+        ),
+    ]
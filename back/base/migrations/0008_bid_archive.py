@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='bids_archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='تاريخ أرشفة المزايدات'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedBid',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('bid_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='مبلغ المزايدة')),
+                ('max_bid_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True, verbose_name='الحد الأقصى للمزايدة')),
+                ('bid_time', models.DateTimeField(verbose_name='وقت المزايدة')),
+                ('status', models.CharField(choices=[('pending', 'قيد الانتظار'), ('accepted', 'مقبولة'), ('rejected', 'مرفوضة'), ('outbid', 'تمت المزايدة بأعلى'), ('winning', 'فائزة')], max_length=20, verbose_name='الحالة')),
+                ('is_verified', models.BooleanField(default=False, verbose_name='تم التحقق')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الأرشفة')),
+                ('auction', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bids', to='base.auction', verbose_name='المزاد')),
+                ('bidder', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bids', to=settings.AUTH_USER_MODEL, verbose_name='المزايد')),
+            ],
+            options={
+                'verbose_name': 'مزايدة مؤرشفة',
+                'verbose_name_plural': 'المزايدات المؤرشفة',
+                'ordering': ['-bid_time'],
+                'indexes': [models.Index(fields=['auction', '-bid_time'], name='archived_bid_auction_idx'), models.Index(fields=['bidder', '-bid_time'], name='archived_bid_bidder_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_bid_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('property_type_id', models.BigIntegerField()),
+                ('month', models.DateField()),
+                ('price_sketch', models.JSONField(default=dict)),
+                ('priced_count', models.IntegerField(default=0)),
+                ('auctions_closed', models.IntegerField(default=0)),
+                ('auctions_sold', models.IntegerField(default=0)),
+                ('bid_ratio_sum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'إحصائية سوق',
+                'verbose_name_plural': 'إحصائيات السوق',
+                'ordering': ['city', '-month'],
+                'indexes': [models.Index(fields=['month'], name='market_stat_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('city', 'property_type_id', 'month'), name='market_stat_key_uniq')],
+            },
+        ),
+    ]
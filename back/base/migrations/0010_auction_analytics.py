@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_market_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionAnalytics',
+            fields=[
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to='base.auction', verbose_name='المزاد')),
+                ('bid_count', models.PositiveIntegerField(default=0, verbose_name='عدد المزايدات')),
+                ('distinct_bidders', models.PositiveIntegerField(default=0, verbose_name='عدد المزايدين')),
+                ('first_bid_at', models.DateTimeField(null=True, verbose_name='وقت أول مزايدة')),
+                ('time_to_first_bid', models.DurationField(null=True, verbose_name='الوقت حتى أول مزايدة')),
+                ('peak_bids_per_minute', models.PositiveIntegerField(default=0, verbose_name='ذروة المزايدات في الدقيقة')),
+                ('velocity', models.JSONField(default=dict, verbose_name='سرعة المزايدة')),
+                ('closing_window_minutes', models.PositiveIntegerField(default=0, verbose_name='نافذة الإغلاق (دقائق)')),
+                ('closing_window_bids', models.PositiveIntegerField(default=0, verbose_name='مزايدات نافذة الإغلاق')),
+                ('final_price', models.DecimalField(decimal_places=2, max_digits=14, null=True, verbose_name='السعر النهائي')),
+                ('price_to_start', models.FloatField(null=True, verbose_name='السعر إلى المزايدة الأولية')),
+                ('price_to_market', models.FloatField(null=True, verbose_name='السعر إلى القيمة السوقية')),
+                ('computed_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ الحساب')),
+            ],
+            options={
+                'verbose_name': 'تحليلات مزاد',
+                'verbose_name_plural': 'تحليلات المزادات',
+                'ordering': ['-computed_at'],
+            },
+        ),
+    ]
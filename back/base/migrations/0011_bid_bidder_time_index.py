@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_auction_analytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bid',
+            name='base_bid_bidder__4ccbc5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['bidder', '-bid_time'], name='bid_live_bidder_time_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_bid_bidder_time_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='watcher_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='عدد المتابعين'),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='watcher_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='عدد المتابعين'),
+        ),
+        migrations.CreateModel(
+            name='Watch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ المتابعة')),
+                ('auction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='watches', to='base.auction', verbose_name='المزاد')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='watches', to='base.property', verbose_name='العقار')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watches', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'متابعة',
+                'verbose_name_plural': 'قائمة المتابعة',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('auction__isnull', False)), fields=['auction', 'user'], name='watch_auction_user_idx'), models.Index(condition=models.Q(('property__isnull', False)), fields=['property', 'user'], name='watch_property_user_idx'), models.Index(fields=['user', '-created_at'], name='watch_user_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'property'), name='unique_user_property_watch'), models.UniqueConstraint(fields=('user', 'auction'), name='unique_user_auction_watch'), models.CheckConstraint(condition=models.Q(models.Q(('auction__isnull', False), ('property__isnull', True)), models.Q(('auction__isnull', True), ('property__isnull', False)), _connector='OR'), name='watch_single_target')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_watchlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionRegistration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registered_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ التسجيل')),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='base.auction', verbose_name='المزاد')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auction_registrations', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+            ],
+            options={
+                'verbose_name': 'تسجيل في مزاد',
+                'verbose_name_plural': 'التسجيلات في المزادات',
+                'ordering': ['-registered_at'],
+                'indexes': [models.Index(fields=['user', '-registered_at'], name='registration_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('auction', 'user'), name='unique_auction_registration')],
+            },
+        ),
+    ]
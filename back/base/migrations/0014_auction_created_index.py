@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0013_auction_registration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_published', True)), fields=['-created_at'], name='auction_pub_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0014_auction_created_index'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='propertycard',
+            old_name='main_image',
+            new_name='main_image_url',
+        ),
+        migrations.AddField(
+            model_name='propertycard',
+            name='deed_number',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0015_property_card_deed_image_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auction',
+            name='auction_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='auctions', to='base.auctiontype', verbose_name='نوع المزاد'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='building_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='base.buildingtype', verbose_name='نوع المبنى'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='base.location', verbose_name='الموقع'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='base.propertytype', verbose_name='نوع العقار'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='room_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='rooms', to='base.roomtype', verbose_name='نوع الغرفة'),
+        ),
+    ]
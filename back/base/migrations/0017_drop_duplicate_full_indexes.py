@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0016_reference_related_names'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bid',
+            name='base_bid_auction_9a6bc0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='media',
+            name='base_media_content_eaf14c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='room',
+            name='base_room_propert_122717_idx',
+        ),
+    ]
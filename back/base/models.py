@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.conf import settings
 from django.utils import timezone
 from django.utils.text import slugify
+from django.core.exceptions import ValidationError, NON_FIELD_ERRORS
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
@@ -11,6 +13,83 @@ import uuid
 import os
 import random
 
+# -------------------------------------------------------------------------
+# Soft Delete
+# -------------------------------------------------------------------------
+SOFT_DELETE_CHUNK_SIZE = 1000
+
+# Sent once per model and cascade level with the ids that were soft deleted
+post_soft_delete = Signal()
+
+
+def soft_delete_rows(model, ids, when, deleted):
+    """
+    Flag `ids` of `model` as deleted, then their CASCADE and GenericRelation
+    dependents, one bulk UPDATE per model and chunk. Live rows reached
+    through a PROTECT relation block the delete as they would a real one.
+    """
+    if not ids:
+        return
+    for relation in model._meta.related_objects:
+        if relation.on_delete is models.PROTECT:
+            protected = relation.related_model._default_manager.filter(**{f'{relation.field.attname}__in': ids})
+            if protected.exists():
+                raise models.ProtectedError(
+                    f"Cannot delete some {model._meta.verbose_name_plural} because they are "
+                    f"referenced through a protected foreign key: '{relation.related_model.__name__}.{relation.field.name}'",
+                    set(protected[:10]),
+                )
+
+    for start in range(0, len(ids), SOFT_DELETE_CHUNK_SIZE):
+        model.all_objects.filter(pk__in=ids[start:start + SOFT_DELETE_CHUNK_SIZE]).update(
+            is_deleted=True, deleted_at=when, updated_at=when
+        )
+    deleted[model._meta.label] = deleted.get(model._meta.label, 0) + len(ids)
+
+    for relation in model._meta.related_objects:
+        if relation.on_delete is models.CASCADE and issubclass(relation.related_model, BaseModel):
+            dependents = relation.related_model.objects.filter(**{f'{relation.field.attname}__in': ids})
+            soft_delete_rows(relation.related_model, list(dependents.values_list('pk', flat=True)), when, deleted)
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericRelation) and issubclass(field.related_model, BaseModel):
+            dependents = field.related_model.objects.filter(**{
+                field.content_type_field_name: ContentType.objects.get_for_model(model),
+                f'{field.object_id_field_name}__in': ids,
+            })
+            soft_delete_rows(field.related_model, list(dependents.values_list('pk', flat=True)), when, deleted)
+
+    post_soft_delete.send(sender=model, ids=ids)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def delete(self):
+        """Soft delete the rows and their dependents; returns (count, {model label: count})"""
+        if self.query.is_sliced:
+            raise TypeError("Cannot use 'limit' or 'offset' with delete().")
+        deleted = {}
+        with transaction.atomic(using=self.db):
+            ids = list(self.filter(is_deleted=False).values_list('pk', flat=True))
+            soft_delete_rows(self.model, ids, timezone.now(), deleted)
+        return sum(deleted.values()), deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        """Remove the rows from the database (Django's cascading delete)"""
+        return super().delete()
+
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Default manager: rows flagged as deleted are left out"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 # -------------------------------------------------------------------------
 # Base Model
 # -------------------------------------------------------------------------
@@ -21,9 +100,39 @@ class BaseModel(models.Model):
     created_at = models.DateTimeField(_('تاريخ الإنشاء'), auto_now_add=True)
     updated_at = models.DateTimeField(_('تاريخ التحديث'), auto_now=True)
 
+    objects = SoftDeleteManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
     class Meta:
         abstract = True
 
+    def delete(self, using=None, keep_parents=False):
+        """Soft delete (see SoftDeleteQuerySet.delete); hard_delete() removes the row"""
+        result = type(self).all_objects.filter(pk=self.pk).delete()
+        self.refresh_from_db(fields=['is_deleted', 'deleted_at', 'updated_at'])
+        return result
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
+
+    def validate_unique(self, exclude=None):
+        """Soft-deleted rows keep their unique values, so a clash with one is an error too"""
+        super().validate_unique(exclude=exclude)
+        unique_checks, _ = self._get_unique_checks(exclude=exclude)
+        errors = {}
+        for model_class, fields in unique_checks:
+            lookup = {name: getattr(self, self._meta.get_field(name).attname) for name in fields}
+            if None in lookup.values():
+                continue
+            deleted = model_class.all_objects.filter(is_deleted=True, **lookup)
+            if not self._state.adding:
+                deleted = deleted.exclude(pk=self.pk)
+            if deleted.exists():
+                key = fields[0] if len(fields) == 1 else NON_FIELD_ERRORS
+                errors.setdefault(key, []).append(self.unique_error_message(model_class, fields))
+        if errors:
+            raise ValidationError(errors)
+
 # -------------------------------------------------------------------------
 # Media Models
 # -------------------------------------------------------------------------
@@ -56,7 +165,19 @@ class Media(BaseModel):
         ordering = ['order', '-created_at']
         indexes = [
             models.Index(fields=['media_type']),
-            models.Index(fields=['content_type', 'object_id']),
+            # Object lookups always go through the soft-delete manager (all_objects
+            # is only used by pk), so the partial index is the only one needed
+            models.Index(
+                fields=['content_type', 'object_id', 'order'],
+                condition=models.Q(is_deleted=False), name='media_live_object_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'],
+                condition=models.Q(is_primary=True, is_deleted=False),
+                name='unique_primary_media_per_object',
+            ),
         ]
 
     def __str__(self):
@@ -87,7 +208,15 @@ class Media(BaseModel):
                 self.file.close()
             except Exception: # Catch potential errors during image processing
                 pass # Or log the error
-                
+
+        if self.is_primary and self.content_type_id and self.object_id:
+            # Only one primary per object; demote the previous one first
+            Media.objects.filter(
+                content_type_id=self.content_type_id,
+                object_id=self.object_id,
+                is_primary=True
+            ).exclude(pk=self.pk).update(is_primary=False)
+
         super().save(*args, **kwargs)
 
     def to_dict(self):
@@ -105,6 +234,30 @@ class Media(BaseModel):
 # -------------------------------------------------------------------------
 # Property Related Models
 # -------------------------------------------------------------------------
+class Tag(models.Model):
+    """
+    Normalized feature/amenity value. Mirrors the JSON lists on Property and
+    Room (kept in sync on save) so tag filters and counts can use indexes.
+    """
+    KIND_CHOICES = [
+        ('feature', _('ميزة')),
+        ('amenity', _('مرفق')),
+    ]
+
+    kind = models.CharField(_('النوع'), max_length=10, choices=KIND_CHOICES)
+    slug = models.SlugField(_('الرمز'), max_length=100, allow_unicode=True)
+    name = models.CharField(_('الاسم'), max_length=100)
+
+    class Meta:
+        verbose_name = _('وسم')
+        verbose_name_plural = _('الوسوم')
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'slug'], name='unique_tag_kind_slug'),
+        ]
+
+    def __str__(self):
+        return self.name
+
 class PropertyType(BaseModel):
     """Property type model"""
     name = models.CharField(_('الاسم'), max_length=50)
@@ -214,10 +367,13 @@ class Property(BaseModel):
     is_featured = models.BooleanField(_('مميز'), default=False)
     is_verified = models.BooleanField(_('موثق'), default=False)
     view_count = models.PositiveIntegerField(_('عدد المشاهدات'), default=0)
+    # Maintained by base.watchlist on follow/unfollow
+    watcher_count = models.PositiveIntegerField(_('عدد المتابعين'), default=0)
     availability_date = models.DateField(_('تاريخ التوفر'), null=True, blank=True)
 
     # Relations
     media = GenericRelation(Media, related_query_name='property')
+    tags = models.ManyToManyField(Tag, through='PropertyTag', related_name='properties', blank=True, verbose_name=_('الوسوم'))
 
     class Meta:
         verbose_name = _('عقار')
@@ -230,6 +386,12 @@ class Property(BaseModel):
             models.Index(fields=['market_value']),
             models.Index(fields=['property_type']),
             models.Index(fields=['location']),
+            # Listing filters/sorts. List views always filter on is_published, so
+            # these are partial indexes carrying that predicate
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True, is_deleted=False), name='property_pub_created_idx'),
+            models.Index(fields=['market_value'], condition=models.Q(is_published=True, is_deleted=False), name='property_pub_value_idx'),
+            models.Index(fields=['size_sqm'], condition=models.Q(is_published=True, is_deleted=False), name='property_pub_size_idx'),
+            models.Index(fields=['year_built'], condition=models.Q(is_published=True, is_deleted=False), name='property_pub_year_idx'),
         ]
 
     def __str__(self):
@@ -249,7 +411,7 @@ class Property(BaseModel):
             original_slug = self.slug
             count = 1
             # Ensure slug is unique
-            while Property.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
+            while Property.all_objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
                 self.slug = f"{original_slug}-{count}"
                 count += 1
         
@@ -299,6 +461,93 @@ class Property(BaseModel):
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
 
+class PropertyTag(models.Model):
+    """Property <-> Tag link; (tag, property) order serves tag intersection lookups"""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='property_links', db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'property'], name='unique_property_tag'),
+        ]
+
+class PropertyCard(models.Model):
+    """
+    Denormalized read model for property list pages: everything a card shows
+    in one row. Maintained from Property, Room, Media and the type/location
+    tables by base.cards (see signals.py); check_property_cards detects drift.
+    """
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    title = models.CharField(max_length=255)
+    slug = models.CharField(max_length=255)
+    property_number = models.CharField(max_length=50, blank=True)
+    deed_number = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20)
+    property_type_id = models.BigIntegerField(null=True)
+    property_type_name = models.CharField(max_length=50, blank=True)
+    building_type_id = models.BigIntegerField(null=True)
+    building_type_name = models.CharField(max_length=50, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    market_value = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    minimum_bid = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+    size_sqm = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    year_built = models.PositiveIntegerField(null=True)
+    main_image_url = models.CharField(max_length=255, blank=True)
+    room_count = models.PositiveIntegerField(default=0)
+    bathroom_count = models.PositiveIntegerField(default=0)
+    is_published = models.BooleanField(default=False)
+    is_featured = models.BooleanField(default=False)
+    created_at = models.DateTimeField(null=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('بطاقة عقار')
+        verbose_name_plural = _('بطاقات العقارات')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True), name='card_pub_created_idx'),
+            models.Index(fields=['market_value'], condition=models.Q(is_published=True), name='card_pub_value_idx'),
+            models.Index(fields=['city'], condition=models.Q(is_published=True), name='card_pub_city_idx'),
+            models.Index(fields=['property_type_id'], condition=models.Q(is_published=True), name='card_pub_type_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class MarketStat(models.Model):
+    """
+    Monthly market rollup per (city, property type): a quantile sketch of
+    market value per m² and closed-auction counters. Maintained by
+    base.market_stats from Property, Auction and Location saves (see
+    signals.py); rebuild_market_stats recomputes it from scratch.
+    """
+    city = models.CharField(max_length=100)
+    property_type_id = models.BigIntegerField()
+    month = models.DateField()
+    # Properties by created_at month
+    price_sketch = models.JSONField(default=dict)
+    priced_count = models.IntegerField(default=0)
+    # Auctions by end_date month
+    auctions_closed = models.IntegerField(default=0)
+    auctions_sold = models.IntegerField(default=0)
+    bid_ratio_sum = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('إحصائية سوق')
+        verbose_name_plural = _('إحصائيات السوق')
+        ordering = ['city', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'property_type_id', 'month'], name='market_stat_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='market_stat_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.city} / {self.property_type_id} / {self.month:%Y-%m}"
+
 # -------------------------------------------------------------------------
 # Room Related Models
 # -------------------------------------------------------------------------
@@ -335,14 +584,16 @@ class Room(BaseModel):
     has_bathroom = models.BooleanField(_('يحتوي على حمام'), default=False)
 
     media = GenericRelation(Media, related_query_name='room')
+    tags = models.ManyToManyField(Tag, related_name='rooms', blank=True, verbose_name=_('الوسوم'))
 
     class Meta:
         verbose_name = _('غرفة')
         verbose_name_plural = _('الغرف')
         ordering = ['floor', 'room_type']
         indexes = [
-            models.Index(fields=['property', 'floor']),
             models.Index(fields=['room_type']),
+            # Live rooms only; unfiltered lookups by property use the FK index
+            models.Index(fields=['property', 'floor'], condition=models.Q(is_deleted=False), name='room_live_property_idx'),
         ]
 
     def __str__(self):
@@ -420,10 +671,15 @@ class Auction(BaseModel):
     
     view_count = models.PositiveIntegerField(_('عدد المشاهدات'), default=0)
     bid_count = models.PositiveIntegerField(_('عدد المزايدات'), default=0)
+    # Maintained by base.watchlist on follow/unfollow
+    watcher_count = models.PositiveIntegerField(_('عدد المتابعين'), default=0)
+    # Maintained by base.registration on register/unregister
     registered_bidders = models.PositiveIntegerField(_('المزايدين المسجلين'), default=0)
 
     notify_before_start = models.PositiveIntegerField(_('إشعار قبل البدء (دقائق)'), default=60)
     notify_before_end = models.PositiveIntegerField(_('إشعار قبل الانتهاء (دقائق)'), default=30)
+    # Set once the bids have been moved to ArchivedBid (see bid_archive.py)
+    bids_archived_at = models.DateTimeField(_('تاريخ أرشفة المزايدات'), null=True, blank=True, editable=False)
 
     media = GenericRelation(Media, related_query_name='auction')
 
@@ -436,6 +692,13 @@ class Auction(BaseModel):
             models.Index(fields=['status']),
             models.Index(fields=['start_date']),
             models.Index(fields=['related_property']),
+            # Listing filters/sorts. List views always filter on is_published, so
+            # these are partial indexes carrying that predicate
+            models.Index(fields=['-start_date'], condition=models.Q(is_published=True, is_deleted=False), name='auction_pub_start_idx'),
+            models.Index(fields=['end_date'], condition=models.Q(is_published=True, is_deleted=False), name='auction_pub_end_idx'),
+            models.Index(fields=['status', 'end_date'], condition=models.Q(is_published=True, is_deleted=False), name='auction_pub_status_end_idx'),
+            models.Index(fields=['current_bid'], condition=models.Q(is_published=True, is_deleted=False), name='auction_pub_bid_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True, is_deleted=False), name='auction_pub_created_idx'),
         ]
 
     def __str__(self):
@@ -446,11 +709,14 @@ class Auction(BaseModel):
             self.slug = slugify(self.title)
             original_slug = self.slug
             count = 1
-            while Auction.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
+            while Auction.all_objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
                 self.slug = f"{original_slug}-{count}"
                 count += 1
 
-        if self.is_published and self.status in ['scheduled', 'live'] and self.related_property:
+        if (
+            self.is_published and self.status in ['scheduled', 'live'] and self.related_property
+            and self.related_property.status != 'auction'
+        ):
             self.related_property.status = 'auction'
             self.related_property.save(update_fields=['status'])
 
@@ -530,9 +796,11 @@ class Bid(BaseModel):
         verbose_name_plural = _('المزايدات')
         ordering = ['-bid_time']
         indexes = [
-            models.Index(fields=['auction', '-bid_time']),
-            models.Index(fields=['bidder']),
             models.Index(fields=['status']),
+            # Live bids only; unfiltered lookups by auction use the FK index
+            models.Index(fields=['auction', '-bid_time'], condition=models.Q(is_deleted=False), name='bid_live_auction_time_idx'),
+            # A bidder's history and per-auction summary (/api/bids/mine/); also covers bidder lookups
+            models.Index(fields=['bidder', '-bid_time'], condition=models.Q(is_deleted=False), name='bid_live_bidder_time_idx'),
         ]
 
     def __str__(self):
@@ -552,17 +820,19 @@ class Bid(BaseModel):
 
                 # Atomically update previous winning bids to 'outbid'
                 if self.status == 'accepted' or self.status == 'winning': # Consider new winning bids directly
+                    # .update() skips auto_now; set updated_at so incremental snapshots see the change
                     Bid.objects.filter(
                         auction=self.auction,
                         status='winning'
-                    ).exclude(id=self.id).update(status='outbid')
+                    ).exclude(id=self.id).update(status='outbid', updated_at=timezone.now())
                     
                     if self.status != 'winning': # If it was 'accepted', now make it 'winning'
                         self.status = 'winning'
                         super().save(update_fields=['status']) # Save just the status field
 
 
-            self.auction.save(update_fields=['bid_count', 'current_bid'])
+            # updated_at too, so the auction's Last-Modified moves with its price
+            self.auction.save(update_fields=['bid_count', 'current_bid', 'updated_at'])
 
     def to_dict(self):
         bidder_info = None
@@ -571,6 +841,7 @@ class Bid(BaseModel):
             bidder_info = {
                 'id': self.bidder.id,
                 'name': bidder_name or self.bidder.email,
+                'avatar_url': self.bidder.get_avatar_url(),
             }
         return {
             'id': self.id,
@@ -582,4 +853,202 @@ class Bid(BaseModel):
             'status_display': self.get_status_display(),
             'bid_time': self.bid_time.isoformat() if self.bid_time else None,
             'is_verified': self.is_verified,
-        }
\ No newline at end of file
+        }
+
+class ArchivedBid(models.Model):
+    """
+    A bid of an auction that closed long ago, moved out of the Bid table by
+    manage.py archive_bids. Keeps the original id and only the columns the
+    bid history needs.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='archived_bids', db_index=False, verbose_name=_('المزاد'))
+    bidder = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_bids', db_index=False, verbose_name=_('المزايد'))
+    bid_amount = models.DecimalField(_('مبلغ المزايدة'), max_digits=14, decimal_places=2)
+    max_bid_amount = models.DecimalField(_('الحد الأقصى للمزايدة'), max_digits=14, decimal_places=2, null=True, blank=True)
+    bid_time = models.DateTimeField(_('وقت المزايدة'))
+    status = models.CharField(_('الحالة'), max_length=20, choices=Bid.STATUS_CHOICES)
+    is_verified = models.BooleanField(_('تم التحقق'), default=False)
+    archived_at = models.DateTimeField(_('تاريخ الأرشفة'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('مزايدة مؤرشفة')
+        verbose_name_plural = _('المزايدات المؤرشفة')
+        ordering = ['-bid_time']
+        indexes = [
+            models.Index(fields=['auction', '-bid_time'], name='archived_bid_auction_idx'),
+            models.Index(fields=['bidder', '-bid_time'], name='archived_bid_bidder_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bidder_id} @ {self.auction_id}: {self.bid_amount}"
+
+class AuctionAnalytics(models.Model):
+    """
+    Bidding analytics of a closed auction, computed once from its bids by
+    base.auction_analytics. Dashboards read this row, never the bids.
+    """
+    auction = models.OneToOneField(Auction, on_delete=models.CASCADE, primary_key=True, related_name='analytics', verbose_name=_('المزاد'))
+    bid_count = models.PositiveIntegerField(_('عدد المزايدات'), default=0)
+    distinct_bidders = models.PositiveIntegerField(_('عدد المزايدين'), default=0)
+    first_bid_at = models.DateTimeField(_('وقت أول مزايدة'), null=True)
+    time_to_first_bid = models.DurationField(_('الوقت حتى أول مزايدة'), null=True)
+    peak_bids_per_minute = models.PositiveIntegerField(_('ذروة المزايدات في الدقيقة'), default=0)
+    # Bids per bucket from start_date: {'bucket_seconds': n, 'counts': [...]}
+    velocity = models.JSONField(_('سرعة المزايدة'), default=dict)
+    closing_window_minutes = models.PositiveIntegerField(_('نافذة الإغلاق (دقائق)'), default=0)
+    closing_window_bids = models.PositiveIntegerField(_('مزايدات نافذة الإغلاق'), default=0)
+    final_price = models.DecimalField(_('السعر النهائي'), max_digits=14, decimal_places=2, null=True)
+    price_to_start = models.FloatField(_('السعر إلى المزايدة الأولية'), null=True)
+    price_to_market = models.FloatField(_('السعر إلى القيمة السوقية'), null=True)
+    computed_at = models.DateTimeField(_('تاريخ الحساب'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('تحليلات مزاد')
+        verbose_name_plural = _('تحليلات المزادات')
+        ordering = ['-computed_at']
+
+    def __str__(self):
+        return str(self.auction_id)
+
+    @property
+    def closing_window_share(self):
+        return self.closing_window_bids / self.bid_count if self.bid_count else None
+
+class AuctionRegistration(models.Model):
+    """
+    A bidder registered for an auction (see base.registration). Auction.registered_bidders
+    counts these rows; with AUCTION_REGISTRATION_REQUIRED on, only registered users may bid.
+    """
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='registrations', verbose_name=_('المزاد'))
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='auction_registrations', verbose_name=_('المستخدم'))
+    registered_at = models.DateTimeField(_('تاريخ التسجيل'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('تسجيل في مزاد')
+        verbose_name_plural = _('التسجيلات في المزادات')
+        ordering = ['-registered_at']
+        constraints = [
+            # Also serves the per-auction membership reads
+            models.UniqueConstraint(fields=['auction', 'user'], name='unique_auction_registration'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-registered_at'], name='registration_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.auction_id}"
+
+# -------------------------------------------------------------------------
+# Saved Search Models
+# -------------------------------------------------------------------------
+class SavedSearch(BaseModel):
+    """
+    A listing query (the list endpoint's filter parameters) saved by a user.
+    City, type and price bounds are copied out of `filters` into indexed
+    columns so a newly published listing can find the searches it may match.
+    """
+    TARGET_CHOICES = [
+        ('property', _('عقارات')),
+        ('auction', _('مزادات')),
+    ]
+    # target -> predicate -> filter parameter it is read from
+    PREDICATE_PARAMS = {
+        'property': {
+            'city': 'location__city',
+            'listing_type_id': 'property_type',
+            'price_min': 'market_value__gte',
+            'price_max': 'market_value__lte',
+        },
+        'auction': {
+            'city': 'related_property__location__city',
+            'listing_type_id': 'auction_type',
+            'price_min': 'current_bid__gte',
+            'price_max': 'current_bid__lte',
+        },
+    }
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches', verbose_name=_('المستخدم'))
+    name = models.CharField(_('الاسم'), max_length=100)
+    target = models.CharField(_('نوع البحث'), max_length=10, choices=TARGET_CHOICES)
+    filters = models.JSONField(_('معايير البحث'), default=dict, blank=True)
+    notify = models.BooleanField(_('إرسال إشعارات'), default=True)
+
+    # Indexed predicates derived from `filters`; blank/null means "any"
+    city = models.CharField(_('المدينة'), max_length=100, blank=True, editable=False)
+    listing_type_id = models.PositiveIntegerField(_('النوع'), null=True, blank=True, editable=False)
+    price_min = models.DecimalField(_('أدنى سعر'), max_digits=14, decimal_places=2, null=True, blank=True, editable=False)
+    price_max = models.DecimalField(_('أعلى سعر'), max_digits=14, decimal_places=2, null=True, blank=True, editable=False)
+
+    class Meta:
+        verbose_name = _('بحث محفوظ')
+        verbose_name_plural = _('عمليات البحث المحفوظة')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['target', 'city', 'listing_type_id'], condition=models.Q(notify=True, is_deleted=False), name='saved_search_match_idx'),
+            models.Index(fields=['user', '-created_at'], condition=models.Q(is_deleted=False), name='saved_search_live_user_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        params = self.PREDICATE_PARAMS[self.target]
+        self.city = str(self.filters.get(params['city'], '')).strip()
+        self.listing_type_id = self.filters.get(params['listing_type_id']) or None
+        self.price_min = self.filters.get(params['price_min']) or None
+        self.price_max = self.filters.get(params['price_max']) or None
+        super().save(*args, **kwargs)
+
+class SavedSearchMatch(models.Model):
+    """A listing that matched a saved search; notified_at is set once it has been emailed"""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches', verbose_name=_('البحث'))
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True, related_name='search_matches', verbose_name=_('العقار'))
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, null=True, blank=True, related_name='search_matches', verbose_name=_('المزاد'))
+    matched_at = models.DateTimeField(_('وقت المطابقة'), default=timezone.now)
+    notified_at = models.DateTimeField(_('وقت الإشعار'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('نتيجة بحث محفوظ')
+        verbose_name_plural = _('نتائج البحث المحفوظ')
+        ordering = ['-matched_at']
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'property'], name='unique_search_property_match'),
+            models.UniqueConstraint(fields=['search', 'auction'], name='unique_search_auction_match'),
+        ]
+        indexes = [
+            models.Index(fields=['search'], condition=models.Q(notified_at__isnull=True), name='saved_search_pending_idx'),
+        ]
+
+# -------------------------------------------------------------------------
+# Watchlist
+# -------------------------------------------------------------------------
+class Watch(models.Model):
+    """A user following one auction or property (see base.watchlist)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='watches', verbose_name=_('المستخدم'))
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True, related_name='watches', verbose_name=_('العقار'))
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, null=True, blank=True, related_name='watches', verbose_name=_('المزاد'))
+    created_at = models.DateTimeField(_('تاريخ المتابعة'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('متابعة')
+        verbose_name_plural = _('قائمة المتابعة')
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'property'], name='unique_user_property_watch'),
+            models.UniqueConstraint(fields=['user', 'auction'], name='unique_user_auction_watch'),
+            models.CheckConstraint(
+                condition=models.Q(property__isnull=True, auction__isnull=False) | models.Q(property__isnull=False, auction__isnull=True),
+                name='watch_single_target',
+            ),
+        ]
+        indexes = [
+            # Fan-out reads every watcher id of one listing
+            models.Index(fields=['auction', 'user'], condition=models.Q(auction__isnull=False), name='watch_auction_user_idx'),
+            models.Index(fields=['property', 'user'], condition=models.Q(property__isnull=False), name='watch_property_user_idx'),
+            models.Index(fields=['user', '-created_at'], name='watch_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.auction_id or self.property_id}"
+
@@ -3,6 +3,8 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from django.utils.translation import gettext_lazy as _
 
+from .media import get_content_owner
+
 # --- Core Status/Role Permissions ---
 
 class IsVerifiedUser(BasePermission):
@@ -78,6 +80,10 @@ class IsObjectOwner(BasePermission):
             owner = obj.user
         elif hasattr(obj, 'bidder'): # Common for Bid models
              owner = obj.bidder
+        elif hasattr(obj, 'content_object'): # Media: owned through its target
+            # Views prefetch content objects (see media.with_content_objects)
+            target = obj.content_object
+            owner = get_content_owner(target) if target is not None else None
         
         # Grant permission if the user is the owner.
         # Ensure comparison is between user objects.
@@ -0,0 +1,290 @@
+"""
+Property recommendations.
+
+Published properties are encoded into column arrays (type and city as
+vocabulary indices, log price/size, an amenity matrix) held in memory and
+refreshed incrementally from updated_at. A user's profile preferences and
+bid history become weight vectors, and every candidate is scored in one
+vectorized NumPy pass.
+"""
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Property, PropertyTag, Bid, ArchivedBid
+from .tags import normalize_tags
+
+# How far (in natural-log units) a price/size may fall outside the wanted
+# range before its score halves
+RANGE_TOLERANCE = 0.25
+HISTORY_LIMIT = 50
+
+
+def _log(value):
+    return math.log(float(value)) if value else np.nan
+
+
+def _parse_list(value):
+    """Profile text fields hold comma-separated values or JSON"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    if value[0] in '[{':
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+@dataclass
+class Preferences:
+    type_weights: dict = field(default_factory=dict)  # property type id -> weight
+    city_weights: dict = field(default_factory=dict)  # lower-cased city -> weight
+    amenity_weights: dict = field(default_factory=dict)  # tag slug -> weight
+    price_range: tuple = None  # (low, high) in log space
+    size_range: tuple = None
+    exclude: set = field(default_factory=set)  # property ids
+
+
+def build_preferences(user):
+    """
+    Combine UserProfile preferences with the properties the user has bid on.
+
+    property_preferences may be a list of type codes, or a JSON object with
+    any of: types, amenities, min_price, max_price, min_size, max_size.
+    """
+    from .type_registry import type_registry
+    from .models import PropertyType
+
+    prefs = Preferences()
+    profile = getattr(user, 'profile', None)
+
+    if profile is not None:
+        locations = _parse_list(profile.preferred_locations)
+        if isinstance(locations, list):
+            for city in locations:
+                prefs.city_weights[str(city).strip().lower()] = 1.0
+
+        raw = _parse_list(profile.property_preferences)
+        options = raw if isinstance(raw, dict) else {'types': raw or []}
+        for value in options.get('types') or []:
+            property_type = type_registry.get(PropertyType, value)
+            if property_type is not None:
+                prefs.type_weights[property_type.pk] = 1.0
+        for slug in normalize_tags(options.get('amenities')):
+            prefs.amenity_weights[slug] = 1.0
+        for name, low, high in (('price_range', 'min_price', 'max_price'), ('size_range', 'min_size', 'max_size')):
+            try:
+                low_value = float(options[low]) if options.get(low) else None
+                high_value = float(options[high]) if options.get(high) else None
+            except (TypeError, ValueError):
+                continue
+            if low_value or high_value:
+                setattr(prefs, name, (
+                    math.log(low_value) if low_value else -np.inf,
+                    math.log(high_value) if high_value else np.inf,
+                ))
+
+    history = list(
+        Bid.objects.filter(bidder=user, auction__related_property__isnull=False)
+        .order_by().values_list('bid_time', 'auction__related_property_id')
+        .union(
+            ArchivedBid.objects.filter(bidder=user, auction__related_property__isnull=False)
+            .order_by().values_list('bid_time', 'auction__related_property_id'),
+            all=True,
+        )
+        .order_by('-bid_time')[:HISTORY_LIMIT]
+    )
+    history = [property_id for _, property_id in history]
+    if history:
+        history = set(history)
+        prefs.exclude.update(history)
+        rows = list(
+            Property.objects.filter(id__in=history)
+            .values_list('property_type_id', 'location__city', 'market_value')
+        )
+        # Every bid may be on a property deleted since (archived bids especially)
+        if rows:
+            share = 1.0 / len(rows)
+            prices = []
+            for type_id, city, price in rows:
+                prefs.type_weights[type_id] = prefs.type_weights.get(type_id, 0) + share
+                if city:
+                    prefs.city_weights[city.lower()] = prefs.city_weights.get(city.lower(), 0) + share
+                if price:
+                    prices.append(math.log(float(price)))
+            for slug in PropertyTag.objects.filter(property_id__in=history, tag__kind='amenity').values_list('tag__slug', flat=True):
+                prefs.amenity_weights[slug] = prefs.amenity_weights.get(slug, 0) + share
+            if prices and prefs.price_range is None:
+                center = float(np.median(prices))
+                prefs.price_range = (center - RANGE_TOLERANCE, center + RANGE_TOLERANCE)
+
+    prefs.exclude.update(Property.objects.filter(owner=user).values_list('id', flat=True))
+    return prefs
+
+
+class _Columns:
+    """
+    One generation of the feature columns. Readers only ever see a finished
+    generation: _sync fills a copy and the index swaps it in with a single
+    assignment.
+    """
+
+    def __init__(self):
+        self.positions = {}  # property id -> row
+        self.ids = np.empty(0, dtype=np.int64)
+        self.active = np.empty(0, dtype=bool)
+        self.type_idx = np.empty(0, dtype=np.int32)
+        self.city_idx = np.empty(0, dtype=np.int32)
+        self.log_price = np.empty(0, dtype=np.float32)
+        self.log_size = np.empty(0, dtype=np.float32)
+        self.popularity = np.empty(0, dtype=np.float32)
+        self.amenities = np.zeros((0, 0), dtype=np.uint8)
+        self.type_vocab = {}
+        self.city_vocab = {}
+        self.amenity_vocab = {}
+
+    def copy(self):
+        columns = _Columns()
+        for name, value in vars(self).items():
+            setattr(columns, name, value.copy())
+        return columns
+
+
+class PropertyFeatureIndex:
+    """In-memory feature columns for published properties"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.columns = _Columns()
+        self.synced_at = None
+        self.checked_at = 0.0
+        self.built_at = 0.0
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < settings.RECOMMENDATION_REFRESH_SECONDS:
+            return
+        with self._lock:
+            if now - self.checked_at < settings.RECOMMENDATION_REFRESH_SECONDS:
+                return
+            # Hard deletes leave no trace in updated_at; a periodic rebuild drops them
+            if self.synced_at is None or now - self.built_at > settings.RECOMMENDATION_REBUILD_SECONDS:
+                self.columns = self._sync(_Columns(), Property.objects.filter(is_published=True))
+                self.built_at = now
+            else:
+                self.columns = self._sync(self.columns, Property.all_objects.filter(updated_at__gt=self.synced_at))
+            self.checked_at = now
+
+    def _sync(self, columns, queryset):
+        """The columns with `queryset` applied; a copy when anything changed"""
+        started = timezone.now()
+        rows = list(queryset.order_by().values_list(
+            'id', 'is_published', 'is_deleted', 'property_type_id', 'location__city',
+            'market_value', 'size_sqm', 'view_count',
+        ))
+        if not rows:
+            self.synced_at = self.synced_at or started
+            return columns
+
+        columns = columns.copy()
+        new_ids = [row[0] for row in rows if row[0] not in columns.positions]
+        grow = len(new_ids)
+        if grow:
+            start = len(columns.ids)
+            for offset, property_id in enumerate(new_ids):
+                columns.positions[property_id] = start + offset
+            columns.ids = np.concatenate([columns.ids, np.array(new_ids, dtype=np.int64)])
+            columns.active = np.concatenate([columns.active, np.zeros(grow, dtype=bool)])
+            for name, dtype in (('type_idx', np.int32), ('city_idx', np.int32), ('log_price', np.float32),
+                                ('log_size', np.float32), ('popularity', np.float32)):
+                setattr(columns, name, np.concatenate([getattr(columns, name), np.zeros(grow, dtype=dtype)]))
+            columns.amenities = np.concatenate(
+                [columns.amenities, np.zeros((grow, columns.amenities.shape[1]), dtype=np.uint8)]
+            )
+
+        positions = np.array([columns.positions[row[0]] for row in rows], dtype=np.int64)
+        columns.active[positions] = [row[1] and not row[2] for row in rows]
+        columns.type_idx[positions] = [columns.type_vocab.setdefault(row[3], len(columns.type_vocab)) for row in rows]
+        columns.city_idx[positions] = [
+            columns.city_vocab.setdefault((row[4] or '').lower(), len(columns.city_vocab)) for row in rows
+        ]
+        columns.log_price[positions] = [_log(row[5]) for row in rows]
+        columns.log_size[positions] = [_log(row[6]) for row in rows]
+        columns.popularity[positions] = [math.log1p(row[7] or 0) for row in rows]
+
+        tags = (
+            PropertyTag.objects.filter(tag__kind='amenity', property__in=queryset.order_by().values('id'))
+            .values_list('property_id', 'tag__slug')
+        )
+        vocab = columns.amenity_vocab
+        pairs = [(columns.positions[property_id], vocab.setdefault(slug, len(vocab)))
+                 for property_id, slug in tags if property_id in columns.positions]
+        if len(vocab) > columns.amenities.shape[1]:
+            extra = len(vocab) - columns.amenities.shape[1]
+            columns.amenities = np.pad(columns.amenities, ((0, 0), (0, extra)))
+        columns.amenities[positions] = 0
+        if pairs:
+            rows_idx, cols_idx = zip(*pairs)
+            columns.amenities[list(rows_idx), list(cols_idx)] = 1
+
+        self.synced_at = started
+        return columns
+
+    def _weights(self, vocab, weights, normalize=lambda key: key):
+        vector = np.zeros(len(vocab), dtype=np.float32)
+        for key, index in vocab.items():
+            vector[index] = weights.get(normalize(key), 0.0)
+        return vector
+
+    @staticmethod
+    def _range_score(values, bounds):
+        low, high = bounds
+        distance = np.maximum(low - values, 0) + np.maximum(values - high, 0)
+        return np.nan_to_num(np.exp2(-(distance / RANGE_TOLERANCE) ** 2), nan=0.0)
+
+    def top(self, prefs, limit):
+        """(property ids, scores) of the best `limit` candidates"""
+        self.ensure_fresh()
+        columns = self.columns
+        weights = settings.RECOMMENDATION_WEIGHTS
+        ids = columns.ids
+        scores = weights['popularity'] * columns.popularity / max(float(columns.popularity.max(initial=0)), 1.0)
+
+        if prefs.type_weights:
+            scores += weights['type'] * self._weights(columns.type_vocab, prefs.type_weights)[columns.type_idx]
+        if prefs.city_weights:
+            scores += weights['city'] * self._weights(columns.city_vocab, prefs.city_weights)[columns.city_idx]
+        if prefs.price_range:
+            scores += weights['price'] * self._range_score(columns.log_price, prefs.price_range)
+        if prefs.size_range:
+            scores += weights['size'] * self._range_score(columns.log_size, prefs.size_range)
+        if prefs.amenity_weights and columns.amenity_vocab:
+            vector = self._weights(columns.amenity_vocab, prefs.amenity_weights)
+            if vector.sum():
+                scores += weights['amenities'] * (columns.amenities @ vector) / vector.sum()
+
+        mask = columns.active.copy()
+        if prefs.exclude:
+            mask &= ~np.isin(ids, np.fromiter(prefs.exclude, dtype=np.int64))
+        scores = np.where(mask, scores, -np.inf)
+
+        limit = min(limit, int(mask.sum()))
+        if limit <= 0:
+            return [], []
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return ids[best].tolist(), scores[best].tolist()
+
+property_index = PropertyFeatureIndex()
+
+
+def recommend_properties(user, limit=20):
+    return property_index.top(build_preferences(user), limit)
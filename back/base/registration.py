@@ -0,0 +1,177 @@
+"""
+Auction registration: with settings.AUCTION_REGISTRATION_REQUIRED on, only
+registered users may bid. register/unregister keep
+Auction.registered_bidders in step with an F() update whose WHERE clause
+also enforces the deadline, and each auction's registrant ids are cached as
+one set so the eligibility check on every bid is a cache read and a set
+lookup. The set sits under a per-auction version bumped when a registration
+change commits, so a fill racing with one can't pin a stale set.
+cancel_underfilled_auctions() is the lifecycle pass that cancels auctions
+whose registration closed short of minimum_participants.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from accounts.tasks import run_in_background
+from .conditional import bump_model_version, get_version, bump_version
+from .facets import bump_facets_version
+from .instrumentation import record_cache
+from .market_stats import add_market_stats
+from .models import Auction, AuctionRegistration, Bid, ArchivedBid
+from .watchlist import notify_watchers
+
+logger = logging.getLogger(__name__)
+
+# Registration is possible while an auction is in one of these states
+OPEN_STATUSES = ('scheduled', 'live')
+
+
+class RegistrationError(ValueError):
+    pass
+
+
+def registration_open(now):
+    """Auctions still taking registrations: before registration_deadline, or end_date without one"""
+    return Q(status__in=OPEN_STATUSES) & (
+        Q(registration_deadline__gt=now) | Q(registration_deadline__isnull=True, end_date__gt=now)
+    )
+
+
+def _version_key(auction_id):
+    return f'registrants_version:{auction_id}'
+
+
+def _cache_key(auction_id, version):
+    return f'registrants:{auction_id}:{version}'
+
+
+def _count_change(auction_id, delta, now):
+    """Move registered_bidders by delta; 0 rows when registration has closed meanwhile"""
+    rows = Auction.objects.filter(registration_open(now), pk=auction_id)
+    if delta < 0:
+        rows = rows.filter(registered_bidders__gte=-delta)
+    updated = rows.update(registered_bidders=F('registered_bidders') + delta)
+
+    def after_commit():
+        bump_version(_version_key(auction_id), settings.REGISTRANTS_CACHE_SECONDS)
+        bump_model_version(Auction)
+    if updated:
+        transaction.on_commit(after_commit)
+    return updated
+
+
+def register(user, auction):
+    """Register a user for an auction; returns (registration, created)"""
+    now = timezone.now()
+    if not auction.is_published or auction.status not in OPEN_STATUSES:
+        raise RegistrationError(_("This auction is not open for registration"))
+    if now >= (auction.registration_deadline or auction.end_date):
+        raise RegistrationError(_("The registration deadline has passed"))
+    if auction.related_property.owner_id == user.pk:
+        raise RegistrationError(_("You cannot register for your own auction"))
+
+    with transaction.atomic():
+        registration, created = AuctionRegistration.objects.get_or_create(auction=auction, user=user)
+        if created and not _count_change(auction.pk, 1, now):
+            # The deadline passed (or the auction closed) since the checks above
+            raise RegistrationError(_("The registration deadline has passed"))
+    if created:
+        auction.refresh_from_db(fields=['registered_bidders'])
+    return registration, created
+
+
+def unregister(registration):
+    """Withdraw a registration; only while registration is open and before bidding"""
+    with transaction.atomic():
+        # A bid updates its auction's row, so a bid transaction already under way is waited for
+        # here and its bid seen below; withdrawals of one auction also queue behind each other
+        list(Auction.all_objects.select_for_update().filter(pk=registration.auction_id).values_list('pk', flat=True))
+        if Bid.objects.filter(auction_id=registration.auction_id, bidder_id=registration.user_id).exists():
+            raise RegistrationError(_("You cannot withdraw after bidding"))
+        if not _count_change(registration.auction_id, -1, timezone.now()):
+            raise RegistrationError(_("Registration can no longer be withdrawn"))
+        AuctionRegistration.objects.filter(pk=registration.pk).delete()
+
+
+def registrant_ids(auction_id):
+    """Ids of the users registered for an auction; cached until the next register/unregister"""
+    timeout = settings.REGISTRANTS_CACHE_SECONDS
+    key = _cache_key(auction_id, get_version(_version_key(auction_id), timeout))
+    ids = cache.get(key)
+    record_cache(hits=ids is not None, misses=ids is None)
+    if ids is None:
+        ids = frozenset(AuctionRegistration.objects.filter(auction_id=auction_id).values_list('user_id', flat=True))
+        cache.add(key, ids, timeout)
+    return ids
+
+
+def is_registered(auction_id, user_id):
+    return user_id in registrant_ids(auction_id)
+
+
+def underfilled_auctions(now=None):
+    """Open auctions whose registration closed with fewer than minimum_participants registrants"""
+    now = now or timezone.now()
+    return Auction.objects.filter(
+        Q(registration_deadline__lte=now) | Q(registration_deadline__isnull=True, end_date__lte=now),
+        status__in=OPEN_STATUSES,
+        registered_bidders__lt=F('minimum_participants'),
+    )
+
+
+def cancel_underfilled_auctions(now=None):
+    """
+    Cancel every underfilled auction with one UPDATE, then apply what the
+    per-row save signals would have: market stats, cache versions and the
+    watcher notifications. Returns the cancelled ids.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(underfilled_auctions(now).select_for_update().order_by('pk').values_list('pk', 'watcher_count'))
+        ids = [pk for pk, watcher_count in rows]
+        if not ids:
+            return ids
+        Auction.objects.filter(pk__in=ids).update(status='cancelled', updated_at=now)
+        add_market_stats(Auction, ids)
+
+        def after_commit():
+            bump_model_version(Auction)
+            bump_facets_version()
+        transaction.on_commit(after_commit)
+        for pk, watcher_count in rows:
+            if watcher_count:
+                run_in_background(notify_watchers, pk, 'closed')
+    logger.info(f"Cancelled {len(ids)} auctions below their minimum participants")
+    return ids
+
+
+def backfill_registrations(batch_size=2000):
+    """
+    Register everyone who already bid (live or archived bids) on an auction
+    and recount registered_bidders from the rows. Returns the registrations added.
+    """
+    pairs = Bid.all_objects.order_by().values_list('auction_id', 'bidder_id').union(
+        ArchivedBid.objects.order_by().values_list('auction_id', 'bidder_id')
+    )
+    before = AuctionRegistration.objects.count()
+    batch = []
+    for auction_id, user_id in pairs.iterator(chunk_size=batch_size):
+        batch.append(AuctionRegistration(auction_id=auction_id, user_id=user_id))
+        if len(batch) >= batch_size:
+            AuctionRegistration.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    AuctionRegistration.objects.bulk_create(batch, ignore_conflicts=True)
+
+    counts = AuctionRegistration.objects.filter(auction=OuterRef('pk')).order_by().values('auction').annotate(n=Count('pk')).values('n')
+    Auction.all_objects.update(registered_bidders=Coalesce(Subquery(counts), 0))
+    # A dropped version is as good as a bumped one: the next read starts a new one
+    cache.delete_many([_version_key(pk) for pk in Auction.all_objects.values_list('pk', flat=True).iterator()])
+    bump_model_version(Auction)
+    return AuctionRegistration.objects.count() - before
@@ -0,0 +1,43 @@
+"""
+JSON rendering for the API.
+
+FastJSONRenderer encodes with orjson when it is installed: datetime and UUID
+are handled natively and text is written as UTF-8 without \\uXXXX escaping.
+orjson has no Decimal support, so Decimal (like every other type it doesn't
+know) goes through DRF's encoder as the `default` callback. Output matches
+DRF's JSONRenderer (compact separators, `Z` for UTC). Without orjson, or
+when an indented response is requested, it falls back to DRF's stdlib
+encoder.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def __init__(self):
+        super().__init__()
+        self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        backend = getattr(settings, 'API_JSON_BACKEND', 'orjson')
+        if (
+            orjson is None or backend != 'orjson' or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=self.default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+        # Same strict-JavaScript-subset escaping as DRF
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
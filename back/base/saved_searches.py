@@ -0,0 +1,94 @@
+"""Matching newly published listings against saved searches, and match digests."""
+import logging
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .filters import PropertyFilter, AuctionFilter
+from .models import Property, Auction, SavedSearch, SavedSearchMatch
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TARGETS = {
+    'property': (Property, PropertyFilter),
+    'auction': (Auction, AuctionFilter),
+}
+
+# Listing values compared against the indexed predicate columns
+LISTING_VALUES = {
+    'property': ('location__city', 'property_type_id', 'market_value'),
+    'auction': ('related_property__location__city', 'auction_type_id', 'current_bid'),
+}
+
+
+def candidate_searches(target, city, type_id, price):
+    """Searches whose indexed predicates (city, type, price bounds) all accept the listing"""
+    query = Q(target=target, notify=True, is_deleted=False)
+    query &= Q(city='') | Q(city=city or '')
+    query &= Q(listing_type_id__isnull=True) | Q(listing_type_id=type_id)
+    if price is None:
+        query &= Q(price_min__isnull=True, price_max__isnull=True)
+    else:
+        query &= Q(price_min__isnull=True) | Q(price_min__lte=price)
+        query &= Q(price_max__isnull=True) | Q(price_max__gte=price)
+    return SavedSearch.objects.filter(query)
+
+
+def match_listings(target, ids):
+    """
+    Record SavedSearchMatch rows for published listings. Only searches found
+    through the predicate index are considered; those with further filters
+    are confirmed by running their filter set against the single listing.
+    """
+    model, filterset_class = SEARCH_TARGETS[target]
+    indexed = set(SavedSearch.PREDICATE_PARAMS[target].values())
+    listings = model.objects.filter(pk__in=ids, is_published=True).values_list('pk', *LISTING_VALUES[target])
+
+    matches = []
+    for pk, city, type_id, price in listings:
+        for search in candidate_searches(target, city, type_id, price):
+            if set(search.filters) - indexed:
+                filterset = filterset_class(search.filters, queryset=model.objects.filter(pk=pk))
+                if not filterset.is_valid() or not filterset.qs.exists():
+                    continue
+            matches.append(SavedSearchMatch(search=search, **{target + '_id': pk}))
+
+    SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return len(matches)
+
+
+def send_match_digests(limit=None):
+    """Email each user one digest of their un-notified matches; returns the number of emails sent"""
+    from accounts.utils import send_email
+
+    pending = (
+        SavedSearchMatch.objects.filter(notified_at__isnull=True, search__notify=True)
+        .select_related('search__user', 'property', 'auction')
+        .order_by('search__user_id', 'search_id', 'matched_at')
+    )
+    by_user = defaultdict(list)
+    for match in pending.iterator(chunk_size=1000):
+        by_user[match.search.user].append(match)
+
+    sent = 0
+    for user, matches in list(by_user.items())[:limit]:
+        searches = defaultdict(list)
+        for match in matches:
+            listing = match.property or match.auction
+            if listing is not None and not listing.is_deleted:
+                searches[match.search.name].append({'title': listing.title, 'slug': listing.slug, 'target': match.search.target})
+        if searches and not send_email(
+            to_email=user.email,
+            subject="New listings match your saved searches",
+            template_name='saved_search_matches',
+            context={'user_name': user.first_name, 'searches': dict(searches)},
+            action_type='notification',
+            check_limits=False,
+            fail_silently=True,
+        ):
+            logger.warning(f"Saved search digest to {user.email} failed; will retry")
+            continue
+        SavedSearchMatch.objects.filter(id__in=[match.id for match in matches]).update(notified_at=timezone.now())
+        sent += 1
+    return sent
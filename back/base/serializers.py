@@ -1,19 +1,142 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from .models import (
-   Media, Property, Room, Auction, Bid,
+   Media, Property, Room, Auction, Bid, AuctionAnalytics, Watch, AuctionRegistration,
    PropertyType, BuildingType, Location, RoomType,
-   AuctionType
+   AuctionType, SavedSearch, SavedSearchMatch, PropertyCard
 )
-
-class BaseTypeSerializer(serializers.ModelSerializer):
+from .media import MEDIA_CONTENT_MODELS
+from .type_registry import type_registry
+from .registration import is_registered
+from .instrumentation import serializer_timer
+
+def parse_field_paths(value):
+   """'id,property.title,property.rooms' -> {'id': {}, 'property': {'title': {}, 'rooms': {}}}"""
+   tree = {}
+   for path in (value or '').split(','):
+       node = tree
+       for name in path.strip().split('.'):
+           if name:
+               node = node.setdefault(name, {})
+   return tree
+
+class SparseFieldsMixin:
+   """
+   Sparse fieldsets and explicit expansion for read requests.
+
+   ?fields=id,title,property.title limits the representation (dotted paths
+   reach into nested serializers) and ?expand=rooms,property.media pulls in
+   nested relations. Once either parameter is given, the fields listed in
+   Meta.expandable_fields are left out unless named in one of them; without
+   both, the full representation is returned.
+
+   Meta.select_related_fields / Meta.prefetch_related_fields map field names
+   to the lookups they read, so get_related_lookups() can tell the view what
+   the requested shape needs loaded.
+   """
+
+   def get_sparse_spec(self):
+       """None for the full representation, else (fields tree or None, expand tree)"""
+       if hasattr(self, '_sparse_spec'):
+           return self._sparse_spec
+       parent = self.parent
+       if isinstance(parent, serializers.ListSerializer):
+           parent = parent.parent
+       request = self.context.get('request')
+       if parent is not None or request is None or request.method not in ('GET', 'HEAD'):
+           return None
+       params = request.query_params
+       if 'fields' not in params and 'expand' not in params:
+           return None
+       return parse_field_paths(params.get('fields')) or None, parse_field_paths(params.get('expand'))
+
+   def get_fields(self):
+       fields = super().get_fields()
+       spec = self.get_sparse_spec()
+       if spec is not None:
+           wanted, expand = spec
+           expandable = getattr(self.Meta, 'expandable_fields', ())
+           for name in list(fields):
+               if wanted is not None:
+                   keep = name in wanted or name in expand
+               else:
+                   keep = name not in expandable or name in expand
+               if not keep:
+                   del fields[name]
+       for name, field in fields.items():
+           child = field.child if isinstance(field, serializers.ListSerializer) else field
+           if isinstance(child, SparseFieldsMixin):
+               # Nested serializers take their part of the spec from here, never from the request
+               child._sparse_spec = None if spec is None else (
+                   (spec[0] or {}).get(name) or None, spec[1].get(name, {})
+               )
+       return fields
+
+   def get_related_lookups(self, prefix='', many=False):
+       """
+       (select_related, prefetch_related) lookups for the fields this
+       serializer will render; below a to-many relation everything is prefetched.
+       """
+       select, prefetch = [], []
+       select_fields = getattr(self.Meta, 'select_related_fields', {})
+       prefetch_fields = getattr(self.Meta, 'prefetch_related_fields', {})
+       for name, field in self.fields.items():
+           for lookup in select_fields.get(name, ()):
+               (prefetch if many else select).append(prefix + lookup)
+           prefetch.extend(prefix + lookup for lookup in prefetch_fields.get(name, ()))
+
+           child = field.child if isinstance(field, serializers.ListSerializer) else field
+           if isinstance(child, SparseFieldsMixin) and field.source != '*':
+               nested_select, nested_prefetch = child.get_related_lookups(
+                   prefix + field.source.replace('.', '__') + '__',
+                   many or child is not field
+               )
+               select.extend(nested_select)
+               prefetch.extend(nested_prefetch)
+       return list(dict.fromkeys(select)), list(dict.fromkeys(prefetch))
+
+   def to_representation(self, instance):
+       parent = self.parent
+       if isinstance(parent, serializers.ListSerializer):
+           parent = parent.parent
+       if parent is not None:
+           return super().to_representation(instance)
+       # Top-level objects only, so nested serializers are not timed twice (Server-Timing)
+       with serializer_timer():
+           return super().to_representation(instance)
+
+class SoftDeletedUniqueMixin:
+   """
+   Unique and unique-together validators check soft-deleted rows as well.
+   Those keep their values in the table, so a clash with one would otherwise
+   pass validation and fail on insert.
+   """
+
+   @staticmethod
+   def _including_deleted(validator):
+       if isinstance(validator, (UniqueValidator, UniqueTogetherValidator)):
+           validator.queryset = validator.queryset.model.all_objects.all()
+       return validator
+
+   def build_standard_field(self, field_name, model_field):
+       field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+       if 'validators' in field_kwargs:
+           field_kwargs['validators'] = [self._including_deleted(v) for v in field_kwargs['validators']]
+       return field_class, field_kwargs
+
+   def get_unique_together_validators(self):
+       return [self._including_deleted(v) for v in super().get_unique_together_validators()]
+
+class BaseTypeSerializer(SoftDeletedUniqueMixin, SparseFieldsMixin, serializers.ModelSerializer):
    """Base serializer for type models"""
    class Meta:
        abstract = True
        fields = ['id', 'name', 'code', 'created_at', 'updated_at']
        read_only_fields = ['created_at', 'updated_at']
 
-class MediaSerializer(serializers.ModelSerializer):
+class MediaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
    url = serializers.SerializerMethodField()
    size = serializers.SerializerMethodField()
 
@@ -22,7 +145,7 @@ class MediaSerializer(serializers.ModelSerializer):
        fields = [
            'id', 'url', 'name', 'media_type', 
            'size', 'mime_type', 'width', 'height',
-           'is_primary', 'created_at'
+           'order', 'is_primary', 'created_at'
        ]
        read_only_fields = [
            'size', 'mime_type', 'width', 
@@ -40,6 +163,80 @@ class MediaSerializer(serializers.ModelSerializer):
            raise serializers.ValidationError(_("File size cannot exceed 10MB"))
        return value
 
+class MediaTargetSerializer(serializers.Serializer):
+   """Identifies the object a batch of media belongs to"""
+   content_type = serializers.ChoiceField(choices=list(MEDIA_CONTENT_MODELS))
+   object_id = serializers.IntegerField(min_value=1)
+
+   def validate(self, attrs):
+       model = MEDIA_CONTENT_MODELS[attrs['content_type']]
+       try:
+           attrs['content_object'] = model.objects.get(pk=attrs['object_id'])
+       except model.DoesNotExist:
+           raise serializers.ValidationError({'object_id': _("Object not found")})
+       return attrs
+
+class MediaBatchUploadSerializer(MediaTargetSerializer):
+   files = serializers.ListField(child=serializers.FileField(), allow_empty=False)
+   order = serializers.JSONField(required=False)
+   primary = serializers.CharField(required=False, allow_blank=True)
+
+   def validate_files(self, value):
+       max_files = getattr(settings, 'MEDIA_BATCH_MAX_FILES', 50)
+       if len(value) > max_files:
+           raise serializers.ValidationError(
+               _("Cannot upload more than {} files at once").format(max_files)
+           )
+       for upload in value:
+           if upload.size > 10 * 1024 * 1024:  # 10MB
+               raise serializers.ValidationError(_("File size cannot exceed 10MB"))
+       return value
+
+   def validate_order(self, value):
+       if not isinstance(value, list):
+           raise serializers.ValidationError(_("Order must be a list of media ids or \"file:<n>\" tokens"))
+       return value
+
+   @staticmethod
+   def parse_token(token, file_count):
+       """A media id, or "file:<n>" for the n-th upload of this request; None when invalid"""
+       if isinstance(token, str):
+           if token.startswith('file:'):
+               index = token[5:]
+               return f'file:{int(index)}' if index.isdigit() and int(index) < file_count else None
+           token = int(token) if token.isdigit() else None
+       if isinstance(token, int) and not isinstance(token, bool) and token > 0:
+           return token
+       return None
+
+   def validate(self, attrs):
+       file_count = len(attrs['files'])
+       if 'order' in attrs:
+           tokens = [self.parse_token(token, file_count) for token in attrs['order']]
+           if None in tokens:
+               raise serializers.ValidationError({'order': [
+                   _("Each entry must be a media id or \"file:<n>\" with n below the number of files")
+               ]})
+           if len(set(tokens)) != len(tokens):
+               raise serializers.ValidationError({'order': [_("Order contains duplicate entries")]})
+           attrs['order'] = tokens
+       if attrs.get('primary'):
+           attrs['primary'] = self.parse_token(attrs['primary'], file_count)
+           if attrs['primary'] is None:
+               raise serializers.ValidationError({'primary': [
+                   _("Must be a media id or \"file:<n>\" with n below the number of files")
+               ]})
+       return super().validate(attrs)
+
+class MediaReorderSerializer(MediaTargetSerializer):
+   order = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+   primary = serializers.IntegerField(required=False, allow_null=True)
+
+   def validate_order(self, value):
+       if len(set(value)) != len(value):
+           raise serializers.ValidationError(_("Order contains duplicate ids"))
+       return value
+
 class PropertyTypeSerializer(BaseTypeSerializer):
    class Meta(BaseTypeSerializer.Meta):
        model = PropertyType
@@ -56,7 +253,44 @@ class AuctionTypeSerializer(BaseTypeSerializer):
    class Meta(BaseTypeSerializer.Meta):
        model = AuctionType
 
-class LocationSerializer(serializers.ModelSerializer):
+class TypeRelatedField(serializers.RelatedField):
+   """Writable type reference accepting an id or a code, resolved from the type registry"""
+   default_error_messages = {
+       'does_not_exist': _('Invalid {model} "{value}".'),
+   }
+
+   def __init__(self, model, **kwargs):
+       self.model = model
+       kwargs.setdefault('queryset', model.objects.all())
+       super().__init__(**kwargs)
+
+   def to_internal_value(self, data):
+       obj = type_registry.get(self.model, data)
+       if obj is None:
+           self.fail('does_not_exist', model=self.model._meta.verbose_name, value=data)
+       return obj
+
+   def use_pk_only_optimization(self):
+       return True
+
+   def to_representation(self, value):
+       return value.pk
+
+class CachedTypeField(serializers.Field):
+   """Read-only nested type rendered from the registry by foreign key id, without a join"""
+
+   def __init__(self, model, serializer_class, **kwargs):
+       self.model = model
+       self.serializer_class = serializer_class
+       kwargs['read_only'] = True
+       super().__init__(**kwargs)
+
+   def to_representation(self, value):
+       if value is None:
+           return None
+       return type_registry.representation(self.model, self.serializer_class, value)
+
+class LocationSerializer(SoftDeletedUniqueMixin, SparseFieldsMixin, serializers.ModelSerializer):
    class Meta:
        model = Location
        fields = [
@@ -72,8 +306,8 @@ class LocationSerializer(serializers.ModelSerializer):
                )
        return attrs
 
-class RoomSerializer(serializers.ModelSerializer):
-   type = RoomTypeSerializer(source='room_type', read_only=True)
+class RoomSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   type = CachedTypeField(RoomType, RoomTypeSerializer, source='room_type_id')
    media = MediaSerializer(many=True, read_only=True)
 
    class Meta:
@@ -83,6 +317,8 @@ class RoomSerializer(serializers.ModelSerializer):
            'area_sqm', 'dimensions', 'features',
            'has_window', 'has_bathroom', 'media'
        ]
+       expandable_fields = ['media']
+       prefetch_related_fields = {'media': ['media']}
 
    def validate_dimensions(self, value):
        if not isinstance(value, dict):
@@ -99,9 +335,11 @@ class RoomSerializer(serializers.ModelSerializer):
            )
        return value
 
-class PropertySerializer(serializers.ModelSerializer):
-   type = PropertyTypeSerializer(source='property_type', read_only=True)
-   building = BuildingTypeSerializer(source='building_type', read_only=True)
+class PropertySerializer(SoftDeletedUniqueMixin, SparseFieldsMixin, serializers.ModelSerializer):
+   type = CachedTypeField(PropertyType, PropertyTypeSerializer, source='property_type_id')
+   building = CachedTypeField(BuildingType, BuildingTypeSerializer, source='building_type_id')
+   property_type = TypeRelatedField(PropertyType)
+   building_type = TypeRelatedField(BuildingType, required=False, allow_null=True)
    location = LocationSerializer(read_only=True)
    rooms = RoomSerializer(many=True, read_only=True)
    media = MediaSerializer(many=True, read_only=True)
@@ -118,14 +356,22 @@ class PropertySerializer(serializers.ModelSerializer):
            'market_value', 'minimum_bid', 'features',
            'amenities', 'owner', 'is_published',
            'is_featured', 'is_verified', 'rooms',
-           'media', 'main_image', 'created_at'
+           'media', 'main_image', 'watcher_count', 'created_at'
        ]
        read_only_fields = [
-           'property_number', 'owner', 'created_at'
+           'property_number', 'owner', 'watcher_count', 'created_at'
        ]
+       expandable_fields = ['location', 'rooms', 'media', 'main_image']
+       select_related_fields = {'location': ['location']}
+       prefetch_related_fields = {'rooms': ['rooms'], 'media': ['media'], 'main_image': ['media']}
 
    def get_main_image(self, obj):
-       image = obj.get_main_image()
+       if 'media' in getattr(obj, '_prefetched_objects_cache', {}):
+           # Same choice as Property.get_main_image(), from the prefetched rows
+           images = [item for item in obj.media.all() if item.media_type == 'image']
+           image = next((item for item in images if item.is_primary), images[0] if images else None)
+       else:
+           image = obj.get_main_image()
        return MediaSerializer(image).data if image else None
 
    def validate(self, data):
@@ -145,32 +391,30 @@ class PropertySerializer(serializers.ModelSerializer):
 
        return data
 
-   def create(self, validated_data):
-       property_type_data = validated_data.pop('property_type', None)
-       if property_type_data is None:
-           raise serializers.ValidationError({'property_type': 'Property type is required.'})
-
-       property_type = None
-       if isinstance(property_type_data, int):
-           try:
-               property_type = PropertyType.objects.get(id=property_type_data)
-           except PropertyType.DoesNotExist:
-               raise serializers.ValidationError({'property_type': 'Invalid property type'})
-       elif isinstance(property_type_data, str):
-           try:
-               property_type = PropertyType.objects.get(code=property_type_data)
-           except PropertyType.DoesNotExist:
-               try:
-                   property_type = PropertyType.objects.get(id=property_type_data)
-               except (PropertyType.DoesNotExist, ValueError):
-                   raise serializers.ValidationError({'property_type': 'Invalid property type'})
-       else:
-           raise serializers.ValidationError({'property_type': 'Invalid property type'})
+class PropertyCardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   """Flat list-page representation read from the PropertyCard projection"""
+   id = serializers.IntegerField(source='property_id', read_only=True)
+   status_display = serializers.SerializerMethodField()
+   main_image_url = serializers.SerializerMethodField()
+
+   class Meta:
+       model = PropertyCard
+       fields = [
+           'id', 'title', 'slug', 'property_number', 'status',
+           'status_display', 'property_type_id', 'property_type_name',
+           'building_type_id', 'building_type_name', 'city', 'state',
+           'market_value', 'minimum_bid', 'size_sqm', 'year_built',
+           'main_image_url', 'room_count', 'bathroom_count',
+           'is_featured', 'created_at'
+       ]
+
+   def get_status_display(self, obj):
+       return str(dict(Property.STATUS_CHOICES).get(obj.status, obj.status))
 
-       validated_data['property_type'] = property_type
-       return super().create(validated_data)
+   def get_main_image_url(self, obj):
+       return obj.main_image_url or None
 
-class BidSerializer(serializers.ModelSerializer):
+class BidSerializer(SparseFieldsMixin, serializers.ModelSerializer):
    bidder_info = serializers.SerializerMethodField()
    auction_info = serializers.SerializerMethodField()
    status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -187,12 +431,19 @@ class BidSerializer(serializers.ModelSerializer):
            'bidder', 'status', 'bid_time', 
            'is_verified'
        ]
+       expandable_fields = ['auction_info', 'bidder_info']
+       select_related_fields = {'auction_info': ['auction'], 'bidder_info': ['bidder']}
 
    def get_bidder_info(self, obj):
+       avatar_url = obj.bidder.get_avatar_url()
+       request = self.context.get('request')
+       if avatar_url and request:
+           avatar_url = request.build_absolute_uri(avatar_url)
        return {
            'id': obj.bidder.id,
            'name': f"{obj.bidder.first_name} {obj.bidder.last_name}".strip() or obj.bidder.email,
-           'email': obj.bidder.email
+           'email': obj.bidder.email,
+           'avatar_url': avatar_url
        }
 
    def get_auction_info(self, obj):
@@ -207,6 +458,11 @@ class BidSerializer(serializers.ModelSerializer):
        if not auction:
            raise serializers.ValidationError(_("Auction is required"))
 
+       request = self.context.get('request')
+       if self.instance is None and request and settings.AUCTION_REGISTRATION_REQUIRED:
+           if not is_registered(auction.pk, request.user.pk):
+               raise serializers.ValidationError(_("Register for this auction before bidding"))
+
        bid_amount = data.get('bid_amount')
        current_bid = auction.current_bid or auction.starting_bid
        min_increment = auction.minimum_increment
@@ -218,10 +474,49 @@ class BidSerializer(serializers.ModelSerializer):
 
        return data
 
-class AuctionSerializer(serializers.ModelSerializer):
-   type = AuctionTypeSerializer(source='auction_type', read_only=True)
+class AuctionBidListSerializer(serializers.ListSerializer):
+   """Auction bids, read from the archive once the auction's bids were archived"""
+   def get_attribute(self, instance):
+       if instance.bids_archived_at:
+           return instance.archived_bids.all()
+       return super().get_attribute(instance)
+
+class AuctionBidSerializer(BidSerializer):
+   class Meta(BidSerializer.Meta):
+       list_serializer_class = AuctionBidListSerializer
+
+class BidHistorySerializer(serializers.Serializer):
+   """A row of bid_history(): live and archived bids alike"""
+   id = serializers.IntegerField()
+   auction = serializers.IntegerField(source='auction_id')
+   bidder = serializers.IntegerField(source='bidder_id')
+   bid_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+   status = serializers.CharField()
+   status_display = serializers.SerializerMethodField()
+   bid_time = serializers.DateTimeField()
+   is_verified = serializers.BooleanField()
+   archived = serializers.BooleanField()
+
+   def get_status_display(self, row):
+       return dict(Bid.STATUS_CHOICES).get(row['status'], row['status'])
+
+class MyAuctionBidSerializer(serializers.Serializer):
+   """A row of the caller's per-auction bid summary"""
+   auction = serializers.IntegerField(source='auction_id')
+   title = serializers.CharField(source='auction__title')
+   slug = serializers.CharField(source='auction__slug')
+   status = serializers.CharField(source='auction__status')
+   end_date = serializers.DateTimeField(source='auction__end_date')
+   current_bid = serializers.DecimalField(source='auction__current_bid', max_digits=14, decimal_places=2)
+   my_highest_bid = serializers.DecimalField(max_digits=14, decimal_places=2)
+   my_bid_count = serializers.IntegerField()
+   last_bid_at = serializers.DateTimeField()
+   is_winning = serializers.BooleanField()
+
+class AuctionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   type = CachedTypeField(AuctionType, AuctionTypeSerializer, source='auction_type_id')
    property = PropertySerializer(source='related_property', read_only=True)
-   bids = BidSerializer(many=True, read_only=True)
+   bids = AuctionBidSerializer(many=True, read_only=True)
    media = MediaSerializer(many=True, read_only=True)
    status_display = serializers.CharField(source='get_status_display', read_only=True)
    time_remaining = serializers.SerializerMethodField()
@@ -238,17 +533,35 @@ class AuctionSerializer(serializers.ModelSerializer):
            'minimum_increment', 'minimum_participants',
            'is_published', 'bids', 'media',
            'time_remaining', 'highest_bid',
-           'created_at'
+           'watcher_count', 'created_at'
        ]
        read_only_fields = [
-           'current_bid', 'created_at'
+           'current_bid', 'watcher_count', 'created_at'
+       ]
+       expandable_fields = ['property', 'bids', 'media', 'highest_bid']
+       select_related_fields = {'property': ['related_property']}
+       prefetch_related_fields = {'bids': ['bids'], 'media': ['media'], 'highest_bid': ['bids__bidder']}
+
+   def get_related_lookups(self, prefix='', many=False):
+       select, prefetch = super().get_related_lookups(prefix, many)
+       # Archived auctions read the same shape from archived_bids
+       bids = prefix + 'bids'
+       prefetch += [
+           prefix + 'archived_bids' + lookup[len(bids):] for lookup in prefetch
+           if lookup == bids or lookup.startswith(bids + '__')
        ]
+       return select, list(dict.fromkeys(prefetch))
 
    def get_time_remaining(self, obj):
        return obj.time_remaining
 
    def get_highest_bid(self, obj):
-       highest_bid = obj.bids.order_by('-bid_amount').first()
+       relation = 'archived_bids' if obj.bids_archived_at else 'bids'
+       bids = getattr(obj, relation)
+       if relation in getattr(obj, '_prefetched_objects_cache', {}):
+           highest_bid = max(bids.all(), key=lambda bid: bid.bid_amount, default=None)
+       else:
+           highest_bid = bids.order_by('-bid_amount').first()
        return BidSerializer(highest_bid).data if highest_bid else None
 
    def validate(self, data):
@@ -264,4 +577,115 @@ class AuctionSerializer(serializers.ModelSerializer):
                    _("Registration deadline must be before start date")
                )
 
-       return data
\ No newline at end of file
+       return data
+
+class AuctionAnalyticsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   time_to_first_bid = serializers.SerializerMethodField()
+   closing_window_share = serializers.FloatField(read_only=True)
+   bids_per_minute = serializers.SerializerMethodField()
+
+   class Meta:
+       model = AuctionAnalytics
+       fields = [
+           'auction', 'bid_count', 'distinct_bidders',
+           'first_bid_at', 'time_to_first_bid',
+           'peak_bids_per_minute', 'velocity', 'bids_per_minute',
+           'closing_window_minutes', 'closing_window_bids', 'closing_window_share',
+           'final_price', 'price_to_start', 'price_to_market',
+           'computed_at'
+       ]
+       read_only_fields = fields
+
+   def get_time_to_first_bid(self, obj):
+       """Seconds from the auction start"""
+       return obj.time_to_first_bid.total_seconds() if obj.time_to_first_bid is not None else None
+
+   def get_bids_per_minute(self, obj):
+       minutes = obj.velocity.get('bucket_seconds', 60) / 60
+       return [round(count / minutes, 3) for count in obj.velocity.get('counts', [])]
+
+class SavedSearchSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   match_count = serializers.IntegerField(read_only=True, required=False)
+
+   class Meta:
+       model = SavedSearch
+       fields = [
+           'id', 'name', 'target', 'filters', 'notify',
+           'match_count', 'created_at', 'updated_at'
+       ]
+       read_only_fields = ['created_at', 'updated_at']
+
+   def validate(self, data):
+       from .saved_searches import SEARCH_TARGETS
+
+       target = data.get('target', getattr(self.instance, 'target', None))
+       filters = data.get('filters', getattr(self.instance, 'filters', {}))
+       if not isinstance(filters, dict):
+           raise serializers.ValidationError({'filters': _("Filters must be a JSON object")})
+
+       model, filterset_class = SEARCH_TARGETS[target]
+       unknown = [key for key in filters if key not in filterset_class.base_filters]
+       if unknown:
+           raise serializers.ValidationError({'filters': _("Unknown filters: {}").format(", ".join(unknown))})
+       filterset = filterset_class(filters, queryset=model.objects.none())
+       if not filterset.is_valid():
+           raise serializers.ValidationError({'filters': filterset.errors})
+
+       # Keep the raw string form the list endpoint would receive
+       data['filters'] = {key: str(value) for key, value in filters.items() if value not in (None, '')}
+       return data
+
+class SavedSearchMatchSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   listing = serializers.SerializerMethodField()
+
+   class Meta:
+       model = SavedSearchMatch
+       fields = ['id', 'listing', 'matched_at', 'notified_at']
+       select_related_fields = {'listing': ['property', 'auction']}
+
+   def get_listing(self, obj):
+       listing = obj.property or obj.auction
+       if listing is None:
+           return None
+       return {
+           'id': listing.id,
+           'title': listing.title,
+           'slug': listing.slug,
+           'type': 'property' if obj.property_id else 'auction'
+       }
+
+class WatchSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+   listing = serializers.SerializerMethodField()
+
+   class Meta:
+       model = Watch
+       fields = ['id', 'auction', 'property', 'listing', 'created_at']
+       read_only_fields = ['created_at']
+       select_related_fields = {'listing': ['property', 'auction']}
+       # follow() handles repeats, so the (user, listing) constraints need no validator here
+       validators = []
+
+   def get_listing(self, obj):
+       listing = obj.property or obj.auction
+       return {
+           'id': listing.id,
+           'title': listing.title,
+           'slug': listing.slug,
+           'type': 'property' if obj.property_id else 'auction',
+           'watcher_count': listing.watcher_count
+       }
+
+   def validate(self, data):
+       if bool(data.get('auction')) == bool(data.get('property')):
+           raise serializers.ValidationError(_("Watch either an auction or a property"))
+       return data
+
+
+class AuctionRegistrationSerializer(serializers.ModelSerializer):
+   registered_bidders = serializers.IntegerField(source='auction.registered_bidders', read_only=True)
+   minimum_participants = serializers.IntegerField(source='auction.minimum_participants', read_only=True)
+
+   class Meta:
+       model = AuctionRegistration
+       fields = ['id', 'auction', 'user', 'registered_at', 'registered_bidders', 'minimum_participants']
+       read_only_fields = fields
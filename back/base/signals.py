@@ -0,0 +1,253 @@
+"""Model signal handlers keeping derived data (caches, counters) in sync."""
+from django.db import transaction
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    Property, Auction, Location, Room, Media, PropertyCard,
+    PropertyType, BuildingType, AuctionType, AuctionAnalytics, post_soft_delete
+)
+from .facets import bump_facets_version
+from .tags import sync_tags, TAG_SOURCES
+from .cards import refresh_cards, PROPERTY_SOURCE_FIELDS
+from .market_stats import MarketRollup, STAT_SOURCE_FIELDS
+from .auction_analytics import compute_auction_analytics
+from .bid_archive import CLOSED_STATUSES
+from .watchlist import notify_watchers
+from accounts.tasks import run_in_background
+from .type_registry import type_registry, TYPE_MODELS
+from .conditional import bump_model_version, VERSIONED_APPS
+
+# Any change here can move a listing between facet buckets or rename a bucket
+FACET_SOURCE_MODELS = (Property, Auction, Location, PropertyType, BuildingType, AuctionType)
+
+# Columns that facets group on or listing filters/search read; saves limited to other
+# columns keep the facet cache. Auction.current_bid and bid_count change on every bid,
+# so live auctions' price bands catch up within FACET_CACHE_TIMEOUT instead
+FACET_SOURCE_FIELDS = {
+    Property: {
+        'property_type', 'building_type', 'status', 'location', 'market_value', 'size_sqm',
+        'year_built', 'title', 'deed_number', 'features', 'amenities', 'is_published',
+        'is_deleted', 'deleted_at',
+    },
+    Auction: {
+        'auction_type', 'status', 'related_property', 'start_date', 'end_date', 'starting_bid',
+        'title', 'description', 'is_published', 'is_deleted', 'deleted_at',
+    },
+    Location: {'city'},
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(post_soft_delete)
+def invalidate_listing_facets(sender, update_fields=None, **kwargs):
+    if sender not in FACET_SOURCE_MODELS:
+        return
+    if update_fields is not None and sender in FACET_SOURCE_FIELDS and not FACET_SOURCE_FIELDS[sender] & set(update_fields):
+        return
+    bump_facets_version()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(post_soft_delete)
+def bump_conditional_version(sender, **kwargs):
+    if sender._meta.app_label in VERSIONED_APPS:
+        bump_model_version(sender)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(post_soft_delete)
+def invalidate_type_registry(sender, **kwargs):
+    if sender in TYPE_MODELS:
+        # After commit, so other processes can't reload the old rows under the new version
+        transaction.on_commit(lambda: type_registry.invalidate(sender))
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Room)
+def sync_instance_tags(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    fields = {field for field, _ in TAG_SOURCES[sender]}
+    if update_fields is not None and not fields & set(update_fields):
+        return
+    sync_tags(sender, [instance])
+
+
+@receiver(pre_save, sender=Property)
+@receiver(pre_save, sender=Auction)
+def remember_publication_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'is_published' not in update_fields):
+        return
+    instance._was_published = bool(
+        instance.pk and sender.objects.filter(pk=instance.pk, is_published=True).exists()
+    )
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Auction)
+def match_saved_searches(sender, instance, **kwargs):
+    """Queue saved-search matching when a listing becomes published"""
+    if not instance.is_published or getattr(instance, '_was_published', True):
+        return
+    instance._was_published = True
+    from .saved_searches import match_listings
+    run_in_background(match_listings, sender._meta.model_name, [instance.pk])
+
+
+# Property cards are refreshed in the same transaction as the change
+@receiver(post_save, sender=Property)
+def refresh_property_card(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not PROPERTY_SOURCE_FIELDS & set(update_fields)):
+        return
+    refresh_cards([instance.pk])
+
+
+def _deleting_property(origin):
+    """True while a property's own delete cascades here; its card goes with it"""
+    return isinstance(origin, Property) or getattr(origin, 'model', None) is Property
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def refresh_card_for_room(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _deleting_property(origin):
+        refresh_cards([instance.property_id])
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def refresh_card_for_media(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or _deleting_property(origin):
+        return
+    if instance.content_type_id == ContentType.objects.get_for_model(Property).id:
+        refresh_cards([instance.object_id])
+
+
+@receiver(post_save, sender=PropertyType)
+def rename_card_property_type(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PropertyCard.objects.filter(property_type_id=instance.pk).update(
+        property_type_name=instance.name, refreshed_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=BuildingType)
+def rename_card_building_type(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PropertyCard.objects.filter(building_type_id=instance.pk).update(
+        building_type_name=instance.name, refreshed_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Location)
+def relocate_cards(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PropertyCard.objects.filter(property__location=instance).update(
+        city=instance.city, state=instance.state, refreshed_at=timezone.now()
+    )
+
+
+# Soft deletes are bulk UPDATEs, so post_delete handlers above don't see them
+@receiver(post_soft_delete, sender=Property)
+def drop_deleted_property_cards(sender, ids, **kwargs):
+    PropertyCard.objects.filter(property_id__in=ids).delete()
+
+
+@receiver(post_soft_delete, sender=Room)
+def refresh_cards_for_deleted_rooms(sender, ids, **kwargs):
+    refresh_cards(Room.all_objects.filter(pk__in=ids).values_list('property_id', flat=True))
+
+
+@receiver(post_soft_delete, sender=Media)
+def refresh_cards_for_deleted_media(sender, ids, **kwargs):
+    refresh_cards(
+        Media.all_objects.filter(pk__in=ids, content_type=ContentType.objects.get_for_model(Property))
+        .values_list('object_id', flat=True)
+    )
+
+
+# Market stat rollups: subtract what a row contributed before the save, add what it contributes after
+@receiver(pre_save, sender=Property)
+@receiver(pre_save, sender=Auction)
+@receiver(pre_save, sender=Location)
+def remember_market_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not STAT_SOURCE_FIELDS[sender] & set(update_fields)):
+        return
+    if sender is Auction and instance.status not in CLOSED_STATUSES:
+        # Only closed auctions are counted, so a save that leaves one open both before and
+        # after (every bid's current_bid update) changes nothing
+        if update_fields is not None and 'status' not in update_fields:
+            return
+        if not instance.pk or not Auction.all_objects.filter(pk=instance.pk, status__in=CLOSED_STATUSES).exists():
+            return
+    instance._market_rollup = MarketRollup()
+    if instance.pk:
+        instance._market_rollup.add_scope(sender, [instance.pk], sign=-1)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Auction)
+@receiver(post_save, sender=Location)
+def update_market_stats(sender, instance, raw=False, **kwargs):
+    rollup = instance.__dict__.pop('_market_rollup', None)
+    if rollup is not None:
+        rollup.add_scope(sender, [instance.pk])
+        rollup.save()
+
+
+# Deletes cascade from properties to auctions with a signal per model, so each removes only its own rows
+@receiver(post_soft_delete, sender=Property)
+@receiver(post_soft_delete, sender=Auction)
+def remove_deleted_market_stats(sender, ids, **kwargs):
+    rollup = MarketRollup()
+    rollup.add_rows(sender, sender.all_objects.filter(pk__in=ids), sign=-1)
+    rollup.save()
+
+
+@receiver(pre_delete, sender=Property)
+@receiver(pre_delete, sender=Auction)
+def remove_hard_deleted_market_stats(sender, instance, **kwargs):
+    if not instance.is_deleted:  # Tombstones were already removed when soft-deleted
+        remove_deleted_market_stats(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Auction)
+def queue_auction_analytics(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Compute the bidding analytics once an auction closes"""
+    if raw or instance.status not in CLOSED_STATUSES:
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    if not AuctionAnalytics.objects.filter(auction_id=instance.pk).exists():
+        run_in_background(compute_auction_analytics, instance.pk)
+
+
+@receiver(pre_save, sender=Auction)
+def remember_watched_schedule(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not instance.pk or not instance.watcher_count:
+        return
+    if update_fields is not None and not {'status', 'end_date'} & set(update_fields):
+        return
+    instance._watched_schedule = Auction.all_objects.filter(pk=instance.pk).values_list('status', 'end_date').first()
+
+
+@receiver(post_save, sender=Auction)
+def notify_auction_watchers(sender, instance, **kwargs):
+    """Tell watchers when an auction is extended or closes"""
+    previous = instance.__dict__.pop('_watched_schedule', None)
+    if previous is None:
+        return
+    status, end_date = previous
+    if instance.status in CLOSED_STATUSES and status not in CLOSED_STATUSES:
+        run_in_background(notify_watchers, instance.pk, 'closed')
+    elif end_date and instance.end_date > end_date and instance.status not in CLOSED_STATUSES:
+        run_in_background(notify_watchers, instance.pk, 'extended')
@@ -0,0 +1,103 @@
+"""Keeps the Tag tables in sync with the features/amenities JSON lists."""
+from collections import defaultdict
+
+from django.db.models import Count
+from django.utils.text import slugify
+
+from .models import Tag, Property, Room
+
+# Model -> [(JSON list field, tag kind)]
+TAG_SOURCES = {
+    Property: [('features', 'feature'), ('amenities', 'amenity')],
+    Room: [('features', 'feature')],
+}
+
+
+def normalize_tags(values):
+    """{slug: display name} for a JSON list; non-string and blank entries are dropped"""
+    tags = {}
+    if not isinstance(values, list):
+        return tags
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        name = value.strip()[:100]
+        slug = slugify(name, allow_unicode=True)[:100]
+        if slug:
+            tags.setdefault(slug, name)
+    return tags
+
+
+def resolve_tags(kind, tags):
+    """Map slugs to Tag ids, creating missing tags in bulk"""
+    if not tags:
+        return {}
+    ids = dict(Tag.objects.filter(kind=kind, slug__in=tags).values_list('slug', 'id'))
+    missing = [Tag(kind=kind, slug=slug, name=name) for slug, name in tags.items() if slug not in ids]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(Tag.objects.filter(kind=kind, slug__in=[tag.slug for tag in missing]).values_list('slug', 'id'))
+    return ids
+
+
+def sync_tags(model, objects):
+    """Bring the tag links of `objects` (saved Property or Room rows) in line with their JSON lists"""
+    objects = [obj for obj in objects if obj.pk]
+    if not objects:
+        return
+
+    wanted_by_kind = defaultdict(dict)
+    per_object = {}
+    for obj in objects:
+        per_object[obj.pk] = []
+        for field, kind in TAG_SOURCES[model]:
+            tags = normalize_tags(getattr(obj, field))
+            wanted_by_kind[kind].update(tags)
+            per_object[obj.pk].append((kind, tags))
+
+    tag_ids = {kind: resolve_tags(kind, tags) for kind, tags in wanted_by_kind.items()}
+    wanted = {
+        (pk, tag_ids[kind][slug])
+        for pk, groups in per_object.items()
+        for kind, tags in groups
+        for slug in tags
+    }
+
+    through = model.tags.through
+    owner = f'{model._meta.model_name}_id'
+    current = set(through.objects.filter(**{f'{owner}__in': per_object}).values_list(owner, 'tag_id'))
+
+    stale = current - wanted
+    if stale:
+        stale_by_owner = defaultdict(list)
+        for pk, tag_id in stale:
+            stale_by_owner[pk].append(tag_id)
+        for pk, stale_ids in stale_by_owner.items():
+            through.objects.filter(**{owner: pk}, tag_id__in=stale_ids).delete()
+    if wanted - current:
+        through.objects.bulk_create(
+            [through(**{owner: pk}, tag_id=tag_id) for pk, tag_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def filter_by_tags(queryset, kind, values):
+    """
+    Rows of a Property (or PropertyCard, keyed by property) queryset carrying
+    every tag in `values`, via an indexed set intersection
+    """
+    slugs = {slugify(value.strip(), allow_unicode=True) for value in values if value.strip()}
+    if not slugs:
+        return queryset
+    tag_ids = list(Tag.objects.filter(kind=kind, slug__in=slugs).values_list('id', flat=True))
+    if len(tag_ids) < len(slugs):
+        return queryset.none()
+    Through = Property.tags.through
+    matching = (
+        Through.objects.filter(tag_id__in=tag_ids)
+        .values('property_id')
+        .annotate(matched=Count('tag_id'))
+        .filter(matched=len(tag_ids))
+        .values('property_id')
+    )
+    return queryset.filter(pk__in=matching)
@@ -1,3 +1,977 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, IntegrityError
+from django.http import JsonResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from .auction_analytics import compute_auction_analytics
+from .bid_archive import archivable_auctions, archive_auction_bids
+from .cards import refresh_cards
+from .columnar import AUCTION_TABLE, BID_TABLE
+from .conditional import get_version
+from .exports import streaming_export_response, PROPERTY_EXPORT_COLUMNS
+from .facets import compute_facets, property_facets, get_facets_version
+from .importers import PropertyImporter, READERS
+from .media import with_content_objects, get_content_owner
+from .instrumentation import current_metrics, record_cache
+from .middleware import CompressionMiddleware, InstrumentationMiddleware
+from .recommendations import PropertyFeatureIndex, build_preferences
+from .serializers import MediaSerializer, PropertyTypeSerializer, LocationSerializer
+from .signals import rename_card_property_type, relocate_cards
+from .tags import filter_by_tags
+from .type_registry import type_registry
+from .views import PropertyListCreateView, AuctionListCreateView
+from . import registration, watchlist
+from .models import (
+    Media, Property, PropertyCard, Room, Auction, AuctionAnalytics, AuctionRegistration, Bid, ArchivedBid, Watch,
+    PropertyType, BuildingType, RoomType, AuctionType, Location,
+)
+
+# Unsampled requests, so test runs don't write request metrics to debug.log
+UNSAMPLED = {'INSTRUMENTATION_SAMPLE_RATE': 0}
+
+
+def make_owner(email='owner@example.com'):
+    return CustomUser.objects.create_user(email, 'pw', first_name='Owner', is_verified=True, role='owner')
+
+
+def make_property(owner, number, **fields):
+    property_type, _ = PropertyType.objects.get_or_create(code='villa', defaults={'name': 'Villa'})
+    building_type, _ = BuildingType.objects.get_or_create(code='concrete', defaults={'name': 'Concrete'})
+    location, _ = Location.objects.get_or_create(city='Riyadh', state='Riyadh', country='SA', postal_code='11564')
+    defaults = {
+        'property_number': f'P-{number}', 'title': f'House {number}', 'deed_number': f'D-{number}',
+        'property_type': property_type, 'building_type': building_type, 'location': location,
+        'description': 'House', 'address': 'Street', 'size_sqm': Decimal('200'),
+        'market_value': Decimal('500000'), 'owner': owner, 'is_published': True,
+    }
+    defaults.update(fields)
+    return Property.objects.create(**defaults)
+
+
+def make_room(listing, name='Bedroom'):
+    room_type, _ = RoomType.objects.get_or_create(code='bedroom', defaults={'name': 'Bedroom'})
+    return Room.objects.create(property=listing, name=name, room_type=room_type)
+
+
+def make_auction(listing, **fields):
+    auction_type, _ = AuctionType.objects.get_or_create(code='public', defaults={'name': 'Public'})
+    now = timezone.now()
+    defaults = {
+        'title': f'Auction of {listing.title}', 'auction_type': auction_type, 'description': 'Auction',
+        'related_property': listing, 'start_date': now - timedelta(days=1), 'end_date': now + timedelta(days=1),
+        'starting_bid': Decimal('1000'), 'status': 'live', 'is_published': True,
+    }
+    defaults.update(fields)
+    return Auction.objects.create(**defaults)
+
+
+class MediaContentObjectTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_owner()
+        targets = []
+        for number in range(10):
+            listing = make_property(owner, number)
+            targets += [listing, make_room(listing), make_auction(listing)]
+        Media.objects.bulk_create([
+            Media(
+                content_type=ContentType.objects.get_for_model(target), object_id=target.pk,
+                file=f'uploads/{n}.jpg', name=f'{n}.jpg', media_type='image', file_size=1, order=n,
+            )
+            for n in range(1000)
+            for target in [targets[n % len(targets)]]
+        ])
+
+    def test_content_objects_resolve_in_one_query_per_model(self):
+        # Media joined to its content type, then one query each for properties, rooms and auctions
+        with self.assertNumQueries(4):
+            media_items = list(with_content_objects(Media.objects.all()))
+            owners = {get_content_owner(media.content_object) for media in media_items}
+            labels = {str(media.content_object) for media in media_items}
+        self.assertEqual(len(media_items), 1000)
+        self.assertEqual(len(owners), 1)
+        self.assertEqual(len(labels), 30)
+
+    @override_settings(**UNSAMPLED)
+    def test_list_does_not_resolve_content_objects(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(email='owner@example.com'))
+        # Count and page only
+        with self.assertNumQueries(2):
+            response = client.get('/api/media/')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(**UNSAMPLED)
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.bidder = CustomUser.objects.create_user('bidder@example.com', 'pw', is_verified=True)
+        for number in range(6):
+            make_property(cls.owner, number, market_value=Decimal(200000 * (number + 1)))
+        cls.auction = make_auction(Property.objects.first())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_each_facet_is_grouped_on_its_own(self):
+        names = ['city', 'status', 'price_band', 'property_type']
+        with self.assertNumQueries(len(names)):
+            result = compute_facets(Property.objects.all(), property_facets(), names)
+        for name in names:
+            self.assertEqual(sum(bucket['count'] for bucket in result[name]), 6)
+        self.assertEqual(len(result['price_band']), 4)
+
+    def test_list_returns_requested_facets_once(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get('/api/properties/', {'facets': 'city,city,status'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['facets']), ['city', 'status'])
+        self.assertEqual(response.data['facets']['city'], [{'value': 'Riyadh', 'label': 'Riyadh', 'count': 6}])
+
+    def test_bid_keeps_facet_cache(self):
+        version = get_facets_version()
+        Bid.objects.create(auction=self.auction, bidder=self.bidder, bid_amount=Decimal('5000'), status='accepted')
+        self.assertEqual(get_facets_version(), version)
+
+    def test_listing_change_invalidates_facets(self):
+        version = get_facets_version()
+        listing = Property.objects.last()
+        listing.market_value = Decimal('9000000')
+        listing.save(update_fields=['market_value'])
+        self.assertNotEqual(get_facets_version(), version)
+
+
+def query_plan(view_class, params):
+    """SQLite's EXPLAIN QUERY PLAN lines for a list view's filtered, sorted queryset"""
+    view = view_class(request=Request(RequestFactory().get('/', params)), format_kwarg=None, kwargs={})
+    sql, sql_params = view.filter_queryset(view.get_queryset()).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, sql_params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class ListingIndexTests(TestCase):
+    """Every range filter, alone or with each sort key, reads through the sort key's partial index"""
+    PROPERTY_SORT_INDEXES = {
+        'created_at': 'property_pub_created_idx',
+        'market_value': 'property_pub_value_idx',
+        'size_sqm': 'property_pub_size_idx',
+        'year_built': 'property_pub_year_idx',
+    }
+    PROPERTY_FILTERS = {'market_value': 100000, 'size_sqm': 150, 'year_built': 1990}
+    AUCTION_SORT_INDEXES = {
+        'start_date': 'auction_pub_start_idx',
+        'end_date': 'auction_pub_end_idx',
+        'current_bid': 'auction_pub_bid_idx',
+        'created_at': 'auction_pub_created_idx',
+    }
+    AUCTION_FILTERS = {'start_date': '2024-01-01', 'end_date': '2030-01-01', 'current_bid': 5000}
+
+    def assert_combinations(self, view_class, table, sort_indexes, filters, default_sort):
+        for sort in [None, *sort_indexes, *('-' + key for key in sort_indexes)]:
+            for field in [None, *filters]:
+                for lookup in ('gte', 'lte'):
+                    params = {}
+                    if sort:
+                        params['ordering'] = sort
+                    if field:
+                        params[f'{field}__{lookup}'] = filters[field]
+                    index = sort_indexes[(sort or default_sort).lstrip('-')]
+                    with self.subTest(**params):
+                        plan = query_plan(view_class, params)
+                        self.assertIn(f'{table} USING INDEX {index}', plan[0])
+                        self.assertFalse([line for line in plan if 'TEMP B-TREE' in line], plan)
+
+    def test_property_filters_and_sorts(self):
+        self.assert_combinations(
+            PropertyListCreateView, 'base_property', self.PROPERTY_SORT_INDEXES, self.PROPERTY_FILTERS, 'created_at'
+        )
+
+    def test_auction_filters_and_sorts(self):
+        self.assert_combinations(
+            AuctionListCreateView, 'base_auction', self.AUCTION_SORT_INDEXES, self.AUCTION_FILTERS, 'start_date'
+        )
+
+    def test_range_on_sort_key_searches_its_index(self):
+        plan = query_plan(PropertyListCreateView, {'market_value__gte': 100000, 'ordering': 'market_value'})
+        self.assertIn('SEARCH base_property USING INDEX property_pub_value_idx (market_value>?)', plan[0])
+
+    def test_status_with_ending_soon_uses_composite_index(self):
+        plan = query_plan(AuctionListCreateView, {'status': 'live', 'ordering': 'end_date'})
+        self.assertIn('USING INDEX auction_pub_status_end_idx (status=?)', plan[0])
+        self.assertFalse([line for line in plan if 'TEMP B-TREE' in line], plan)
+
+
+@override_settings(TYPE_REGISTRY_CHECK_INTERVAL=60)
+class TypeRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        PropertyType.objects.create(code='villa', name='Villa')
+        type_registry.invalidate(PropertyType)
+
+    def test_lookups_within_interval_skip_the_shared_cache(self):
+        self.assertEqual(type_registry.get(PropertyType, 'villa').name, 'Villa')
+        with mock.patch('base.type_registry.cache') as shared, self.assertNumQueries(0):
+            for _ in range(100):
+                type_registry.get(PropertyType, 'villa')
+        shared.get.assert_not_called()
+
+    def test_shared_version_is_checked_after_interval(self):
+        type_registry.get(PropertyType, 'villa')
+        with override_settings(TYPE_REGISTRY_CHECK_INTERVAL=0), self.assertNumQueries(0):
+            with mock.patch('base.type_registry.cache', wraps=cache) as shared:
+                type_registry.get(PropertyType, 'villa')
+        shared.get.assert_called_once()
+
+    def test_invalidate_reloads_at_once(self):
+        type_registry.get(PropertyType, 'villa')
+        PropertyType.objects.create(code='flat', name='Flat')
+        type_registry.invalidate(PropertyType)
+        self.assertEqual(type_registry.get(PropertyType, 'flat').name, 'Flat')
+
+
+@override_settings(RECOMMENDATION_REFRESH_SECONDS=0)
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.pool = make_property(cls.owner, 1, amenities=['Swimming Pool'])
+        cls.plain = make_property(cls.owner, 2)
+        cls.user = CustomUser.objects.create_user('buyer@example.com', 'pw', is_verified=True)
+        cls.user.profile.property_preferences = '{"amenities": ["swimming pool"]}'
+        cls.user.profile.save()
+
+    def test_amenity_preferences_match_tag_slugs(self):
+        prefs = build_preferences(self.user)
+        self.assertEqual(prefs.amenity_weights, {'swimming-pool': 1.0})
+        ids, scores = PropertyFeatureIndex().top(prefs, 2)
+        self.assertEqual(ids[0], self.pool.pk)
+        self.assertGreater(scores[0], scores[1])
+
+    def test_history_of_deleted_properties_only(self):
+        gone = make_property(self.owner, 3)
+        auction = make_auction(gone)
+        ArchivedBid.objects.create(
+            id=1, auction=auction, bidder=self.user, bid_amount=Decimal('5000'),
+            bid_time=timezone.now() - timedelta(days=400), status='winning',
+        )
+        gone.delete()
+        prefs = build_preferences(self.user)
+        self.assertEqual(prefs.type_weights, {})
+        self.assertIn(gone.pk, prefs.exclude)
+
+    def test_sync_swaps_in_new_columns(self):
+        index = PropertyFeatureIndex()
+        index.ensure_fresh()
+        columns = index.columns
+        make_property(self.owner, 3)
+        index.ensure_fresh()
+        self.assertIsNot(index.columns, columns)
+        self.assertEqual(len(columns.ids), 2)
+        self.assertEqual(len(index.columns.ids), 3)
+
+
+@override_settings(**UNSAMPLED)
+class PropertyCardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.listing = make_property(cls.owner, 1, deed_number='DEED-4471')
+        make_property(cls.owner, 2)
+        cls.image = Media.objects.bulk_create([Media(
+            content_type=ContentType.objects.get_for_model(Property), object_id=cls.listing.pk,
+            file='uploads/front.jpg', name='front.jpg', media_type='image', file_size=1, is_primary=True,
+        )])[0]
+        refresh_cards([cls.listing.pk])
+
+    def test_card_image_is_the_served_media_url(self):
+        card = PropertyCard.objects.get(property=self.listing)
+        self.assertEqual(card.main_image_url, MediaSerializer(self.image).data['url'])
+
+    def test_cards_search_deed_number(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get('/api/properties/cards/', {'search': 'DEED-4471'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card['id'] for card in response.data['results']], [self.listing.pk])
+
+    def test_raw_saves_leave_cards_alone(self):
+        property_type = self.listing.property_type
+        property_type.name = 'Renamed'
+        rename_card_property_type(PropertyType, property_type, raw=True)
+        location = self.listing.location
+        location.city = 'Jeddah'
+        relocate_cards(Location, location, raw=True)
+        card = PropertyCard.objects.get(property=self.listing)
+        self.assertEqual((card.property_type_name, card.city), ('Villa', 'Riyadh'))
+
+
+@override_settings(**UNSAMPLED)
+class ListQueryCountTests(TestCase):
+    """List pages run a fixed number of queries, full or with ?fields=, however many rows they show"""
+    # (url, params) -> queries once per-process caches (types, content types) are warm
+    EXPECTED = [
+        ('/api/properties/', {}, 6),  # ETag probe, count, rows, rooms, property media, room media
+        ('/api/properties/', {'fields': 'id,title,market_value'}, 3),
+        ('/api/auctions/', {}, 10),  # + rooms, media, bids, bidders, auction media, archived bids
+        ('/api/auctions/', {'fields': 'id,title,current_bid'}, 3),
+        ('/api/bids/', {}, 3),  # bidder and auction joined
+        ('/api/bids/', {'fields': 'id,bid_amount'}, 3),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        bidders = [CustomUser.objects.create_user(f'bidder{n}@example.com', 'pw', is_verified=True) for n in range(3)]
+        for number in range(8):
+            listing = make_property(cls.owner, number)
+            make_room(listing)
+            make_room(listing, 'Hall')
+            Media.objects.bulk_create([Media(
+                content_type=ContentType.objects.get_for_model(Property), object_id=listing.pk,
+                file=f'uploads/{number}.jpg', name=f'{number}.jpg', media_type='image', file_size=1,
+            )])
+            auction = make_auction(listing)
+            for n, bidder in enumerate(bidders):
+                Bid.objects.create(auction=auction, bidder=bidder, bid_amount=Decimal(2000 + 100 * n), status='accepted')
+
+    def test_list_query_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        for url, params, queries in self.EXPECTED:
+            with self.subTest(url=url, **params):
+                client.get(url, params)
+                with self.assertNumQueries(queries):
+                    response = client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), min(response.data['count'], 10))
+                self.assertGreaterEqual(response.data['count'], 8)
+
+
+@override_settings(**UNSAMPLED)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.bidder = CustomUser.objects.create_user('bidder@example.com', 'pw', is_verified=True)
+        cls.auction = make_auction(make_property(cls.owner, 1))
+        cls.admin = CustomUser.objects.create_superuser('admin@example.com', 'pw')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = f'/api/auctions/{self.auction.pk}/'
+
+    def test_unchanged_auction_is_not_modified(self):
+        first = self.client.get(self.url, {'fields': 'id,current_bid'})
+        second = self.client.get(self.url, {'fields': 'id,current_bid'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_bid_between_gets_changes_etag(self):
+        first = self.client.get(self.url, {'fields': 'id,current_bid'})
+        Bid.objects.create(auction=self.auction, bidder=self.bidder, bid_amount=Decimal('5000'), status='accepted')
+        second = self.client.get(self.url, {'fields': 'id,current_bid'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(Decimal(second.data['current_bid']), Decimal('5000'))
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+
+class CompressionTests(TestCase):
+    def compressed(self, path, set_cookie=False):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING='gzip')
+        response = JsonResponse({'results': [{'title': 'House', 'city': 'Riyadh'}] * 200})
+        if set_cookie:
+            response.set_cookie('csrftoken', 'secret')
+        response = CompressionMiddleware(lambda request: response)(request)
+        return response.get('Content-Encoding') == 'gzip'
+
+    def test_listing_json_is_compressed(self):
+        self.assertTrue(self.compressed('/api/properties/'))
+
+    def test_responses_carrying_credentials_are_not_compressed(self):
+        self.assertFalse(self.compressed('/api/accounts/login/'))
+        self.assertFalse(self.compressed('/api/properties/', set_cookie=True))
+
+
+class InstrumentationTests(TestCase):
+    def run_view(self, queries=3, id_lists=None):
+        """A request whose view runs `queries` lookups (or one pk__in lookup per list) and hits the cache once"""
+        def view(request):
+            self.metrics = current_metrics()
+            for ids in id_lists or [[n] for n in range(queries)]:
+                list(PropertyType.objects.filter(pk__in=ids))
+            record_cache(hits=1)
+            return JsonResponse({})
+        return InstrumentationMiddleware(view)(RequestFactory().get('/api/properties/'))
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_sampled_request_gets_server_timing_and_a_log_line(self):
+        with self.assertLogs('base.middleware', 'INFO') as logs:
+            response = self.run_view()
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="3 queries", serializer;dur=[\d.]+, cache;desc="1 hits, 0 misses", total;dur=[\d.]+$',
+        )
+        [record] = logs.records
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertEqual(
+            {key: record.request_metrics[key] for key in ('path', 'status', 'db_queries', 'cache_hits', 'repeated_queries')},
+            {'path': '/api/properties/', 'status': 200, 'db_queries': 3, 'cache_hits': 1, 'repeated_queries': 0},
+        )
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1, INSTRUMENTATION_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_turned_off(self):
+        with self.assertLogs('base.middleware', 'INFO'):
+            response = self.run_view()
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0.25)
+    def test_requests_outside_the_sample_are_not_measured(self):
+        with mock.patch('base.middleware.random.random', return_value=0.25), self.assertNoLogs('base.middleware'):
+            response = self.run_view()
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertIsNone(self.metrics)
+
+        with mock.patch('base.middleware.random.random', return_value=0.2), self.assertLogs('base.middleware', 'INFO'):
+            response = self.run_view()
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1, INSTRUMENTATION_REPEATED_QUERY_THRESHOLD=3)
+    def test_shape_repeated_over_the_threshold_is_flagged(self):
+        # IN lists of different lengths are one shape
+        with self.assertLogs('base.middleware', 'INFO') as logs:
+            self.run_view(id_lists=[[1], [1, 2], [1, 2, 3], [4, 5]])
+        info, warning = logs.records
+        self.assertEqual(info.request_metrics['repeated_queries'], 1)
+        self.assertEqual(warning.levelname, 'WARNING')
+        self.assertEqual(warning.request_metrics['repeated_count'], 4)
+        self.assertIn('base_propertytype', warning.request_metrics['repeated_sql'])
+
+        with self.assertLogs('base.middleware', 'INFO') as logs:
+            self.run_view(queries=3)
+        self.assertEqual([record.levelname for record in logs.records], ['INFO'])
+
+
+@override_settings(**UNSAMPLED)
+class SoftDeletedUniqueTests(TestCase):
+    def setUp(self):
+        PropertyType.objects.create(code='villa', name='Villa').delete()
+
+    def test_serializer_rejects_value_of_deleted_row(self):
+        serializer = PropertyTypeSerializer(data={'code': 'villa', 'name': 'Villa'})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('code', serializer.errors)
+
+    def test_api_answers_400(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_superuser('admin@example.com', 'pw'))
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.post('/api/types/property/', {'code': 'villa', 'name': 'Villa'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('code', response.data)
+
+    def test_unique_together_includes_deleted_rows(self):
+        location = {'city': 'Riyadh', 'state': 'Riyadh', 'country': 'SA', 'postal_code': '11564'}
+        Location.objects.create(**location).delete()
+        self.assertFalse(LocationSerializer(data=location).is_valid())
+
+    def test_model_validation_includes_deleted_rows(self):
+        with self.assertRaises(ValidationError) as raised:
+            PropertyType(code='villa', name='Villa').full_clean()
+        self.assertIn('code', raised.exception.message_dict)
+        PropertyType(code='flat', name='Flat').full_clean()
+
+
+class MarketStatSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bidder = CustomUser.objects.create_user('bidder@example.com', 'pw', is_verified=True)
+        cls.auction = make_auction(make_property(make_owner(), 1))
+
+    def test_bids_on_open_auction_skip_the_rollup(self):
+        with mock.patch('base.signals.MarketRollup') as rollup:
+            Bid.objects.create(auction=self.auction, bidder=self.bidder, bid_amount=Decimal('5000'), status='accepted')
+            self.auction.title = 'Renamed'
+            self.auction.save()
+        rollup.assert_not_called()
+
+    def test_closing_auction_updates_the_rollup(self):
+        with mock.patch('base.signals.MarketRollup') as rollup:
+            self.auction.status = 'ended'
+            self.auction.save(update_fields=['status'])
+        rollup.assert_called_once()
+        rollup.return_value.save.assert_called_once()
+
+
+@override_settings(**UNSAMPLED)
+class AdminQueryCountTests(TestCase):
+    """Admin change lists and the auction change page don't run a query per row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser('admin@example.com', 'pw')
+        owner = make_owner()
+        bidders = [CustomUser.objects.create_user(f'bidder{n}@example.com', 'pw', is_verified=True) for n in range(5)]
+        for number in range(8):
+            listing = make_property(owner, number)
+            room = make_room(listing)
+            cls.auction = make_auction(listing)
+            Media.objects.bulk_create([
+                Media(
+                    content_type=ContentType.objects.get_for_model(target), object_id=target.pk,
+                    file=f'uploads/{number}.jpg', name=f'{number}.jpg', media_type='image', file_size=1,
+                )
+                for target in (listing, room, cls.auction)
+            ])
+            for n, bidder in enumerate(bidders):
+                Bid.objects.create(auction=cls.auction, bidder=bidder, bid_amount=Decimal(2000 + 100 * n), status='accepted')
+
+    def test_admin_query_counts(self):
+        # Every page starts with the session and user lookups
+        expected = [
+            ('/admin/base/property/', 6),  # + property and building type filters, bounded count, rows
+            ('/admin/base/auction/', 5),  # + auction type filter, bounded count, rows
+            ('/admin/base/bid/', 4),  # + bounded count, rows with auction and bidder joined
+            ('/admin/base/room/', 6),  # + room type and floor filters, bounded count, rows
+            ('/admin/base/media/', 7),  # + bounded count, rows, one query per attached model
+            (f'/admin/base/auction/{self.auction.pk}/change/', 6),  # + auction, latest bids, auction type choices, selected property
+        ]
+        self.client.force_login(self.admin)
+        for url, queries in expected:
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(**UNSAMPLED)
+class WatchlistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('watcher@example.com', 'pw', is_verified=True)
+        cls.auction = make_auction(make_property(make_owner(), 1))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fill_from_before_a_follow_is_not_served(self):
+        version = get_version(watchlist._version_key('auction', self.auction.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            watchlist.follow(self.user, self.auction)
+        # A reader that loaded the ids before the follow committed stores them late
+        cache.add(watchlist._cache_key('auction', self.auction.pk, version), b'')
+        self.assertEqual(watchlist.watcher_ids('auction', self.auction.pk).tolist(), [self.user.pk])
+
+    def test_concurrent_duplicate_follow_returns_existing_watch(self):
+        existing = Watch.objects.create(user=self.user, auction=self.auction)
+        with mock.patch.object(Watch.objects, 'get_or_create', side_effect=IntegrityError):
+            watch, created = watchlist.follow(self.user, self.auction)
+        self.assertEqual((watch, created), (existing, False))
+
+    def test_duplicate_follow_request_answers_200(self):
+        Watch.objects.create(user=self.user, auction=self.auction)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(Watch.objects, 'get_or_create', side_effect=IntegrityError):
+            response = client.post('/api/watchlist/', {'auction': self.auction.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(**UNSAMPLED)
+class RegistrationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('bidder@example.com', 'pw', is_verified=True)
+        cls.auction = make_auction(make_property(make_owner(), 1))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fill_from_before_a_registration_is_not_served(self):
+        version = get_version(registration._version_key(self.auction.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.register(self.user, self.auction)
+        # A reader that loaded the ids before the registration committed stores them late
+        cache.add(registration._cache_key(self.auction.pk, version), frozenset())
+        self.assertTrue(registration.is_registered(self.auction.pk, self.user.pk))
+
+    def test_withdraw_before_bidding(self):
+        entry, _ = registration.register(self.user, self.auction)
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.unregister(entry)
+        self.assertFalse(registration.is_registered(self.auction.pk, self.user.pk))
+        self.auction.refresh_from_db(fields=['registered_bidders'])
+        self.assertEqual(self.auction.registered_bidders, 0)
+
+    def test_no_withdrawal_after_bidding(self):
+        entry, _ = registration.register(self.user, self.auction)
+        Bid.objects.create(auction=self.auction, bidder=self.user, bid_amount=Decimal('5000'), status='accepted')
+        with self.assertRaises(registration.RegistrationError):
+            registration.unregister(entry)
+        self.assertTrue(AuctionRegistration.objects.filter(pk=entry.pk).exists())
+        self.auction.refresh_from_db(fields=['registered_bidders'])
+        self.assertEqual(self.auction.registered_bidders, 1)
+
+    def bid(self, amount):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.post('/api/bids/', {'auction': self.auction.pk, 'bid_amount': amount}, format='json')
+
+    def test_bids_need_no_registration_by_default(self):
+        self.assertEqual(self.bid('5000').status_code, 201)
+
+    @override_settings(AUCTION_REGISTRATION_REQUIRED=True)
+    def test_required_registration_blocks_unregistered_bidders(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.bid('5000').status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.register(self.user, self.auction)
+        self.assertEqual(self.bid('5000').status_code, 201)
+
+
+def image_upload(name):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 3)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(**UNSAMPLED)
+class MediaBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        cls.listing = make_property(cls.owner, 1)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def upload(self, count, **fields):
+        data = {'content_type': 'property', 'object_id': self.listing.pk, **fields}
+        data['files'] = [image_upload(f'{n}.png') for n in range(count)]
+        return self.client.post('/api/media/batch/', data, format='multipart')
+
+    def primaries(self):
+        return list(self.listing.media.filter(is_primary=True).values_list('name', flat=True))
+
+    def test_upload_orders_files_and_keeps_one_primary(self):
+        response = self.upload(3, order=json.dumps(['file:2', 'file:0', 'file:1']), primary='file:0')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['name'] for item in response.data], ['2.png', '0.png', '1.png'])
+        self.assertEqual(self.primaries(), ['0.png'])
+
+        response = self.upload(1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.primaries(), ['0.png'])
+
+    def test_invalid_order_or_primary_is_400(self):
+        cases = [
+            {'order': json.dumps([None])},
+            {'order': json.dumps([{'id': 1}])},
+            {'order': json.dumps(['file:-1'])},
+            {'order': json.dumps(['file:2'])},
+            {'order': json.dumps(['file:0', 'file:0'])},
+            {'order': json.dumps('file:0')},
+            {'primary': 'file:2'},
+        ]
+        for fields in cases:
+            with self.subTest(**fields), self.assertLogs('django.request', 'WARNING'):
+                response = self.upload(2, **fields)
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.listing.media.exists())
+
+    def test_reorder_moves_primary(self):
+        self.upload(3)
+        ids = list(self.listing.media.order_by('order').values_list('id', flat=True))
+        response = self.client.post('/api/media/reorder/', {
+            'content_type': 'property', 'object_id': self.listing.pk, 'order': ids[::-1], 'primary': ids[2],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], ids[::-1])
+        self.assertEqual(self.primaries(), ['2.png'])
+
+    def test_reorder_rejects_duplicate_and_foreign_ids(self):
+        self.upload(2)
+        ids = list(self.listing.media.values_list('id', flat=True))
+        for order in ([ids[0], ids[0]], [ids[0], 99999]):
+            with self.subTest(order=order), self.assertLogs('django.request', 'WARNING'):
+                response = self.client.post('/api/media/reorder/', {
+                    'content_type': 'property', 'object_id': self.listing.pk, 'order': order,
+                }, format='json')
+                self.assertEqual(response.status_code, 400)
+
+
+class PropertyImportTests(TestCase):
+    """Bulk import -> tags and cards -> export, through the same paths the admin and commands use"""
+    HEADERS = [
+        'property_type', 'title', 'deed_number', 'description', 'address', 'city', 'state',
+        'size_sqm', 'market_value', 'features', 'amenities',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_owner()
+        make_property(cls.owner, 1)
+        type_registry.invalidate(PropertyType)
+
+    def csv_stream(self, rows):
+        stream = io.StringIO()
+        writer = csv.DictWriter(stream, self.HEADERS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                'property_type': 'villa', 'description': 'Imported', 'address': 'Street',
+                'city': 'Jeddah', 'state': 'Makkah', 'size_sqm': '300', 'market_value': '750000', **row,
+            })
+        stream.seek(0)
+        return stream
+
+    def run_import(self, rows):
+        importer = PropertyImporter(owner=self.owner, batch_size=2, publish=True)
+        return importer.run(READERS['csv'](self.csv_stream(rows)))
+
+    def test_bad_rows_are_reported_by_line(self):
+        result = self.run_import([
+            {'title': 'Sea View', 'deed_number': 'IMP-1'},
+            {'title': 'No Deed', 'deed_number': ''},
+            {'title': 'Huge', 'deed_number': 'IMP-2', 'size_sqm': 'big'},
+            {'title': 'Copy', 'deed_number': 'IMP-1'},
+            {'title': 'Taken', 'deed_number': 'D-1'},
+            {'title': 'Keep', 'deed_number': 'IMP-3', 'property_type': 'castle'},
+        ])
+        self.assertEqual((result.processed, result.created), (6, 1))
+        # Parse errors surface at once, database checks when the batch flushes
+        self.assertEqual(sorted(result.errors), [
+            (3, "'deed_number' is required"),
+            (4, "'size_sqm' must be a number"),
+            (5, "Duplicate deed number 'IMP-1' in file"),
+            (6, "Deed number 'D-1' already exists"),
+            (7, "Unknown property type 'castle'"),
+        ])
+        self.assertEqual(
+            sorted(Property.objects.values_list('deed_number', flat=True)), ['D-1', 'IMP-1'],
+        )
+
+    def test_imported_rows_get_tags_and_cards(self):
+        result = self.run_import([
+            {'title': 'Sea View', 'deed_number': 'IMP-1', 'amenities': 'Pool|Garden'},
+            {'title': 'Sea View', 'deed_number': 'IMP-2', 'amenities': 'Pool', 'features': '["Balcony"]'},
+            {'title': 'Inland', 'deed_number': 'IMP-3'},
+        ])
+        self.assertEqual((result.created, result.errors), (3, []))
+        imported = {prop.deed_number: prop for prop in Property.objects.filter(deed_number__startswith='IMP-')}
+        self.assertEqual(imported['IMP-1'].slug, 'sea-view')
+        self.assertEqual(imported['IMP-2'].slug, 'sea-view-1')
+
+        with_pool = filter_by_tags(Property.objects.all(), 'amenity', ['pool'])
+        self.assertEqual(
+            sorted(with_pool.values_list('deed_number', flat=True)), ['IMP-1', 'IMP-2'],
+        )
+        self.assertEqual(
+            sorted(imported['IMP-2'].tags.values_list('kind', 'slug')), [('amenity', 'pool'), ('feature', 'balcony')],
+        )
+        self.assertFalse(imported['IMP-3'].tags.exists())
+
+        cards = PropertyCard.objects.filter(property__in=imported.values())
+        self.assertEqual(
+            sorted(cards.values_list('deed_number', 'city', 'is_published')),
+            [('IMP-1', 'Jeddah', True), ('IMP-2', 'Jeddah', True), ('IMP-3', 'Jeddah', True)],
+        )
+
+    def test_export_round_trips_imported_rows(self):
+        rows = [
+            {'title': 'Sea View', 'deed_number': 'IMP-1', 'size_sqm': '300.50'},
+            {'title': 'Inland', 'deed_number': 'IMP-2', 'market_value': '640000'},
+        ]
+        self.run_import(rows)
+        imported = Property.objects.filter(deed_number__startswith='IMP-').order_by('deed_number')
+        response = streaming_export_response(imported, PROPERTY_EXPORT_COLUMNS, 'properties')
+        exported = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(
+            [(row['deed_number'], row['title'], row['city'], row['size_sqm'], row['market_value'], row['owner_email'])
+             for row in csv.DictReader(io.StringIO(exported))],
+            [('IMP-1', 'Sea View', 'Jeddah', '300.50', '750000.00', self.owner.email),
+             ('IMP-2', 'Inland', 'Jeddah', '300.00', '640000.00', self.owner.email)],
+        )
+
+        # Feeding the export back in is rejected row by row, not duplicated
+        result = PropertyImporter(owner=self.owner).run(READERS['csv'](io.StringIO(exported)))
+        self.assertEqual(result.created, 0)
+        self.assertEqual(len(result.errors), 2)
+        self.assertEqual(imported.count(), 2)
+
+
+class ColumnarChangesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.auction = make_auction(make_property(make_owner(), 1))
+        cls.bidders = [CustomUser.objects.create_user(f'bidder{n}@example.com', 'pw', is_verified=True) for n in range(2)]
+
+    def test_outbid_bids_are_in_the_next_increment(self):
+        first = Bid.objects.create(auction=self.auction, bidder=self.bidders[0], bid_amount=Decimal('2000'), status='accepted')
+        since = timezone.now()
+        second = Bid.objects.create(auction=self.auction, bidder=self.bidders[1], bid_amount=Decimal('2500'), status='accepted')
+        until = timezone.now()
+
+        changed = dict(BID_TABLE.changed(since, until).values_list('id', 'status'))
+        self.assertEqual(changed, {first.pk: 'outbid', second.pk: 'winning'})
+        self.assertEqual(list(AUCTION_TABLE.changed(since, until).values_list('id', flat=True)), [self.auction.pk])
+
+
+@override_settings(**UNSAMPLED)
+class BidArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_owner()
+        now = timezone.now()
+        cls.closed = make_auction(
+            make_property(owner, 1), status='ended',
+            start_date=now - timedelta(days=200), end_date=now - timedelta(days=190),
+        )
+        cls.open = make_auction(make_property(owner, 2))
+        cls.bidders = [CustomUser.objects.create_user(f'bidder{n}@example.com', 'pw', is_verified=True) for n in range(3)]
+        cls.closed_bids = [
+            Bid.objects.create(
+                auction=cls.closed, bidder=bidder, bid_amount=Decimal(2000 + 500 * n),
+                bid_time=now - timedelta(days=195, minutes=10 - n), status='accepted',
+            )
+            for n, bidder in enumerate(cls.bidders)
+        ]
+        cls.closed_bids[0].delete()
+        cls.open_bid = Bid.objects.create(auction=cls.open, bidder=cls.bidders[0], bid_amount=Decimal('3000'), status='accepted')
+        cls.admin = CustomUser.objects.create_superuser('admin@example.com', 'pw')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_live_bids_move_and_tombstones_are_dropped(self):
+        self.assertEqual(list(archivable_auctions(timezone.now() - timedelta(days=30))), [self.closed])
+        self.assertEqual(archive_auction_bids([self.closed.pk]), 2)
+
+        self.assertFalse(Bid.all_objects.filter(auction=self.closed).exists())
+        self.assertEqual(
+            sorted(ArchivedBid.objects.values_list('id', 'status')),
+            [(self.closed_bids[1].pk, 'outbid'), (self.closed_bids[2].pk, 'winning')],
+        )
+        self.closed.refresh_from_db()
+        self.assertIsNotNone(self.closed.bids_archived_at)
+        self.assertTrue(Bid.objects.filter(pk=self.open_bid.pk).exists())
+        self.assertFalse(archivable_auctions(timezone.now()).exists())
+
+    def test_rerun_and_conflicts_are_not_counted(self):
+        existing = self.closed_bids[1]
+        ArchivedBid.objects.create(
+            id=existing.pk, auction=self.closed, bidder=existing.bidder, bid_amount=existing.bid_amount,
+            bid_time=existing.bid_time, status=existing.status,
+        )
+        self.assertEqual(archive_auction_bids([self.closed.pk]), 1)
+        self.assertEqual(archive_auction_bids([self.closed.pk]), 0)
+        self.assertEqual(ArchivedBid.objects.count(), 2)
+
+    def test_history_reads_both_tables(self):
+        archive_auction_bids([self.closed.pk])
+        response = self.client.get('/api/bids/history/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['id'], row['archived']) for row in response.data['results']],
+            [(self.open_bid.pk, False), (self.closed_bids[2].pk, True), (self.closed_bids[1].pk, True)],
+        )
+
+        response = self.client.get('/api/bids/history/', {'bidder': self.bidders[1].pk})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.closed_bids[1].pk])
+        self.assertEqual(response.data['results'][0]['status_display'], str(dict(Bid.STATUS_CHOICES)['outbid']))
+
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.client.get('/api/bids/history/', {'auction': 'latest'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archived_auction_renders_bids_from_the_archive(self):
+        params = {'fields': 'id,bids,highest_bid'}
+        before = self.client.get(f'/api/auctions/{self.closed.pk}/', params).data
+        archive_auction_bids([self.closed.pk])
+        after = self.client.get(f'/api/auctions/{self.closed.pk}/', params).data
+
+        self.assertEqual(
+            sorted(bid['id'] for bid in after['bids']), sorted(bid['id'] for bid in before['bids']),
+        )
+        self.assertEqual(after['highest_bid']['id'], self.closed_bids[2].pk)
+        self.assertEqual(Decimal(after['highest_bid']['bid_amount']), Decimal('3000'))
+
+
+@override_settings(AUCTION_CLOSING_WINDOW_MINUTES=10)
+class AuctionAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = timezone.now().replace(second=0, microsecond=0) - timedelta(days=200)
+        cls.auction = make_auction(
+            make_property(make_owner(), 1, market_value=Decimal('10000')), status='ended',
+            start_date=cls.start, end_date=cls.start + timedelta(minutes=300),
+        )
+        bidders = [CustomUser.objects.create_user(f'bidder{n}@example.com', 'pw', is_verified=True) for n in range(3)]
+        # (bidder, amount, minutes after the start, status); the last bid came in after a late extension
+        for bidder, amount, minute, status in [
+            (0, 1100, 0, 'outbid'), (1, 1200, 1, 'outbid'), (0, 1300, 1, 'outbid'), (2, 1500, 250, 'outbid'),
+            (1, 1600, 295, 'outbid'), (0, 9000, 298, 'rejected'), (2, 1700, 299, 'outbid'), (1, 2000, 305, 'winning'),
+        ]:
+            Bid.objects.create(
+                auction=cls.auction, bidder=bidders[bidder], bid_amount=Decimal(amount),
+                bid_time=cls.start + timedelta(minutes=minute, seconds=30), status=status,
+            )
+
+    def assert_analytics(self, analytics):
+        self.assertEqual((analytics.bid_count, analytics.distinct_bidders), (7, 3))
+        self.assertEqual(analytics.time_to_first_bid, timedelta(seconds=30))
+        self.assertEqual(analytics.peak_bids_per_minute, 2)
+        self.assertEqual(analytics.final_price, Decimal('2000'))
+        self.assertEqual((analytics.price_to_start, analytics.price_to_market), (2.0, 0.2))
+
+        # 306 minutes in 3-minute buckets; the late bid lands in the last one
+        velocity = analytics.velocity
+        self.assertEqual((velocity['bucket_seconds'], len(velocity['counts'])), (180, 102))
+        self.assertEqual(
+            {index: count for index, count in enumerate(velocity['counts']) if count},
+            {0: 3, 83: 1, 98: 1, 99: 1, 101: 1},
+        )
+
+        # The window opens 10 minutes before end_date: minutes 295, 299 and 305
+        self.assertEqual((analytics.closing_window_minutes, analytics.closing_window_bids), (10, 3))
+        self.assertAlmostEqual(analytics.closing_window_share, 3 / 7)
+
+    def test_single_pass_over_live_bids(self):
+        with CaptureQueriesContext(connection) as queries:
+            compute_auction_analytics(self.auction.pk)
+        self.assertEqual(sum('"base_bid"' in query['sql'] for query in queries), 1)
+        self.assert_analytics(AuctionAnalytics.objects.get(auction=self.auction))
+
+    def test_archived_bids_give_the_same_result(self):
+        archive_auction_bids([self.auction.pk])
+        self.assert_analytics(compute_auction_analytics(self.auction.pk))
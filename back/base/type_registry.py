@@ -0,0 +1,103 @@
+"""
+In-process registry of the reference type tables (property, building, room
+and auction types).
+
+Each process keeps the rows in memory and compares them with a version number
+stored in the shared cache, at most once per TYPE_REGISTRY_CHECK_INTERVAL so
+serializing a page of rows costs no cache round-trips. Saving or deleting a
+type bumps that version (see signals.py): the saving process reloads at once,
+the others within the interval.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import PropertyType, BuildingType, RoomType, AuctionType
+
+TYPE_MODELS = (PropertyType, BuildingType, RoomType, AuctionType)
+
+
+def _version_key(model):
+    return f'type_registry_version:{model._meta.label_lower}'
+
+
+class _Entry:
+    def __init__(self, version, objects):
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.objects = objects
+        self.by_id = {obj.pk: obj for obj in objects}
+        self.by_code = {obj.code.lower(): obj for obj in objects}
+        self.representations = {}  # serializer class -> {id: data}
+
+
+class TypeRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model):
+        entry = self._entries.get(model)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < settings.TYPE_REGISTRY_CHECK_INTERVAL:
+            return entry
+        shared = cache.get(_version_key(model))
+        if entry is not None:
+            if shared == entry.version:
+                entry.checked_at = now
+                return entry
+            # No shared version (e.g. a non-shared cache backend): fall back to a TTL
+            if shared is None and now - entry.loaded_at < settings.TYPE_REGISTRY_TTL:
+                entry.checked_at = now
+                return entry
+
+        with self._lock:
+            if shared is None:
+                shared = time.time_ns()
+                if not cache.add(_version_key(model), shared, None):
+                    shared = cache.get(_version_key(model), shared)
+            entry = _Entry(shared, list(model.objects.order_by('id')))
+            self._entries[model] = entry
+        return entry
+
+    def invalidate(self, model):
+        """Drop this process's copy and tell the others to reload"""
+        cache.set(_version_key(model), time.time_ns(), None)
+        self._entries.pop(model, None)
+
+    def all(self, model):
+        return self._entry(model).objects
+
+    def get(self, model, value):
+        """Look a type up by instance, id or code; returns None if unknown"""
+        if isinstance(value, model):
+            return value
+        entry = self._entry(model)
+        if isinstance(value, int):
+            return entry.by_id.get(value)
+        if isinstance(value, str):
+            value = value.strip()
+            found = entry.by_code.get(value.lower())
+            if found is None and value.isdigit():
+                found = entry.by_id.get(int(value))
+            return found
+        return None
+
+    def representation(self, model, serializer_class, pk):
+        """Serialized form of one type, computed once per version"""
+        entry = self._entry(model)
+        data = entry.representations.get(serializer_class)
+        if data is None:
+            data = {obj.pk: serializer_class(obj).data for obj in entry.objects}
+            entry.representations[serializer_class] = data
+        return data.get(pk)
+
+    def etag(self, model, *parts):
+        raw = repr((model._meta.label_lower, self._entry(model).version) + parts)
+        return '"{}"'.format(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+
+type_registry = TypeRegistry()
@@ -32,12 +32,18 @@ urlpatterns = [
     # Locations
     path('locations/', views.LocationListCreateView.as_view(), name='locations'),
     path('locations/<int:pk>/', views.LocationDetailView.as_view(), name='location'),
+    path('locations/<int:pk>/stats/', views.LocationStatsView.as_view(), name='location-stats'),
+    path('market-stats/', views.MarketStatsDashboardView.as_view(), name='market-stats'),
     
     # Core resources
     path('media/', views.MediaListCreateView.as_view(), name='media'),
     path('media/<int:pk>/', views.MediaDetailView.as_view(), name='media-detail'),
+    path('media/batch/', views.MediaBatchUploadView.as_view(), name='media-batch'),
+    path('media/reorder/', views.MediaReorderView.as_view(), name='media-reorder'),
     
     path('properties/', views.PropertyListCreateView.as_view(), name='properties'),
+    path('properties/cards/', views.PropertyCardListView.as_view(), name='property-cards'),
+    path('properties/recommended/', views.RecommendedPropertiesView.as_view(), name='property-recommendations'),
     path('properties/<int:pk>/', views.PropertyDetailView.as_view(), name='property'),
     path('properties/<arabicslug:slug>/', views.PropertySlugDetailView.as_view(), name='property-by-slug'),
     
@@ -46,8 +52,27 @@ urlpatterns = [
     
     path('auctions/', views.AuctionListCreateView.as_view(), name='auctions'),
     path('auctions/<int:pk>/', views.AuctionDetailView.as_view(), name='auction'),
+    path('auctions/<int:pk>/analytics/', views.AuctionAnalyticsView.as_view(), name='auction-analytics'),
+    path('auctions/<int:pk>/registration/', views.AuctionRegistrationView.as_view(), name='auction-registration'),
     path('auctions/<arabicslug:slug>/', views.AuctionSlugDetailView.as_view(), name='auction-by-slug'),
     
     path('bids/', views.BidListCreateView.as_view(), name='bids'),
+    path('bids/history/', views.BidHistoryListView.as_view(), name='bid-history'),
+    path('bids/mine/', views.MyBidListView.as_view(), name='my-bids'),
+    path('bids/mine/auctions/', views.MyAuctionBidsView.as_view(), name='my-bid-auctions'),
     path('bids/<int:pk>/', views.BidDetailView.as_view(), name='bid'),
+    
+    # Watchlist
+    path('watchlist/', views.WatchListCreateView.as_view(), name='watchlist'),
+    path('watchlist/<int:pk>/', views.WatchDetailView.as_view(), name='watch'),
+
+    # Saved searches
+    path('saved-searches/', views.SavedSearchListCreateView.as_view(), name='saved-searches'),
+    path('saved-searches/<int:pk>/', views.SavedSearchDetailView.as_view(), name='saved-search'),
+    path('saved-searches/<int:pk>/matches/', views.SavedSearchMatchListView.as_view(), name='saved-search-matches'),
+    
+    # Exports
+    path('exports/properties/', views.PropertyExportView.as_view(), name='export-properties'),
+    path('exports/auctions/', views.AuctionExportView.as_view(), name='export-auctions'),
+    path('exports/bids/', views.BidExportView.as_view(), name='export-bids'),
 ]
\ No newline at end of file
@@ -1,20 +1,48 @@
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.db.models import Count, Max, F, Q, BooleanField, ExpressionWrapper, prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.contrib.contenttypes.models import ContentType
 from rest_framework import generics, filters, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import (
     Media, Property, Room, Auction, Bid,
     PropertyType, BuildingType, Location, RoomType,
-    AuctionType
+    AuctionType, SavedSearch, SavedSearchMatch, PropertyCard, AuctionAnalytics, Watch,
+    AuctionRegistration
 )
 from .serializers import (
     MediaSerializer, PropertySerializer, RoomSerializer,
     AuctionSerializer, BidSerializer, PropertyTypeSerializer,
     BuildingTypeSerializer, LocationSerializer, RoomTypeSerializer,
-    AuctionTypeSerializer
+    AuctionTypeSerializer, MediaBatchUploadSerializer, MediaReorderSerializer,
+    SavedSearchSerializer, SavedSearchMatchSerializer, PropertyCardSerializer,
+    BidHistorySerializer, AuctionAnalyticsSerializer, MyAuctionBidSerializer,
+    WatchSerializer, AuctionRegistrationSerializer
+)
+from .exports import (
+    streaming_export_response, EXPORT_FORMATS,
+    PROPERTY_EXPORT_COLUMNS, AUCTION_EXPORT_COLUMNS, BID_EXPORT_COLUMNS
+)
+from .type_registry import type_registry, TYPE_MODELS
+from .bid_archive import bid_history
+from .market_stats import city_stats, city_dashboard
+from .watchlist import follow, unfollow
+from .registration import register, unregister, RegistrationError
+from .conditional import model_versions, related_models, make_etag
+from .filters import PropertyFilter, AuctionFilter, PropertyCardFilter, BidFilter
+from .facets import get_cached_facets, property_facets, auction_facets
+from .media import (
+    create_media_batch, apply_media_order, get_content_owner,
+    with_content_objects
 )
 from .permissions import (
     IsVerifiedUser, IsAppraiser, IsDataEntry, IsObjectOwner,
@@ -23,8 +51,169 @@ from .permissions import (
     IsAdminUser
 )
 
+class ExportMixin:
+    """
+    Streams the list view's filtered queryset as a file download.
+    ?file_format=csv|jsonl selects the encoding (`format` is taken by DRF's
+    renderer negotiation) and ?compress=gzip gzips the stream.
+    """
+    export_name = None
+    export_columns = None
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'file_format': [
+                _('Unsupported format. Available: {}').format(', '.join(EXPORT_FORMATS))
+            ]})
+        compress = request.query_params.get('compress', '').lower() in ('gzip', '1', 'true')
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_export_response(
+            queryset, self.export_columns, self.export_name,
+            file_format=file_format, compress=compress,
+        )
+
+class SparseFieldsQuerysetMixin:
+    """
+    Joins and prefetches only the relations the serializer will render for
+    this request's ?fields= / ?expand= shape.
+    """
+
+    defer_prefetch = False
+
+    def optimize_queryset(self, queryset):
+        select, prefetch = self.get_serializer().get_related_lookups()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch and not self.defer_prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+class ConditionalGetMixin:
+    """
+    Weak ETag and Last-Modified validators on GET, answered with 304 before
+    anything is serialized. Details are validated by the object's
+    modification time, lists by max(modification time) and the count of the
+    filtered queryset; both also cover the request path, the renderer and
+    the versions of the model itself and of the related models the
+    requested shape renders (writes with update_fields or .update() can
+    leave the modification time alone).
+    Expects SparseFieldsQuerysetMixin.
+    """
+    modified_field = 'updated_at'
+
+    def get_validators(self, modified, *parts):
+        select, prefetch = self.get_serializer().get_related_lookups()
+        model = self.get_serializer_class().Meta.model
+        versions = model_versions({model} | related_models(model, select + prefetch) | set(TYPE_MODELS))
+        etag = make_etag(
+            model._meta.label_lower, self.request.get_full_path(),
+            self.request.accepted_renderer.format, modified, versions, *parts
+        )
+        last_modified = int(modified.timestamp()) if modified else None
+        return etag, last_modified
+
+    def conditional_response(self, request, response, etag, last_modified):
+        """304 (or 412) for a matching request; otherwise `response` with validators attached"""
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        if response is not None:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        # Prefetches are deferred until we know the body is needed
+        self.defer_prefetch = True
+        instance = self.get_object()
+        self.defer_prefetch = False
+        etag, last_modified = self.get_validators(getattr(instance, self.modified_field), instance.pk)
+        not_modified = self.conditional_response(request, None, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        prefetch_related_objects([instance], *self.get_serializer().get_related_lookups()[1])
+        response = Response(self.get_serializer(instance).data)
+        return self.conditional_response(request, response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        stats = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            modified=Max(self.modified_field), count=Count('pk')
+        )
+        etag, last_modified = self.get_validators(stats['modified'], stats['count'])
+        not_modified = self.conditional_response(request, None, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        return self.conditional_response(request, response, etag, last_modified)
+
+class FacetedListMixin:
+    """
+    Adds `facets` to list responses when requested via ?facets=a,b,c.
+    Counts cover the current filter set (before pagination).
+    """
+    facet_cache_prefix = None
+    facets = {}
+
+    def get_facets(self):
+        """Facet name -> Facet/TagFacet offered by this list"""
+        return self.facets
+
+    def list(self, request, *args, **kwargs):
+        requested = list(dict.fromkeys(name for name in request.query_params.get('facets', '').split(',') if name))
+        if not requested:
+            return super().list(request, *args, **kwargs)
+
+        facets = self.get_facets()
+        unknown = [name for name in requested if name not in facets]
+        if unknown:
+            raise ValidationError({'facets': [
+                _('Unknown facets: {}. Available: {}').format(', '.join(unknown), ', '.join(facets))
+            ]})
+
+        response = super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        facet_data = get_cached_facets(
+            self.facet_cache_prefix, queryset, facets, requested, request.query_params
+        )
+        if isinstance(response.data, dict):
+            response.data['facets'] = facet_data
+        else:
+            response.data = {'results': response.data, 'facets': facet_data}
+        return response
+
+class TypeRegistryListMixin:
+    """
+    Serves a type list from the in-process type registry instead of the
+    database, with an ETag derived from the registry version.
+    """
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_serializer_class().Meta.model
+        etag = type_registry.etag(model, request.get_full_path())
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        items = type_registry.all(model)
+        search = request.query_params.get('search', '').strip().lower()
+        if search:
+            items = [obj for obj in items if search in obj.name.lower() or search in obj.code.lower()]
+
+        serializer_class = self.get_serializer_class()
+        page = self.paginate_queryset(items)
+        data = [
+            type_registry.representation(model, serializer_class, obj.pk)
+            for obj in (page if page is not None else items)
+        ]
+        response = self.get_paginated_response(data) if page is not None else Response(data)
+        response['ETag'] = etag
+        return response
+
 # Type Views
-class PropertyTypeListCreateView(generics.ListCreateAPIView):
+class PropertyTypeListCreateView(TypeRegistryListMixin, generics.ListCreateAPIView):
     queryset = PropertyType.objects.all()
     serializer_class = PropertyTypeSerializer
     permission_classes = [IsVerifiedUser]
@@ -36,7 +225,7 @@ class PropertyTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PropertyTypeSerializer
     permission_classes = [IsVerifiedUser, IsAdminUser]
 
-class BuildingTypeListCreateView(generics.ListCreateAPIView):
+class BuildingTypeListCreateView(TypeRegistryListMixin, generics.ListCreateAPIView):
     queryset = BuildingType.objects.all()
     serializer_class = BuildingTypeSerializer
     permission_classes = [IsVerifiedUser]
@@ -48,7 +237,7 @@ class BuildingTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BuildingTypeSerializer
     permission_classes = [IsVerifiedUser, IsAdminUser]
 
-class RoomTypeListCreateView(generics.ListCreateAPIView):
+class RoomTypeListCreateView(TypeRegistryListMixin, generics.ListCreateAPIView):
     queryset = RoomType.objects.all()
     serializer_class = RoomTypeSerializer
     permission_classes = [IsVerifiedUser]
@@ -60,7 +249,7 @@ class RoomTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RoomTypeSerializer
     permission_classes = [IsVerifiedUser, IsAdminUser]
 
-class AuctionTypeListCreateView(generics.ListCreateAPIView):
+class AuctionTypeListCreateView(TypeRegistryListMixin, generics.ListCreateAPIView):
     queryset = AuctionType.objects.all()
     serializer_class = AuctionTypeSerializer
     permission_classes = [IsVerifiedUser]
@@ -86,9 +275,45 @@ class LocationDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = LocationSerializer
     permission_classes = [IsVerifiedUser, IsAdminUser]
 
+class MarketStatsMixin:
+    """?months= window (default 12) and ?property_type= (id or code) for the market stat views"""
+    permission_classes = [IsAuthenticated]
+
+    def get_stat_params(self):
+        try:
+            months = int(self.request.query_params.get('months', 12))
+        except ValueError:
+            raise ValidationError({'months': [_('Must be an integer.')]})
+        if not 1 <= months <= settings.MARKET_STATS_MAX_MONTHS:
+            raise ValidationError({'months': [
+                _('Must be between 1 and {}.').format(settings.MARKET_STATS_MAX_MONTHS)
+            ]})
+        property_type = self.request.query_params.get('property_type')
+        if property_type:
+            found = type_registry.get(PropertyType, property_type)
+            if found is None:
+                raise ValidationError({'property_type': [_('Unknown property type.')]})
+            property_type = found
+        return {'months': months, 'property_type': property_type or None}
+
+class LocationStatsView(MarketStatsMixin, generics.GenericAPIView):
+    """Market statistics of the location's city, from the MarketStat rollups"""
+    queryset = Location.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        location = self.get_object()
+        return Response(city_stats(location.city, **self.get_stat_params()))
+
+class MarketStatsDashboardView(MarketStatsMixin, generics.GenericAPIView):
+    """Market statistics for every city, busiest first"""
+
+    def get(self, request, *args, **kwargs):
+        return Response({'results': city_dashboard(**self.get_stat_params())})
+
 # Media Views
 class MediaListCreateView(generics.ListCreateAPIView):
-    queryset = Media.objects.select_related('content_type')
+    # MediaSerializer never reads content_object, so the list doesn't resolve it
+    queryset = Media.objects.all()
     serializer_class = MediaSerializer
     permission_classes = [IsVerifiedUser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -96,43 +321,148 @@ class MediaListCreateView(generics.ListCreateAPIView):
     search_fields = ['name']
 
 class MediaDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Media.objects.select_related('content_type')
+    queryset = with_content_objects(Media.objects.all())
     serializer_class = MediaSerializer
     permission_classes = [IsVerifiedUser, IsObjectOwner]
 
+class MediaBatchMixin:
+    """Shared target validation and ownership checks for batch media endpoints"""
+    permission_classes = [IsVerifiedUser]
+
+    def check_target_permission(self, content_object):
+        user = self.request.user
+        if user.is_superuser or user.role in ['appraiser', 'data_entry']:
+            return
+        if get_content_owner(content_object) != user:
+            raise PermissionDenied(_('You must be the owner of this object to manage its media.'))
+
+    def media_response(self, content_object, status_code=status.HTTP_200_OK):
+        media = Media.objects.filter(
+            content_type=ContentType.objects.get_for_model(content_object),
+            object_id=content_object.pk
+        ).order_by('order', 'id')
+        serializer = MediaSerializer(media, many=True, context=self.get_serializer_context())
+        return Response(serializer.data, status=status_code)
+
+class MediaBatchUploadView(MediaBatchMixin, generics.GenericAPIView):
+    """Upload many files for one object and set their ordering in one request"""
+    serializer_class = MediaBatchUploadSerializer
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        content_object = data['content_object']
+        self.check_target_permission(content_object)
+
+        try:
+            create_media_batch(
+                content_object, data['files'],
+                order_tokens=data.get('order'), primary_token=data.get('primary')
+            )
+        except (ValueError, IndexError) as e:
+            raise ValidationError({'order': [str(e)]})
+
+        return self.media_response(content_object, status.HTTP_201_CREATED)
+
+class MediaReorderView(MediaBatchMixin, generics.GenericAPIView):
+    """Reorder an object's media and pick its primary image in one UPDATE"""
+    serializer_class = MediaReorderSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        content_object = data['content_object']
+        self.check_target_permission(content_object)
+
+        try:
+            apply_media_order(
+                ContentType.objects.get_for_model(content_object), content_object.pk,
+                data['order'], data.get('primary')
+            )
+        except ValueError as e:
+            raise ValidationError({'order': [str(e)]})
+
+        return self.media_response(content_object)
+
 # Property Views
-class PropertyListCreateView(generics.ListCreateAPIView):
+class PropertyListCreateView(ConditionalGetMixin, SparseFieldsQuerysetMixin, FacetedListMixin, generics.ListCreateAPIView):
     serializer_class = PropertySerializer
+    facet_cache_prefix = 'property'
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['property_type', 'building_type', 'status', 'location__city']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = PropertyFilter
+    # Sort keys are backed by partial indexes on is_published
     search_fields = ['title', 'deed_number', 'location__city']
+    ordering_fields = ['created_at', 'market_value', 'size_sqm', 'year_built']
+    ordering = ['-created_at']
 
     def get_queryset(self):
-        return Property.objects.select_related(
-            'owner', 'property_type', 'building_type', 'location'
-        ).prefetch_related('rooms', 'media').filter(
-            is_published=True
-        ).order_by('-created_at')
+        return self.optimize_queryset(Property.objects.filter(is_published=True))
+
+    def get_facets(self):
+        return property_facets()
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
-class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PropertyDetailView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PropertySerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'pk'
 
     def get_queryset(self):
-        return Property.objects.select_related(
-            'owner', 'property_type', 'building_type', 'location'
-        ).prefetch_related('rooms', 'media')
+        return self.optimize_queryset(Property.objects.select_related('owner'))
 
 class PropertySlugDetailView(PropertyDetailView):
     lookup_field = 'slug'
 
+class PropertyCardListView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.ListAPIView):
+    """
+    List-page cards from the PropertyCard projection: one indexed query, no
+    joins. Accepts the same filters and sort keys as the property list.
+    """
+    serializer_class = PropertyCardSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = PropertyCardFilter
+    search_fields = ['title', 'deed_number', 'city']
+    ordering_fields = ['created_at', 'market_value', 'size_sqm', 'year_built']
+    ordering = ['-created_at']
+    modified_field = 'refreshed_at'
+
+    def get_queryset(self):
+        return PropertyCard.objects.filter(is_published=True)
+
+class RecommendedPropertiesView(SparseFieldsQuerysetMixin, generics.GenericAPIView):
+    """Published properties ranked against the user's preferences and bid history"""
+    serializer_class = PropertySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        from .recommendations import recommend_properties  # NumPy is only needed here
+
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            raise ValidationError({'limit': [_('Must be an integer.')]})
+        limit = max(1, min(limit, settings.RECOMMENDATION_MAX_RESULTS))
+
+        ids, scores = recommend_properties(request.user, limit)
+        properties = self.optimize_queryset(Property.objects.all()).in_bulk(ids)
+
+        results = []
+        for property_id, score in zip(ids, scores):
+            if property_id in properties:
+                data = self.get_serializer(properties[property_id]).data
+                data['recommendation_score'] = round(score, 4)
+                results.append(data)
+        return Response({'results': results})
+
 # Room Views
-class RoomListCreateView(generics.ListCreateAPIView):
+class RoomListCreateView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsVerifiedUser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -140,58 +470,249 @@ class RoomListCreateView(generics.ListCreateAPIView):
     search_fields = ['name']
 
     def get_queryset(self):
-        return Room.objects.select_related(
-            'property', 'room_type'
-        ).prefetch_related('media')
+        return self.optimize_queryset(Room.objects.all())
 
-class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Room.objects.select_related('property', 'room_type').prefetch_related('media')
+class RoomDetailView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsVerifiedUser, IsAppraiserOrDataEntry]
 
+    def get_queryset(self):
+        return self.optimize_queryset(Room.objects.all())
+
 # Auction Views
-class AuctionListCreateView(generics.ListCreateAPIView):
+class AuctionListCreateView(ConditionalGetMixin, SparseFieldsQuerysetMixin, FacetedListMixin, generics.ListCreateAPIView):
     serializer_class = AuctionSerializer
+    facet_cache_prefix = 'auction'
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['auction_type', 'status', 'related_property']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = AuctionFilter
+    # Sort keys are backed by partial indexes on is_published
     search_fields = ['title', 'description']
+    ordering_fields = ['start_date', 'end_date', 'current_bid', 'created_at']
+    ordering = ['-start_date']
 
     def get_queryset(self):
-        return Auction.objects.select_related(
-            'auction_type', 'related_property'
-        ).prefetch_related('bids', 'media').filter(
-            is_published=True
-        ).order_by('-start_date')
+        return self.optimize_queryset(Auction.objects.filter(is_published=True))
 
-class AuctionDetailView(generics.RetrieveUpdateDestroyAPIView):
+    def get_facets(self):
+        return auction_facets()
+
+class AuctionDetailView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AuctionSerializer
     permission_classes = [IsVerifiedUser, IsObjectOwner]
 
     def get_queryset(self):
-        return Auction.objects.select_related(
-            'auction_type', 'related_property'
-        ).prefetch_related('bids', 'media')
+        return self.optimize_queryset(Auction.objects.all())
 
 class AuctionSlugDetailView(AuctionDetailView):
     lookup_field = 'slug'
 
+class AuctionAnalyticsView(generics.RetrieveAPIView):
+    """Precomputed bidding analytics of a closed auction, for its property owner and appraisers"""
+    serializer_class = AuctionAnalyticsSerializer
+    permission_classes = [IsPropertyOwnerOrAppraiser]
+    queryset = Auction.objects.select_related('related_property')
+
+    def get_object(self):
+        auction = super().get_object()
+        analytics = AuctionAnalytics.objects.filter(auction=auction).first()
+        if analytics is None:
+            raise NotFound(_('Analytics are available once the auction has closed.'))
+        return analytics
+
+class AuctionRegistrationView(generics.GenericAPIView):
+    """The caller's registration for an auction: GET shows it, POST registers, DELETE withdraws"""
+    serializer_class = AuctionRegistrationSerializer
+    permission_classes = [IsVerifiedUser]
+    queryset = Auction.objects.select_related('related_property')
+
+    def get_registration(self, auction):
+        registration = AuctionRegistration.objects.filter(auction=auction, user=self.request.user).first()
+        if registration is None:
+            raise NotFound(_('You are not registered for this auction.'))
+        registration.auction = auction
+        return registration
+
+    def get(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_registration(self.get_object())).data)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            registration, created = register(request.user, self.get_object())
+        except RegistrationError as e:
+            raise ValidationError({'detail': [str(e)]})
+        return Response(
+            self.get_serializer(registration).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def delete(self, request, *args, **kwargs):
+        try:
+            unregister(self.get_registration(self.get_object()))
+        except RegistrationError as e:
+            raise ValidationError({'detail': [str(e)]})
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 # Bid Views
-class BidListCreateView(generics.ListCreateAPIView):
+class BidListCreateView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = BidSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['auction', 'status']
+    filterset_class = BidFilter
     search_fields = ['auction__title']
 
     def get_queryset(self):
-        return Bid.objects.select_related('auction', 'bidder')
+        return self.optimize_queryset(Bid.objects.all())
 
-class BidDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Bid.objects.select_related('auction', 'bidder')
+    def perform_create(self, serializer):
+        serializer.save(bidder=self.request.user)
+
+class BidDetailView(ConditionalGetMixin, SparseFieldsQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BidSerializer
     permission_classes = [IsVerifiedUser, IsObjectOwner]
 
+    def get_queryset(self):
+        return self.optimize_queryset(Bid.objects.select_related('bidder'))
+
+class MyBidsPagination(CursorPagination):
+    ordering = ('-bid_time', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class MyBidListView(SparseFieldsQuerysetMixin, generics.ListAPIView):
+    """The caller's bids, newest first (bid_live_bidder_time_idx)"""
+    serializer_class = BidSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = MyBidsPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['auction', 'status']
+
+    def get_queryset(self):
+        return self.optimize_queryset(Bid.objects.filter(bidder=self.request.user))
+
+class MyAuctionsPagination(MyBidsPagination):
+    ordering = ('-last_bid_at', '-auction_id')
+
+class MyAuctionBidsView(generics.ListAPIView):
+    """
+    One row per auction the caller bid on: their highest bid and whether it
+    is currently the winning one. ?active=true keeps scheduled/live auctions.
+    """
+    serializer_class = MyAuctionBidSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = MyAuctionsPagination
+
+    def get_queryset(self):
+        bids = Bid.objects.filter(bidder=self.request.user, auction__is_deleted=False)
+        if self.request.query_params.get('active', '').lower() in ('1', 'true', 'yes'):
+            bids = bids.filter(auction__status__in=['scheduled', 'live'])
+        # One GROUP BY over the caller's index range, joined to the auction row
+        return bids.order_by().values(
+            'auction_id', 'auction__title', 'auction__slug', 'auction__status',
+            'auction__end_date', 'auction__current_bid',
+        ).annotate(
+            my_highest_bid=Max('bid_amount'),
+            my_bid_count=Count('id'),
+            last_bid_at=Max('bid_time'),
+        ).annotate(
+            is_winning=ExpressionWrapper(Q(my_highest_bid__gte=F('auction__current_bid')), output_field=BooleanField()),
+        )
+
+class BidHistoryListView(generics.ListAPIView):
+    """Live and archived bids together, filtered by ?auction=, ?bidder=, ?status="""
+    serializer_class = BidHistorySerializer
+    permission_classes = [IsAuthenticated]
+    history_filters = {'auction': 'auction_id', 'bidder': 'bidder_id', 'status': 'status'}
+
+    def get_queryset(self):
+        lookups = {}
+        for param, lookup in self.history_filters.items():
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            if lookup.endswith('_id') and not value.isdigit():
+                raise ValidationError({param: _('A valid integer is required.')})
+            lookups[lookup] = value
+        return bid_history(**lookups)
+
+# Saved Search Views
+class SavedSearchListCreateView(generics.ListCreateAPIView):
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(
+            user=self.request.user, is_deleted=False
+        ).annotate(match_count=Count('matches')).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+class SavedSearchDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(
+            user=self.request.user, is_deleted=False
+        ).annotate(match_count=Count('matches')).order_by('-created_at')
+
+class SavedSearchMatchListView(generics.ListAPIView):
+    serializer_class = SavedSearchMatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearchMatch.objects.filter(
+            search_id=self.kwargs['pk'], search__user=self.request.user, search__is_deleted=False
+        ).exclude(property__is_deleted=True).exclude(auction__is_deleted=True).select_related('property', 'auction')
+
+# Watchlist Views
+class WatchListCreateView(generics.ListCreateAPIView):
+    """The caller's watchlist; POST {"auction": id} or {"property": id} follows (idempotent)"""
+    serializer_class = WatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Watch.objects.filter(user=self.request.user).exclude(
+            property__is_deleted=True
+        ).exclude(auction__is_deleted=True).select_related('property', 'auction')
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        if not self.created:
+            response.status_code = status.HTTP_200_OK
+        return response
+
+    def perform_create(self, serializer):
+        listing = serializer.validated_data.get('auction') or serializer.validated_data['property']
+        serializer.instance, self.created = follow(self.request.user, listing)
+
+class WatchDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = WatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Watch.objects.filter(user=self.request.user).select_related('property', 'auction')
+
+    def perform_destroy(self, instance):
+        unfollow(instance)
+
+# Export Views (same filters as the list endpoints, staff only)
+class PropertyExportView(ExportMixin, PropertyListCreateView):
+    permission_classes = [IsVerifiedUser, IsAdminUser]
+    export_name = 'properties'
+    export_columns = PROPERTY_EXPORT_COLUMNS
+
+class AuctionExportView(ExportMixin, AuctionListCreateView):
+    permission_classes = [IsVerifiedUser, IsAdminUser]
+    export_name = 'auctions'
+    export_columns = AUCTION_EXPORT_COLUMNS
+
+class BidExportView(ExportMixin, BidListCreateView):
+    permission_classes = [IsVerifiedUser, IsAdminUser]
+    export_name = 'bids'
+    export_columns = BID_EXPORT_COLUMNS
+
 
 '''
 
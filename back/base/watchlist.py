@@ -0,0 +1,126 @@
+"""
+Watchlists: follow/unfollow with watcher_count upkeep, and fan-out of
+auction events to watchers. The watcher ids of a listing are cached as one
+packed array (8 bytes per watcher), so an event reaches thousands of
+watchers with one cache read and one user query per batch. The cached
+array sits under a per-listing version that follow/unfollow bump on commit,
+so a fill racing with a follow can't pin a stale list.
+"""
+import logging
+from array import array
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import F
+
+from .conditional import bump_model_version, get_version, bump_version
+from .instrumentation import record_cache
+from .models import Property, Auction, Watch
+
+logger = logging.getLogger(__name__)
+
+WATCH_TARGETS = {'auction': Auction, 'property': Property}
+
+WATCH_EVENTS = {
+    'extended': "An auction you are watching was extended",
+    'closed': "An auction you are watching has closed",
+}
+
+
+def _version_key(target, pk):
+    return f'watchers_version:{target}:{pk}'
+
+
+def _cache_key(target, pk, version):
+    return f'watchers:{target}:{pk}:{version}'
+
+
+def _count_change(target, pk, delta):
+    model = WATCH_TARGETS[target]
+    rows = model.all_objects.filter(pk=pk)
+    if delta < 0:
+        rows = rows.filter(watcher_count__gte=-delta)
+    rows.update(watcher_count=F('watcher_count') + delta)
+
+    def after_commit():
+        bump_version(_version_key(target, pk), settings.WATCHER_IDS_CACHE_SECONDS)
+        bump_model_version(model)
+    transaction.on_commit(after_commit)
+
+
+def follow(user, listing):
+    """Watch an Auction or Property; returns (watch, created)"""
+    target = 'auction' if isinstance(listing, Auction) else 'property'
+    lookup = {'user': user, target: listing}
+    try:
+        with transaction.atomic():
+            watch, created = Watch.objects.get_or_create(**lookup)
+            if created:
+                _count_change(target, listing.pk, 1)
+    except IntegrityError:
+        # A concurrent follow of the same listing committed first
+        return Watch.objects.get(**lookup), False
+    if created:
+        listing.refresh_from_db(fields=['watcher_count'])
+    return watch, created
+
+
+def unfollow(watch):
+    target = 'auction' if watch.auction_id else 'property'
+    with transaction.atomic():
+        deleted, _ = Watch.objects.filter(pk=watch.pk).delete()
+        if deleted:
+            _count_change(target, watch.auction_id or watch.property_id, -1)
+
+
+def watcher_ids(target, pk):
+    """User ids watching one listing, as an array('q'); cached until the next follow/unfollow"""
+    timeout = settings.WATCHER_IDS_CACHE_SECONDS
+    key = _cache_key(target, pk, get_version(_version_key(target, pk), timeout))
+    packed = cache.get(key)
+    record_cache(hits=packed is not None, misses=packed is None)
+    ids = array('q')
+    if packed is None:
+        ids.extend(
+            Watch.objects.filter(**{target + '_id': pk}).order_by('user_id').values_list('user_id', flat=True)
+        )
+        cache.add(key, ids.tobytes(), timeout)
+    else:
+        ids.frombytes(packed)
+    return ids
+
+
+def watcher_batches(target, pk, batch_size=None):
+    """Watcher ids in lists of at most WATCHLIST_FANOUT_BATCH_SIZE"""
+    batch_size = batch_size or settings.WATCHLIST_FANOUT_BATCH_SIZE
+    ids = watcher_ids(target, pk)
+    for start in range(0, len(ids), batch_size):
+        yield ids[start:start + batch_size].tolist()
+
+
+def notify_watchers(auction_id, event):
+    """Email everyone watching an auction about `event` (see WATCH_EVENTS); returns emails sent"""
+    from accounts.utils import send_email
+
+    auction = Auction.objects.filter(pk=auction_id).values('title', 'slug', 'status', 'end_date', 'current_bid').first()
+    if auction is None:
+        return 0
+    sent = 0
+    users = get_user_model().objects.filter(is_active=True)
+    for batch in watcher_batches('auction', auction_id):
+        for email, first_name in users.filter(pk__in=batch).values_list('email', 'first_name'):
+            if send_email(
+                to_email=email,
+                subject=WATCH_EVENTS[event],
+                template_name='watchlist_event',
+                context={'user_name': first_name, 'event': event, 'auction': auction},
+                action_type='notification',
+                check_limits=False,
+                fail_silently=True,
+            ):
+                sent += 1
+            else:
+                logger.warning(f"Watchlist {event} email for auction {auction_id} to {email} failed")
+    return sent